@@ -0,0 +1,58 @@
+"""
+Collector benchmark for TaskMaster.
+Compares the legacy per-call psutil update with the collector engines.
+
+Run from the project root:
+    python -m benchmarks.bench_collectors
+"""
+
+import time
+import psutil
+
+from src.core.collectors import ProcfsCollector, PsutilCollector
+
+
+def legacy_update(pid):
+    try:
+        process = psutil.Process(pid)
+        process.name()
+        process.status()
+        process.username()
+        process.create_time()
+        process.cpu_percent(interval=None)
+        process.memory_info()
+        process.num_threads()
+        process.cmdline()
+        process.exe()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        pass
+
+
+def time_it(label, func, pids, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(pids)
+        best = min(best, time.perf_counter() - start)
+    per_process = best / max(len(pids), 1) * 1e6
+    print(f"{label:<22} {best * 1000:9.2f} ms  {per_process:8.1f} us/process")
+    return best
+
+
+def main(rounds=5):
+    pids = psutil.pids()
+    print(f"Processes: {len(pids)}, best of {rounds} rounds")
+
+    legacy = time_it("legacy psutil calls", lambda ps: [legacy_update(p) for p in ps], pids, rounds)
+
+    psutil_collector = PsutilCollector()
+    time_it("psutil collector", psutil_collector.collect, pids, rounds)
+
+    if ProcfsCollector.available():
+        procfs_collector = ProcfsCollector()
+        procfs = time_it("procfs collector", procfs_collector.collect, pids, rounds)
+        print(f"procfs speedup over legacy: {legacy / procfs:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Parallel collection benchmark for TaskMaster.
+Prints full-scan latency for each worker count and pool type.
+
+Run from the project root:
+    python -m benchmarks.bench_parallel [max_workers]
+"""
+
+import os
+import sys
+import time
+
+from src.core.collectors import get_collector
+from src.core.parallel_collector import ParallelCollector
+
+
+def best_of(collector, rounds):
+    best = float('inf')
+    count = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        count = len(collector.collect())
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def main(max_workers=None, rounds=5):
+    max_workers = max_workers or os.cpu_count() or 1
+
+    baseline, count = best_of(get_collector(), rounds)
+    print(f"Processes: {count}, CPUs: {os.cpu_count()}, best of {rounds} rounds")
+    print(f"{'mode':<8} {'workers':>7} {'tick ms':>9} {'speedup':>8}")
+    print(f"{'serial':<8} {1:>7} {baseline * 1000:>9.2f} {1.0:>7.2f}x")
+
+    workers = 2
+    while workers <= max_workers:
+        for mode in ParallelCollector.MODES:
+            # Shard even small hosts so the curve is measurable
+            collector = ParallelCollector(workers=workers, mode=mode, min_shard_size=1)
+            collector.collect()
+            elapsed, _ = best_of(collector, rounds)
+            collector.close()
+            print(f"{mode:<8} {workers:>7} {elapsed * 1000:>9.2f} {baseline / elapsed:>7.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
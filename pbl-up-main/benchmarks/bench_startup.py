@@ -0,0 +1,77 @@
+"""
+Start-up benchmark for TaskMaster.
+Prints cold import and time-to-window figures, each measured in a fresh interpreter.
+
+Run from the project root:
+    python -m benchmarks.bench_startup [rounds]
+
+Without a display, Qt's offscreen platform is used. The runs happen in a
+temporary directory, so the database they create is thrown away.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Modules that must not be loaded before history or charts are used
+HEAVY_MODULES = ('pandas', 'matplotlib')
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+WINDOW_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+from src.gui.main_window import MainWindow
+app = QApplication(sys.argv[:1])
+window = MainWindow()
+window.show()
+app.processEvents()
+shown = time.perf_counter() - start
+while not window._first_scan_shown:
+    app.processEvents()
+    time.sleep(0.001)
+filled = time.perf_counter() - start
+window.close()
+print(json.dumps({'seconds': shown, 'filled': filled}))
+"""
+
+
+def run(script, rounds):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), env.get('PYTHONPATH')]))
+    if not env.get('DISPLAY') and not env.get('WAYLAND_DISPLAY'):
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(rounds):
+            output = subprocess.run([sys.executable, '-c', script], env=env, cwd=workdir,
+                                    check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+    return min(results, key=lambda result: result['seconds'])
+
+
+def main(rounds=5):
+    print(f"Best of {rounds} cold starts")
+    print(f"{'step':<32} {'seconds':>8}  heavy modules loaded")
+    for module in ('src.core.daemon', 'src.gui.main_window'):
+        result = run(IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES), rounds)
+        loaded = ', '.join(result['loaded']) or 'none'
+        print(f"{'import ' + module:<32} {result['seconds']:>8.3f}  {loaded}")
+
+    result = run(WINDOW_SCRIPT, rounds)
+    print(f"{'window shown':<32} {result['seconds']:>8.3f}")
+    print(f"{'first scan in the table':<32} {result['filled']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
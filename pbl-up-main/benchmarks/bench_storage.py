@@ -0,0 +1,69 @@
+"""
+Storage benchmark for TaskMaster.
+Prints event logging throughput of DataStorage against one connection and commit per call.
+
+Run from the project root:
+    python -m benchmarks.bench_storage [rows]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from src.core.data_storage import DataStorage
+
+
+def event(i):
+    return ('process_started', f"worker (PID {i}) started",
+            {'kind': 'started', 'pid': i, 'ppid': 1, 'name': 'worker', 'create_time': time.time()})
+
+
+def per_call_connection(db_path, rows):
+    """What every log_event call used to do: connect, insert, commit, close."""
+    for i in range(rows):
+        event_type, description, data = event(i)
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            'INSERT INTO events (timestamp, event_type, description, data) VALUES (?, ?, ?, ?)',
+            (int(time.time() * 1000), event_type, description, json.dumps(data)))
+        conn.commit()
+        conn.close()
+
+
+def write_behind(storage, rows):
+    for i in range(rows):
+        storage.log_event(*event(i))
+    storage.flush()
+
+
+def main(rows=20000):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Rollback journal and full sync, like the default connection before WAL
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        conn = sqlite3.connect(legacy_path)
+        conn.execute('CREATE TABLE events (timestamp INTEGER NOT NULL, event_type TEXT, '
+                     'description TEXT, data TEXT)')
+        conn.close()
+
+        legacy_rows = max(rows // 20, 100)
+        start = time.perf_counter()
+        per_call_connection(legacy_path, legacy_rows)
+        baseline = legacy_rows / (time.perf_counter() - start)
+
+        print(f"{'mode':<22} {'rows':>7} {'rows/s':>10} {'speedup':>8}")
+        print(f"{'per-call connection':<22} {legacy_rows:>7} {baseline:>10.0f} {1.0:>7.1f}x")
+
+        for durability in DataStorage.DURABILITY:
+            storage = DataStorage(os.path.join(tmp, f'{durability}.db'), durability=durability)
+            start = time.perf_counter()
+            write_behind(storage, rows)
+            rate = rows / (time.perf_counter() - start)
+            storage.close()
+            print(f"{'write-behind ' + durability:<22} {rows:>7} {rate:>10.0f} {rate / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -1,12 +1,99 @@
+import argparse
+import math
 import sys
-from PyQt6.QtWidgets import QApplication
-from src.gui.main_window import MainWindow
+
+from src.core.storage_engine import RETENTION_DAYS
+
+def retention_value(value):
+    kind, _, days = value.partition('=')
+    if kind not in RETENTION_DAYS:
+        raise argparse.ArgumentTypeError(
+            f"unknown class '{kind}', expected one of {', '.join(RETENTION_DAYS)}")
+    if days == 'forever':
+        return kind, None
+    try:
+        days = float(days)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not CLASS=DAYS or CLASS=forever")
+    if not math.isfinite(days) or days <= 0:
+        raise argparse.ArgumentTypeError(f"days must be a positive number, not '{value}'")
+    return kind, days
+
+def metrics_address(value):
+    host, colon, port = value.rpartition(':')
+    if not colon or not port.isdigit() or not 0 < int(port) < 65536:
+        raise argparse.ArgumentTypeError(f"'{value}' is not HOST:PORT or :PORT")
+    return value
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="TaskMaster process monitor")
+    parser.add_argument('--daemon', action='store_true',
+                        help="collect and store history without a GUI")
+    parser.add_argument('--db', default="data/taskmaster.db", help="database path")
+    parser.add_argument('--scan-interval', type=float, default=10,
+                        help="seconds between full process scans (daemon)")
+    parser.add_argument('--store-interval', type=float, default=300,
+                        help="seconds between database writes (daemon)")
+    parser.add_argument('--engine', default='auto', choices=['auto', 'procfs', 'psutil'],
+                        help="process collector engine (daemon)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="collector worker threads, 0 for none (daemon)")
+    parser.add_argument('--agent', metavar='ADDRESS',
+                        help="serve snapshots to remote GUIs on host:port or unix:/path, "
+                             "unauthenticated, so prefer loopback plus an SSH tunnel "
+                             "(implies --daemon; --store-interval 0 disables storage)")
+    parser.add_argument('--metrics', metavar='HOST:PORT', type=metrics_address,
+                        help="serve OpenMetrics at http://HOST:PORT/metrics, on 127.0.0.1 "
+                             "if HOST is empty (implies --daemon)")
+    parser.add_argument('--retention', metavar='CLASS=DAYS', type=retention_value,
+                        action='append', default=[],
+                        help="days of history kept for raw, events, 1m or 1h data, "
+                             "or 'forever'; repeatable (daemon)")
+    parser.add_argument('--vacuum', action='store_true',
+                        help="let the database give space freed by retention back to the OS, "
+                             "then exit; rewrites a file created before this once")
+    parser.add_argument('--connect', metavar='ADDRESS',
+                        help="show a remote agent instead of this machine")
+    return parser.parse_known_args()
+
+def run_daemon(args):
+    # Imported here so the daemon never loads Qt
+    from src.core.daemon import CollectorDaemon
+
+    CollectorDaemon(args.db, scan_interval=args.scan_interval,
+                    store_interval=args.store_interval, engine=args.engine,
+                    workers=args.workers, agent_address=args.agent,
+                    metrics_address=args.metrics,
+                    retention=dict(args.retention)).run()
+
+def run_vacuum(args):
+    from src.core.storage_engine import StorageEngine
+
+    engine = StorageEngine.open(args.db)
+    try:
+        if engine.call(engine.convert_to_incremental_vacuum):
+            print(f"{args.db} now returns freed space to the OS")
+        else:
+            print(f"{args.db} already returns freed space to the OS")
+    finally:
+        engine.release()
 
 def main():
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args()
+    if args.vacuum:
+        run_vacuum(args)
+        return
+    if args.daemon or args.agent or args.metrics:
+        run_daemon(args)
+        return
+
+    from PyQt6.QtWidgets import QApplication
+    from src.gui.main_window import MainWindow
+
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setApplicationName("TaskMaster")
 
-    window = MainWindow()
+    window = MainWindow(args.connect)
     window.show()
 
     sys.exit(app.exec())
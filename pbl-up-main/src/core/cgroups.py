@@ -0,0 +1,177 @@
+"""
+Cgroup module for TaskMaster.
+Groups processes by cgroup v2 and reads each group's usage from its own accounting files.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.counter_delta import CounterDeltaEngine
+from src.core.snapshot import ProcessSnapshot
+
+# Cumulative counters fed to the delta engine, in this order
+CGROUP_COUNTERS = ('usage_usec', 'rbytes', 'wbytes', 'rios', 'wios')
+
+
+def find_cgroup2_mount(proc_path: str = '/proc') -> Optional[str]:
+    """Return where the unified (v2) hierarchy is mounted, if anywhere."""
+    try:
+        with open(f"{proc_path}/self/mountinfo", 'rb') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    for line in lines:
+        # "... mount_point options [optional fields] - fstype source super_options"
+        fields, _, tail = line.partition(b' - ')
+        if tail.split(b' ', 1)[0] == b'cgroup2':
+            return fields.split()[4].decode()
+    return None
+
+
+class CgroupMonitor:
+    """Per-cgroup usage for the cgroups that hold the processes of a snapshot.
+
+    Membership is read from /proc/<pid>/cgroup once per process identity.
+    Usage comes from cpu.stat, memory.current, io.stat and pids.current of
+    each group, which the kernel keeps hierarchically, so the cost is per
+    group rather than per process. Groups whose controllers are not enabled
+    (and the root group, whose files describe the whole system) fall back to
+    summing their processes' snapshot rows.
+
+    depth limits grouping to the first N path components, e.g. depth 2
+    groups "/system.slice/nginx.service/worker" under
+    "/system.slice/nginx.service". None groups by the full path.
+    """
+
+    def __init__(self, mount: Optional[str] = None, proc_path: str = '/proc',
+                 depth: Optional[int] = None):
+        self.proc_path = proc_path
+        self.mount = mount if mount is not None else find_cgroup2_mount(proc_path)
+        self.depth = depth
+        # (pid, create_time) -> full cgroup path
+        self._membership: Dict[Tuple[int, float], str] = {}
+        self._rates = CounterDeltaEngine(len(CGROUP_COUNTERS))
+        self.groups: Dict[str, Dict[str, float]] = {}
+
+    def available(self) -> bool:
+        return self.mount is not None
+
+    def _read(self, path: str, name: str) -> Optional[bytes]:
+        try:
+            with open(f"{self.mount}{path}/{name}", 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def cgroup_of(self, pid: int) -> str:
+        try:
+            with open(f"{self.proc_path}/{pid}/cgroup", 'rb') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return ''
+        for line in lines:
+            # The v2 entry is "0::/path"; v1 entries carry a controller list
+            if line.startswith(b'0::'):
+                return line[3:].decode('utf-8', 'replace')
+        return ''
+
+    def group_path(self, path: str) -> str:
+        if self.depth is None or not path:
+            return path
+        parts = path.strip('/').split('/')
+        return '/' + '/'.join(parts[:self.depth]) if parts[0] else '/'
+
+    def _read_usage(self, path: str) -> Optional[Tuple[List[int], int, int]]:
+        if path in ('', '/'):
+            return None
+
+        cpu_stat = self._read(path, 'cpu.stat')
+        memory = self._read(path, 'memory.current')
+        if cpu_stat is None or memory is None:
+            return None
+
+        counters = dict.fromkeys(CGROUP_COUNTERS, 0)
+        for line in cpu_stat.splitlines():
+            key, _, value = line.partition(b' ')
+            if key == b'usage_usec':
+                counters['usage_usec'] = int(value)
+
+        # One line per device: "8:0 rbytes=... wbytes=... rios=... wios=... dbytes=... dios=..."
+        io_stat = self._read(path, 'io.stat')
+        if io_stat is None:
+            for key in CGROUP_COUNTERS[1:]:
+                counters[key] = -1
+        else:
+            for line in io_stat.splitlines():
+                for item in line.split()[1:]:
+                    key, _, value = item.partition(b'=')
+                    key = key.decode()
+                    if key in counters:
+                        counters[key] += int(value)
+
+        pids = self._read(path, 'pids.current')
+        return ([counters[key] for key in CGROUP_COUNTERS], int(memory),
+                int(pids) if pids is not None else -1)
+
+    def update(self, snapshot: ProcessSnapshot) -> Dict[str, Dict[str, float]]:
+        keys = list(zip(snapshot['pid'].tolist(), snapshot['create_time'].tolist()))
+
+        # Only processes not seen before cost a read
+        membership = {}
+        for key in keys:
+            path = self._membership.get(key)
+            if path is None:
+                path = self.cgroup_of(key[0])
+            membership[key] = path
+        self._membership = membership
+
+        index: Dict[str, int] = {}
+        inverse = np.array([index.setdefault(self.group_path(membership[key]), len(index))
+                            for key in keys], dtype=np.intp)
+        names = list(index)
+
+        # Process sums, used where the group's own files are unavailable
+        count = np.bincount(inverse, minlength=len(names))
+        cpu = np.bincount(inverse, snapshot['cpu_percent'], len(names))
+        rss = np.bincount(inverse, snapshot['rss'].astype(np.float64), len(names))
+        read_bps = np.bincount(inverse, snapshot['read_bps'], len(names))
+        write_bps = np.bincount(inverse, snapshot['write_bps'], len(names))
+
+        groups = {}
+        self._rates.begin(time.monotonic())
+        for i, path in enumerate(names):
+            group = {
+                'path': path,
+                'name': (path.rsplit('/', 1)[-1] or '/') if path else '(unknown)',
+                'processes': int(count[i]),
+                'cpu_percent': float(cpu[i]),
+                'memory_bytes': float(rss[i]),
+                'read_bps': float(read_bps[i]),
+                'write_bps': float(write_bps[i]),
+                'iops': -1.0,
+                'pids': int(count[i]),
+                'source': 'processes',
+            }
+
+            usage = self._read_usage(path) if self.mount is not None else None
+            if usage is not None:
+                counters, memory, pids = usage
+                usec, rbytes, wbytes, rios, wios = self._rates.update(path, counters)
+                group.update({
+                    'cpu_percent': usec / 1e4,
+                    'memory_bytes': float(memory),
+                    'source': 'cgroup',
+                })
+                if counters[1] >= 0:
+                    group.update({'read_bps': rbytes, 'write_bps': wbytes, 'iops': rios + wios})
+                if pids >= 0:
+                    group['pids'] = pids
+            group['io_bps'] = group['read_bps'] + group['write_bps']
+            groups[path] = group
+        self._rates.end()
+
+        self.groups = groups
+        return groups
@@ -0,0 +1,421 @@
+"""
+Process collector engines for TaskMaster.
+Reads per-process metrics either directly from /proc (Linux) or through psutil.
+"""
+
+import os
+import sys
+import threading
+import time
+import psutil
+from typing import Dict, List, Optional, Iterable
+
+try:
+    import pwd
+except ImportError:
+    pwd = None
+
+# Single-letter states from /proc/<pid>/stat, mapped to psutil's status names
+PROC_STATES = {
+    'R': psutil.STATUS_RUNNING,
+    'S': psutil.STATUS_SLEEPING,
+    'D': psutil.STATUS_DISK_SLEEP,
+    'Z': psutil.STATUS_ZOMBIE,
+    'T': psutil.STATUS_STOPPED,
+    't': psutil.STATUS_TRACING_STOP,
+    'X': psutil.STATUS_DEAD,
+    'x': psutil.STATUS_DEAD,
+    'I': 'idle',
+    'P': 'parked',
+    'W': 'waking',
+}
+
+
+class ProcessSample:
+    __slots__ = (
+        'pid', 'ppid', 'name', 'status', 'create_time', 'cpu_time',
+        'rss', 'vms', 'num_threads', 'uid', 'read_bytes', 'write_bytes',
+        'syscalls', 'ctx_switches_vol', 'ctx_switches_invol', 'num_fds',
+    )
+
+    def __init__(self, pid: int, ppid: int, name: str, status: str,
+                 create_time: float, cpu_time: float, rss: int, vms: int,
+                 num_threads: int, uid: int, read_bytes: int = -1, write_bytes: int = -1,
+                 syscalls: int = -1, ctx_switches_vol: int = -1,
+                 ctx_switches_invol: int = -1, num_fds: int = -1):
+        self.pid = pid
+        self.ppid = ppid
+        self.name = name
+        self.status = status
+        self.create_time = create_time
+        self.cpu_time = cpu_time
+        self.rss = rss
+        self.vms = vms
+        self.num_threads = num_threads
+        self.uid = uid
+        # Cumulative counters; -1 means not collected (no permission or not requested)
+        self.read_bytes = read_bytes
+        self.write_bytes = write_bytes
+        self.syscalls = syscalls
+        self.ctx_switches_vol = ctx_switches_vol
+        self.ctx_switches_invol = ctx_switches_invol
+        self.num_fds = num_fds
+
+
+class ThreadSample:
+    __slots__ = ('tid', 'name', 'status', 'create_time', 'cpu_time', 'processor')
+
+    def __init__(self, tid: int, name: str, status: str, create_time: float,
+                 cpu_time: float, processor: int = -1):
+        self.tid = tid
+        self.name = name
+        self.status = status
+        self.create_time = create_time
+        self.cpu_time = cpu_time
+        # CPU the thread last ran on; -1 when the platform does not report it
+        self.processor = processor
+
+
+class MemoryBreakdown:
+    __slots__ = ('rss', 'pss', 'uss', 'swap', 'swap_pss', 'shared')
+
+    def __init__(self, rss: int, pss: int, uss: int, swap: int,
+                 swap_pss: int = -1, shared: int = -1):
+        # Bytes; -1 means not reported on this platform
+        self.rss = rss
+        self.pss = pss
+        self.uss = uss
+        self.swap = swap
+        self.swap_pss = swap_pss
+        self.shared = shared
+
+
+class ProcfsCollector:
+    name = 'procfs'
+
+    # Boot time per proc path, shared so every collector derives identical create times
+    _boot_times: Dict[str, float] = {}
+
+    def __init__(self, proc_path: str = '/proc', boot_time: Optional[float] = None):
+        self.proc_path = proc_path
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        if boot_time is None:
+            boot_time = self._boot_times.get(proc_path)
+            if boot_time is None:
+                boot_time = self._boot_times[proc_path] = self._read_boot_time()
+        self.boot_time = boot_time
+
+        # One buffer per thread is reused for every file read instead of
+        # creating a file object and a fresh bytes buffer per file
+        self._local = threading.local()
+        self._user_names: Dict[int, str] = {}
+
+        # Counting open file descriptors lists a directory per process, so it
+        # is only done while a caller ranks by it
+        self.count_fds = False
+
+    @staticmethod
+    def available(proc_path: str = '/proc') -> bool:
+        return sys.platform.startswith('linux') and os.path.exists(
+            os.path.join(proc_path, 'self', 'stat'))
+
+    def _read_boot_time(self) -> float:
+        # btime in /proc/stat is rounded to whole seconds, which makes the age of
+        # a just-started process (and any rate measured over it) badly off.
+        # Deriving it from the uptime keeps it within a clock tick.
+        try:
+            with open(os.path.join(self.proc_path, 'uptime'), 'rb') as f:
+                return time.time() - float(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return psutil.boot_time()
+
+    def _read(self, path: str) -> bytes:
+        buf = getattr(self._local, 'buf', None)
+        if buf is None:
+            buf = self._local.buf = bytearray(16384)
+
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            n = os.readv(fd, [buf])
+            if n < len(buf):
+                return bytes(buf[:n])
+            # Filled the buffer, e.g. a long Java or Electron command line: read the rest
+            chunks = [bytes(buf)]
+            while True:
+                chunk = os.read(fd, len(buf))
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        finally:
+            os.close(fd)
+        return b''.join(chunks)
+
+    def pids(self) -> List[int]:
+        return [int(entry) for entry in os.listdir(self.proc_path) if entry.isdigit()]
+
+    def read(self, pid: int) -> Optional[ProcessSample]:
+        base = f"{self.proc_path}/{pid}/"
+        try:
+            stat = self._read(base + 'stat')
+            statm = self._read(base + 'statm')
+            status = self._read(base + 'status')
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            return None
+
+        # comm can contain spaces and parentheses, so split on the last ')'
+        lpar = stat.find(b'(')
+        rpar = stat.rfind(b')')
+        name = stat[lpar + 1:rpar].decode('utf-8', 'replace')
+        fields = stat[rpar + 2:].split()
+
+        state = PROC_STATES.get(chr(fields[0][0]), '?')
+        ppid = int(fields[1])
+        cpu_time = (int(fields[11]) + int(fields[12])) / self.clock_ticks
+        num_threads = int(fields[17])
+        create_time = self.boot_time + int(fields[19]) / self.clock_ticks
+
+        statm_fields = statm.split()
+        vms = int(statm_fields[0]) * self.page_size
+        rss = int(statm_fields[1]) * self.page_size
+
+        uid = -1
+        idx = status.find(b'\nUid:')
+        if idx >= 0:
+            # Real uid (the first of real, effective, saved, fs), as psutil reports it
+            uid = int(status[idx + 5:status.find(b'\n', idx + 5)].split()[0])
+
+        ctx_vol = self._field(status, b'\nvoluntary_ctxt_switches:')
+        ctx_invol = self._field(status, b'\nnonvoluntary_ctxt_switches:')
+
+        # /proc/<pid>/io needs ptrace access, so it is often missing for other users
+        read_bytes = write_bytes = syscalls = -1
+        try:
+            io = self._read(base + 'io')
+            read_bytes = self._field(io, b'\nread_bytes:')
+            write_bytes = self._field(io, b'\nwrite_bytes:')
+            syscalls = self._field(io, b'syscr:') + self._field(io, b'\nsyscw:')
+        except OSError:
+            pass
+
+        num_fds = -1
+        if self.count_fds:
+            try:
+                num_fds = len(os.listdir(base + 'fd'))
+            except OSError:
+                pass
+
+        return ProcessSample(pid, ppid, name, state, create_time, cpu_time,
+                             rss, vms, num_threads, uid, read_bytes, write_bytes,
+                             syscalls, ctx_vol, ctx_invol, num_fds)
+
+    @staticmethod
+    def _field(data: bytes, key: bytes) -> int:
+        idx = data.find(key)
+        if idx < 0:
+            return -1
+        start = idx + len(key)
+        return int(data[start:data.find(b'\n', start)])
+
+    def collect(self, pids: Optional[Iterable[int]] = None) -> List[ProcessSample]:
+        if pids is None:
+            pids = self.pids()
+
+        samples = []
+        for pid in pids:
+            sample = self.read(pid)
+            if sample is not None:
+                samples.append(sample)
+        return samples
+
+    def username(self, pid: int, uid: int) -> str:
+        name = self._user_names.get(uid)
+        if name is None:
+            try:
+                name = pwd.getpwuid(uid).pw_name
+            except (KeyError, TypeError, AttributeError):
+                name = str(uid)
+            self._user_names[uid] = name
+        return name
+
+    def cmdline(self, pid: int) -> List[str]:
+        try:
+            data = self._read(f"{self.proc_path}/{pid}/cmdline")
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            return []
+        return [arg.decode('utf-8', 'replace') for arg in data.rstrip(b'\0').split(b'\0') if arg]
+
+    def exe(self, pid: int) -> str:
+        try:
+            return os.readlink(f"{self.proc_path}/{pid}/exe")
+        except OSError:
+            return ''
+
+    def memory_breakdown(self, pid: int) -> Optional[MemoryBreakdown]:
+        # smaps_rollup walks every mapping of the process in the kernel, so it
+        # costs far more than statm; callers are expected to cache the result
+        try:
+            data = self._read(f"{self.proc_path}/{pid}/smaps_rollup")
+        except OSError:
+            return None
+        if not data:
+            return None  # kernel threads have no address space
+
+        values = {}
+        for line in data.split(b'\n')[1:]:
+            key, _, value = line.partition(b':')
+            if value:
+                values[key] = int(value.split()[0]) * 1024
+        private = values.get(b'Private_Clean', 0) + values.get(b'Private_Dirty', 0) + \
+            values.get(b'Private_Hugetlb', 0)
+        shared = values.get(b'Shared_Clean', 0) + values.get(b'Shared_Dirty', 0) + \
+            values.get(b'Shared_Hugetlb', 0)
+        return MemoryBreakdown(values.get(b'Rss', 0), values.get(b'Pss', 0), private,
+                               values.get(b'Swap', 0), values.get(b'SwapPss', -1), shared)
+
+    def threads(self, pid: int) -> List[ThreadSample]:
+        base = f"{self.proc_path}/{pid}/task/"
+        try:
+            tids = os.listdir(base)
+        except OSError:
+            return []
+
+        threads = []
+        for tid in tids:
+            try:
+                stat = self._read(f"{base}{tid}/stat")
+            except (FileNotFoundError, ProcessLookupError, PermissionError):
+                continue  # the thread exited while we were listing
+            lpar = stat.find(b'(')
+            rpar = stat.rfind(b')')
+            fields = stat[rpar + 2:].split()
+            threads.append(ThreadSample(
+                int(tid), stat[lpar + 1:rpar].decode('utf-8', 'replace'),
+                PROC_STATES.get(chr(fields[0][0]), '?'),
+                self.boot_time + int(fields[19]) / self.clock_ticks,
+                (int(fields[11]) + int(fields[12])) / self.clock_ticks,
+                int(fields[36]) if len(fields) > 36 else -1,
+            ))
+        return threads
+
+
+class PsutilCollector:
+    name = 'psutil'
+
+    ATTRS = ['pid', 'ppid', 'name', 'status', 'create_time', 'cpu_times',
+             'memory_info', 'num_threads']
+    if hasattr(psutil.Process, 'uids'):
+        ATTRS.append('uids')
+    if hasattr(psutil.Process, 'io_counters'):
+        ATTRS.append('io_counters')
+    if hasattr(psutil.Process, 'num_ctx_switches'):
+        ATTRS.append('num_ctx_switches')
+    FDS_ATTR = 'num_fds' if hasattr(psutil.Process, 'num_fds') else 'num_handles'
+
+    def __init__(self):
+        self.count_fds = False
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    @property
+    def attrs(self) -> List[str]:
+        return self.ATTRS + [self.FDS_ATTR] if self.count_fds else self.ATTRS
+
+    def pids(self) -> List[int]:
+        return psutil.pids()
+
+    def _sample(self, info: Dict) -> Optional[ProcessSample]:
+        cpu_times = info.get('cpu_times')
+        mem_info = info.get('memory_info')
+        if cpu_times is None or mem_info is None:
+            return None
+        uids = info.get('uids')
+        io = info.get('io_counters')
+        ctx = info.get('num_ctx_switches')
+        num_fds = info.get(self.FDS_ATTR)
+        return ProcessSample(
+            info['pid'], info.get('ppid') or 0, info.get('name') or '',
+            info.get('status') or '?', info.get('create_time') or 0.0,
+            cpu_times.user + cpu_times.system, mem_info.rss, mem_info.vms,
+            info.get('num_threads') or 0, uids.real if uids else -1,
+            io.read_bytes if io else -1, io.write_bytes if io else -1,
+            io.read_count + io.write_count if io else -1,
+            ctx.voluntary if ctx else -1, ctx.involuntary if ctx else -1,
+            num_fds if num_fds is not None else -1,
+        )
+
+    def read(self, pid: int) -> Optional[ProcessSample]:
+        try:
+            proc = psutil.Process(pid)
+            return self._sample(proc.as_dict(attrs=self.attrs))
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+
+    def collect(self, pids: Optional[Iterable[int]] = None) -> List[ProcessSample]:
+        if pids is not None:
+            samples = [self.read(pid) for pid in pids]
+            return [s for s in samples if s is not None]
+
+        samples = []
+        for proc in psutil.process_iter(self.attrs):
+            sample = self._sample(proc.info)
+            if sample is not None:
+                samples.append(sample)
+        return samples
+
+    def username(self, pid: int, uid: int) -> str:
+        try:
+            return psutil.Process(pid).username()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return str(uid)
+
+    def cmdline(self, pid: int) -> List[str]:
+        try:
+            return psutil.Process(pid).cmdline()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return []
+
+    def exe(self, pid: int) -> str:
+        try:
+            return psutil.Process(pid).exe()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return ''
+
+    def memory_breakdown(self, pid: int) -> Optional[MemoryBreakdown]:
+        try:
+            info = psutil.Process(pid).memory_full_info()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+        return MemoryBreakdown(info.rss, getattr(info, 'pss', -1), getattr(info, 'uss', -1),
+                               getattr(info, 'swap', -1), -1, getattr(info, 'shared', -1))
+
+    def threads(self, pid: int) -> List[ThreadSample]:
+        # psutil only reports per-thread CPU times, so name and state are the process's
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                name, status, create_time = proc.name(), proc.status(), proc.create_time()
+                return [ThreadSample(thread.id, name, status, create_time,
+                                     thread.user_time + thread.system_time)
+                        for thread in proc.threads()]
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return []
+
+
+COLLECTORS = {
+    ProcfsCollector.name: ProcfsCollector,
+    PsutilCollector.name: PsutilCollector,
+}
+
+
+def get_collector(engine: str = 'auto'):
+    if engine == 'auto':
+        engine = 'procfs' if ProcfsCollector.available() else 'psutil'
+
+    if engine not in COLLECTORS:
+        raise ValueError(f"Unknown collector engine: {engine}")
+    if not COLLECTORS[engine].available():
+        raise RuntimeError(f"Collector engine '{engine}' is not available on this platform")
+    return COLLECTORS[engine]()
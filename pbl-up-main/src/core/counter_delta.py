@@ -0,0 +1,92 @@
+"""
+Counter delta engine for TaskMaster.
+Turns cumulative kernel counters into per-second rates between two ticks.
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+class CounterDeltaEngine:
+    """Per-key rate computation for monotonically increasing counters.
+
+    Keys carry the identity of what is counted, e.g. (pid, create_time) for
+    processes, so a reused PID starts from a fresh baseline. Each key keeps
+    the time of its own last reading, so a partial tick that only refreshes
+    some keys yields correct rates. Keys that are not seen during a full tick
+    are dropped when it ends. A counter that goes backwards is treated as
+    reset to zero during the interval. Negative counter values mean "not
+    available" and produce a rate of 0.
+
+    A key read again less than min_interval seconds after its baseline gets
+    its previous rates back and keeps that baseline: counters such as CPU
+    time advance in clock ticks, so a rate over a few milliseconds is noise.
+    """
+
+    def __init__(self, width: int, min_interval: float = 0.0):
+        self.width = width
+        self.min_interval = min_interval
+        # key -> (time, counters, rates at that time)
+        self._previous: Dict[Hashable, Tuple[float, Sequence[float], List[float]]] = {}
+        self._current: Dict[Hashable, Tuple[float, Sequence[float], List[float]]] = {}
+        self._now: Optional[float] = None
+
+    def begin(self, now: float) -> None:
+        self._now = now
+        self._current = {}
+
+    def update(self, key: Hashable, counters: Sequence[float],
+               age: Optional[float] = None) -> List[float]:
+        """Store counters for key and return their rates since the last tick.
+
+        For a key without a baseline, age (seconds since the counted entity
+        started) lets the counters be measured from zero; without it the
+        rates are 0.
+        """
+        entry = self._previous.get(key)
+
+        if entry is not None:
+            last_time, previous, last_rates = entry
+            elapsed = self._now - last_time
+            if elapsed < self.min_interval:
+                self._current[key] = entry
+                return list(last_rates)
+        elif age is not None:
+            previous = (0,) * self.width
+            elapsed = age
+        else:
+            elapsed = 0
+
+        if elapsed <= 0:
+            rates = [0.0] * self.width
+            self._current[key] = (self._now, counters, rates)
+            return rates
+
+        rates = []
+        for current, base in zip(counters, previous):
+            if current < 0 or base < 0:
+                rates.append(0.0)
+                continue
+            delta = current - base
+            if delta < 0:
+                # Counter reset or wrapped: count from zero
+                delta = current
+            rates.append(delta / elapsed)
+        self._current[key] = (self._now, counters, rates)
+        return rates
+
+    def end(self, evict: bool = True) -> None:
+        """Finish a tick; a partial tick (evict=False) keeps keys it did not see."""
+        if evict:
+            self._previous = self._current
+        else:
+            self._previous.update(self._current)
+        self._current = {}
+
+    def keys(self):
+        return self._previous.keys()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._previous
+
+    def __len__(self) -> int:
+        return len(self._previous)
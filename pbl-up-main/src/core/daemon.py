@@ -0,0 +1,117 @@
+"""
+Headless collector daemon for TaskMaster.
+Runs the collection loop and the storage pipeline without any GUI toolkit.
+"""
+
+import signal
+import threading
+from typing import Dict, Optional
+
+from src.core.data_storage import DataStorage
+from src.core.database_manager import DatabaseManager
+from src.core.process_monitor import ProcessManager
+from src.core.scheduler import SamplingScheduler
+
+
+class CollectorDaemon:
+    """Collects process and system data on a fixed schedule and stores it.
+
+    Runs on the calling thread, which must be the main thread for signal
+    handling: SIGINT and SIGTERM stop the loop after the running task.
+    """
+
+    def __init__(self, db_path: str = "data/taskmaster.db", scan_interval: float = 10,
+                 system_interval: float = 1, top_interval: float = 2,
+                 store_interval: float = 300, memory_interval: float = 5, engine: str = 'auto', workers: int = 0,
+                 use_netlink: bool = True, agent_address: Optional[str] = None,
+                 metrics_address: Optional[str] = None,
+                 retention: Optional[Dict[str, Optional[float]]] = None):
+        self.process_manager = ProcessManager(engine, workers)
+        self.db_manager = DatabaseManager(db_path, retention=retention)
+        self.event_storage = DataStorage(db_path)
+        self.use_netlink = use_netlink
+        self._stop_event = threading.Event()
+
+        self.scheduler = SamplingScheduler()
+        self.scheduler.add('system', system_interval, self.process_manager.update_system)
+        self.scheduler.add('top', top_interval, self.process_manager.refresh_top,
+                           run_immediately=False)
+        self.scheduler.add('scan', scan_interval, self.process_manager.scan_all)
+        if self.process_manager.cgroups.available():
+            self.scheduler.add('cgroups', top_interval, self.process_manager.update_cgroups,
+                               run_immediately=False)
+        # PSS/USS breakdowns are expensive; the cache bounds how many are re-read per run
+        self.scheduler.add('memory', memory_interval, self.process_manager.update_memory,
+                           run_immediately=False)
+        self.store_interval = store_interval
+        if store_interval > 0:
+            # The first store waits a full interval so rates have a baseline
+            self.scheduler.add('store', store_interval, self.store, run_immediately=False)
+
+        self.agent = None
+        if agent_address:
+            # Imported here so plain collection never pulls in the socket server
+            from src.core.remote import RemoteAgent
+            self.agent = RemoteAgent(self.process_manager, agent_address)
+
+        self.metrics = None
+        if metrics_address:
+            from src.core.metrics_exporter import MetricsExporter, MetricsServer
+            host, _, port = metrics_address.rpartition(':')
+            self.metrics = MetricsServer(MetricsExporter(self.process_manager),
+                                         host or '127.0.0.1', int(port))
+
+    def store(self) -> None:
+        snapshot = self.process_manager.snapshot
+        stats = self.process_manager.system_stats
+        self.db_manager.store_snapshot(self.process_manager.select(snapshot))
+        self.db_manager.store_system_data({
+            'cpu_percent': stats.cpu_percent,
+            'memory_percent': stats.memory_percent,
+            'disk_percent': stats.disk_percent,
+            'total_processes': len(snapshot),
+        })
+
+    def _handle_signal(self, signum, frame) -> None:
+        self._stop_event.set()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        previous = {}
+        for name in ('SIGINT', 'SIGTERM'):
+            signum = getattr(signal, name, None)
+            if signum is not None:
+                previous[signum] = signal.signal(signum, self._handle_signal)
+
+        lifecycle = self.process_manager.lifecycle
+        lifecycle.subscribe(self.event_storage.log_process_event)
+        source = lifecycle.start(self.use_netlink)
+        print(f"TaskMaster daemon started (process events: {source})")
+        if self.agent is not None:
+            self.agent.start()
+            print(f"Serving remote clients on {self.agent.address}")
+        if self.metrics is not None:
+            self.metrics.start()
+            print(f"Serving metrics on http://{self.metrics.address}/metrics")
+
+        try:
+            self.scheduler.run(self._stop_event)
+        finally:
+            if self.agent is not None:
+                self.agent.stop()
+            if self.metrics is not None:
+                self.metrics.stop()
+            lifecycle.stop()
+            lifecycle.unsubscribe(self.event_storage.log_process_event)
+            if self.store_interval > 0:
+                # Keep what was collected since the last store
+                self.store()
+            self.event_storage.close()
+            self.db_manager.close()
+            self.process_manager.close()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+            print("TaskMaster daemon stopped")
+
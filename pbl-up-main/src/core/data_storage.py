@@ -1,170 +1,116 @@
-import sqlite3
-import os
 import json
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Tuple
 
-class DataStorage:
+from src.core.storage_engine import StorageEngine, now_ms, to_ms
 
-    def __init__(self, db_path: str = "data/taskmaster.db"):
-        self.db_path = db_path
+class DataStorage:
+    """Event and snapshot log, written through the database's StorageEngine.
 
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    log_* calls stamp the row and queue it; the engine's writer thread
+    group-commits queued rows once batch_size are pending or flush_interval
+    seconds after the first one. The queue is bounded, so a stalled disk
+    slows producers down instead of growing memory without limit. Rows
+    still queued are lost if the process dies before close() or flush().
+    See StorageEngine for durability.
+    """
 
-        self._init_db()
+    DURABILITY = StorageEngine.DURABILITY
 
-    def _init_db(self) -> None:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def __init__(self, db_path: str = "data/taskmaster.db", durability: str = 'normal',
+                 batch_size: int = 500, flush_interval: float = 1.0, max_queue: int = 10000):
+        self.db_path = db_path
+        self.engine = StorageEngine.open(db_path, durability, batch_size, flush_interval, max_queue)
+        self._closed = False
 
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS system_snapshots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT NOT NULL,
-            cpu_percent REAL,
-            memory_percent REAL,
-            disk_percent REAL,
-            data JSON
-        )
-        ''')
-
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS process_snapshots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT NOT NULL,
-            pid INTEGER,
-            name TEXT,
-            cpu_percent REAL,
-            memory_mb REAL,
-            threads INTEGER,
-            data JSON
-        )
-        ''')
-
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS events (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT NOT NULL,
-            event_type TEXT,
-            description TEXT,
-            data JSON
-        )
-        ''')
+    def flush(self) -> None:
+        """Block until everything logged so far is committed."""
+        self.engine.flush()
 
-        conn.commit()
-        conn.close()
+    def close(self) -> None:
+        """Commit what is queued and release the engine."""
+        if not self._closed:
+            self._closed = True
+            self.engine.release()
 
     def log_system_snapshot(self, system_data: Dict[str, Any]) -> None:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        timestamp = datetime.now().isoformat()
-        cpu_percent = system_data.get('cpu_percent', 0)
-        memory_percent = system_data.get('memory_percent', 0)
-        disk_percent = system_data.get('disk_percent', 0)
-        data_json = json.dumps(system_data)
-
-        cursor.execute(
-            '''
-            INSERT INTO system_snapshots
-            (timestamp, cpu_percent, memory_percent, disk_percent, data)
-            VALUES (?, ?, ?, ?, ?)
-            ''',
-            (timestamp, cpu_percent, memory_percent, disk_percent, data_json)
-        )
-
-        conn.commit()
-        conn.close()
+        self.engine.submit(self.engine.insert_system, (
+            now_ms(),
+            system_data.get('cpu_percent', 0),
+            system_data.get('memory_percent', 0),
+            system_data.get('disk_percent', 0),
+            system_data.get('total_processes'),
+            json.dumps(system_data),
+        ))
 
     def log_process_snapshot(self, process_data: Dict[str, Any]) -> None:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        timestamp = datetime.now().isoformat()
-        pid = process_data.get('pid', 0)
-        name = process_data.get('name', '')
-        cpu_percent = process_data.get('cpu_percent', 0)
-        memory_mb = process_data.get('memory_mb', 0)
-        threads = process_data.get('threads', 0)
-        data_json = json.dumps(process_data)
-
-        cursor.execute(
-            '''
-            INSERT INTO process_snapshots
-            (timestamp, pid, name, cpu_percent, memory_mb, threads, data)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''',
-            (timestamp, pid, name, cpu_percent, memory_mb, threads, data_json)
+        row = (
+            process_data.get('pid', 0),
+            to_ms(process_data.get('create_time', 0)),
+            process_data.get('name', ''),
+            process_data.get('cpu_percent', 0),
+            process_data.get('memory_mb', 0),
+            process_data.get('threads', 0),
+            process_data.get('status'),
+            process_data.get('username'),
+            json.dumps(process_data),
         )
-
-        conn.commit()
-        conn.close()
+        self.engine.submit(self.engine.insert_processes, (now_ms(), [row]))
 
     def log_event(self, event_type: str, description: str, data: Dict[str, Any] = None) -> None:
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        timestamp = datetime.now().isoformat()
         data_json = json.dumps(data) if data else '{}'
+        self.engine.submit(self.engine.insert_event, (now_ms(), event_type, description, data_json))
 
-        cursor.execute(
-            '''
-            INSERT INTO events
-            (timestamp, event_type, description, data)
-            VALUES (?, ?, ?, ?)
-            ''',
-            (timestamp, event_type, description, data_json)
+    def log_process_event(self, event) -> None:
+        self.log_event(
+            f"process_{event.kind}",
+            f"{event.name} (PID {event.pid}) {event.kind}",
+            event.to_dict()
         )
 
-        conn.commit()
-        conn.close()
+    def _query(self, base: str, branch: str, order: str, params: Tuple,
+               start: int) -> List[Dict[str, Any]]:
+        # Queued behind pending writes, so readers see their own writes
+        return self.engine.call(self._read, base, branch, order, params, start)
 
-    def get_system_history(self, hours: int = 24) -> List[Dict[str, Any]]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def _read(self, base: str, branch: str, order: str, params: Tuple,
+              start: int) -> List[Dict[str, Any]]:
+        union, params = self.engine.union(base, branch, params, start)
+        if union is None:
+            return []
+        results = []
+        for row in self.engine.query(f'SELECT * FROM ({union}) ORDER BY {order}', params):
+            data = dict(row)
+            data['data'] = json.loads(data['data']) if data['data'] else {}
+            results.append(data)
+        return results
 
-        timestamp_limit = (datetime.now() - datetime.timedelta(hours=hours)).isoformat()
+    def get_system_history(self, hours: int = 24) -> List[Dict[str, Any]]:
+        timestamp_limit = to_ms((datetime.now() - timedelta(hours=hours)).timestamp())
 
-        cursor.execute(
+        return self._query(
+            'system_samples',
             '''
-            SELECT * FROM system_snapshots
+            SELECT * FROM {table}
             WHERE timestamp > ?
-            ORDER BY timestamp
             ''',
-            (timestamp_limit,)
+            'timestamp',
+            (timestamp_limit,),
+            timestamp_limit
         )
 
-        results = []
-        for row in cursor.fetchall():
-            data = dict(row)
-            data['data'] = json.loads(data['data'])
-            results.append(data)
-
-        conn.close()
-        return results
-
     def get_process_history(self, pid: int, hours: int = 24) -> List[Dict[str, Any]]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        timestamp_limit = (datetime.now() - datetime.timedelta(hours=hours)).isoformat()
+        timestamp_limit = to_ms((datetime.now() - timedelta(hours=hours)).timestamp())
 
-        cursor.execute(
+        return self._query(
+            'process_samples',
             '''
-            SELECT * FROM process_snapshots
-            WHERE pid = ? AND timestamp > ?
-            ORDER BY timestamp
+            SELECT p.timestamp, p.pid, p.start_time, n.name, p.cpu_percent, p.memory_mb,
+                   p.threads, p.data
+            FROM {table} p LEFT JOIN names n ON n.id = p.name_id
+            WHERE p.pid = ? AND p.timestamp > ?
             ''',
-            (pid, timestamp_limit)
+            'timestamp',
+            (pid, timestamp_limit),
+            timestamp_limit
         )
-
-        results = []
-        for row in cursor.fetchall():
-            data = dict(row)
-            data['data'] = json.loads(data['data'])
-            results.append(data)
-
-        conn.close()
-        return results
@@ -1,219 +1,252 @@
 import sqlite3
-import os
-import pandas as pd
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 
-class DatabaseManager:
+from src.core.storage_engine import ROLLUP_TIERS, StorageEngine, now_ms, to_ms
 
-    def __init__(self, db_path: str = "data/taskmaster.db"):
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+if TYPE_CHECKING:
+    import pandas as pd
 
-        self.db_path = db_path
-        self.conn = None
-        self.initialize_database()
+def _pandas():
+    # pandas costs a large share of start-up time, so it is only imported
+    # when history is first read
+    import pandas
+    return pandas
 
-    def initialize_database(self) -> None:
-        try:
-            self.conn = sqlite3.connect(self.db_path)
-            cursor = self.conn.cursor()
-
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS process_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                pid INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                cpu_percent REAL,
-                memory_mb REAL,
-                status TEXT,
-                username TEXT
-            )
-            ''')
-
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS system_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                cpu_percent REAL,
-                memory_percent REAL,
-                disk_percent REAL,
-                total_processes INTEGER
-            )
-            ''')
+def _local_times(pd, millis: 'pd.Series') -> 'pd.Series':
+    # Stored as epoch milliseconds; shown as naive local time like before
+    offset = datetime.now().astimezone().utcoffset()
+    return pd.to_datetime(millis, unit='ms') + offset
 
-            self.conn.commit()
-        except sqlite3.Error as e:
-            print(f"Database initialization error: {e}")
+class DatabaseManager:
+    """Process and system history, stored through the database's StorageEngine.
 
-    def store_process_data(self, processes: List[Dict[str, Any]]) -> None:
-        if not self.conn:
-            self.initialize_database()
+    store_* calls only queue a job for the engine's writer thread, which
+    owns the connection and group-commits. The queue is bounded: with
+    block=True a full queue makes the caller wait, with block=False the
+    sample is dropped and False returned, which is what a GUI timer wants.
+    Reads run on the writer thread too and wait for their result, so they
+    see every store made before them.
 
-        try:
-            cursor = self.conn.cursor()
-            timestamp = datetime.now().isoformat()
-
-            for process in processes:
-                cursor.execute('''
-                INSERT INTO process_history
-                (timestamp, pid, name, cpu_percent, memory_mb, status, username)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    timestamp,
-                    process.get('pid', 0),
-                    process.get('name', ''),
-                    process.get('cpu_percent', 0.0),
-                    process.get('memory_mb', 0.0),
-                    process.get('status', ''),
-                    process.get('username', '')
-                ))
-
-            self.conn.commit()
-        except sqlite3.Error as e:
-            print(f"Error storing process data: {e}")
-
-    def store_system_data(self, system_data: Dict[str, Any]) -> None:
-        if not self.conn:
-            self.initialize_database()
+    retention maps retention classes ('raw', 'events', '1m', '1h') to days
+    kept, overriding RETENTION_DAYS for an engine this opens.
+    """
 
-        try:
-            cursor = self.conn.cursor()
-            timestamp = datetime.now().isoformat()
-
-            cursor.execute('''
-            INSERT INTO system_history
-            (timestamp, cpu_percent, memory_percent, disk_percent, total_processes)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (
-                timestamp,
-                system_data.get('cpu_percent', 0.0),
-                system_data.get('memory_percent', 0.0),
-                system_data.get('disk_percent', 0.0),
-                system_data.get('total_processes', 0)
-            ))
-
-            self.conn.commit()
-        except sqlite3.Error as e:
-            print(f"Error storing system data: {e}")
+    def __init__(self, db_path: str = "data/taskmaster.db", max_pending: int = 10000,
+                 retention: Optional[Dict[str, Optional[float]]] = None):
+        self.db_path = db_path
+        self.engine = StorageEngine.open(db_path, max_pending=max_pending, retention=retention)
+        self._closed = False
+
+    def store_process_data(self, processes: List[Dict[str, Any]], block: bool = True) -> bool:
+        rows = [
+            (
+                process.get('pid', 0),
+                to_ms(process.get('create_time', 0)),
+                process.get('name', ''),
+                process.get('cpu_percent', 0.0),
+                process.get('memory_mb', 0.0),
+                process.get('threads'),
+                process.get('status', ''),
+                process.get('username', ''),
+                None,
+            )
+            for process in processes
+        ]
+        return self.engine.submit(self.engine.insert_processes, (now_ms(), rows), block)
+
+    def store_snapshot(self, snapshot, block: bool = True) -> bool:
+        # Snapshots are immutable, so the rows are built on the writer thread
+        return self.engine.submit(self._insert_snapshot, (snapshot,), block)
+
+    def _insert_snapshot(self, snapshot) -> None:
+        names, users, states = snapshot.names, snapshot.users, snapshot.states
+        rows = [
+            (pid, to_ms(create_time), names[name_id], cpu, rss / (1024 * 1024), threads,
+             states[state], users[user_id], None)
+            for pid, create_time, name_id, cpu, rss, threads, state, user_id in zip(
+                snapshot['pid'].tolist(), snapshot['create_time'].tolist(),
+                snapshot['name_id'].tolist(), snapshot['cpu_percent'].tolist(),
+                snapshot['rss'].tolist(), snapshot['num_threads'].tolist(),
+                snapshot['state'].tolist(), snapshot['user_id'].tolist())
+        ]
+        self.engine.insert_processes(to_ms(snapshot.timestamp), rows)
+
+    def store_system_data(self, system_data: Dict[str, Any], block: bool = True) -> bool:
+        return self.engine.submit(self.engine.insert_system, (
+            now_ms(),
+            system_data.get('cpu_percent', 0.0),
+            system_data.get('memory_percent', 0.0),
+            system_data.get('disk_percent', 0.0),
+            system_data.get('total_processes', 0),
+            None,
+        ), block)
+
+    def flush(self) -> None:
+        """Wait until every queued store is committed."""
+        self.engine.flush()
 
     def get_process_history(self, pid: Optional[int] = None,
-                           limit: int = 100) -> pd.DataFrame:
-        if not self.conn:
-            self.initialize_database()
+                           limit: int = 100) -> 'pd.DataFrame':
+        return self.engine.call(self._read_process_history, pid, limit)
+
+    def _read_process_history(self, pid: Optional[int], limit: int) -> 'pd.DataFrame':
+        pd = _pandas()
 
         try:
-            query = "SELECT * FROM process_history"
+            branch = """
+            SELECT p.timestamp, p.pid, p.start_time, n.name, p.cpu_percent, p.memory_mb,
+                   p.status, u.name AS username
+            FROM {table} p
+            LEFT JOIN names n ON n.id = p.name_id
+            LEFT JOIN users u ON u.id = p.user_id
+            """
             params = []
 
             if pid is not None:
-                query += " WHERE pid = ?"
+                branch += " WHERE p.pid = ?"
                 params.append(pid)
 
-            query += " ORDER BY timestamp DESC LIMIT ?"
+            # Each partition contributes at most limit rows, read through its time index
+            branch += " ORDER BY p.timestamp DESC LIMIT ?"
             params.append(limit)
 
-            df = pd.read_sql_query(query, self.conn, params=params)
+            union, params = self.engine.union('process_samples', branch, params)
+            if union is None:
+                return pd.DataFrame()
+            query = f"SELECT * FROM ({union}) ORDER BY timestamp DESC LIMIT ?"
+
+            df = pd.read_sql_query(query, self.engine.conn, params=params + [limit])
 
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df['timestamp'] = _local_times(pd, df['timestamp'])
 
             return df
         except (sqlite3.Error, pd.errors.DatabaseError) as e:
             print(f"Error retrieving process history: {e}")
             return pd.DataFrame()
 
-    def get_system_history(self, hours: int = 24) -> pd.DataFrame:
-        if not self.conn:
-            self.initialize_database()
+    def get_system_history(self, hours: int = 24) -> 'pd.DataFrame':
+        return self.engine.call(self._read_system_history, hours)
+
+    def _read_system_history(self, hours: int) -> 'pd.DataFrame':
+        pd = _pandas()
 
         try:
-            time_limit = (datetime.now() - pd.Timedelta(hours=hours)).isoformat()
+            time_limit = to_ms((datetime.now() - timedelta(hours=hours)).timestamp())
 
-            query = """
-            SELECT * FROM system_history
+            union, params = self.engine.union('system_samples', """
+            SELECT timestamp, cpu_percent, memory_percent, disk_percent, total_processes
+            FROM {table}
             WHERE timestamp > ?
-            ORDER BY timestamp
-            """
+            """, [time_limit], time_limit)
+            if union is None:
+                return pd.DataFrame()
+            query = f"SELECT * FROM ({union}) ORDER BY timestamp"
 
-            df = pd.read_sql_query(query, self.conn, params=[time_limit])
+            df = pd.read_sql_query(query, self.engine.conn, params=params)
 
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df['timestamp'] = _local_times(pd, df['timestamp'])
 
             return df
         except (sqlite3.Error, pd.errors.DatabaseError) as e:
             print(f"Error retrieving system history: {e}")
             return pd.DataFrame()
 
-    def get_top_processes_by_cpu(self, limit: int = 5) -> pd.DataFrame:
-        if not self.conn:
-            self.initialize_database()
+    def get_top_processes_by_cpu(self, limit: int = 5) -> 'pd.DataFrame':
+        return self.engine.call(self._read_top_processes_by_cpu, limit)
+
+    def _read_top_processes_by_cpu(self, limit: int) -> 'pd.DataFrame':
+        pd = _pandas()
 
         try:
-            query = """
-            SELECT name, AVG(cpu_percent) as avg_cpu,
-                   AVG(memory_mb) as avg_memory,
-                   COUNT(*) as count
-            FROM process_history
-            GROUP BY name
+            # From the hourly rollups, which outlive raw samples and hold far fewer rows
+            union, params = self.engine.union('process_rollup_1h', """
+            SELECT name_id, SUM(cpu_sum) AS cpu_total, SUM(memory_sum) AS memory_total,
+                   SUM(count) AS samples
+            FROM {table}
+            GROUP BY name_id
+            """)
+            if union is None:
+                return pd.DataFrame()
+            query = f"""
+            SELECT n.name, SUM(r.cpu_total) * 1.0 / SUM(r.samples) as avg_cpu,
+                   SUM(r.memory_total) * 1.0 / SUM(r.samples) as avg_memory,
+                   SUM(r.samples) as count
+            FROM ({union}) r JOIN names n ON n.id = r.name_id
+            GROUP BY r.name_id
             ORDER BY avg_cpu DESC
             LIMIT ?
             """
 
-            df = pd.read_sql_query(query, self.conn, params=[limit])
+            df = pd.read_sql_query(query, self.engine.conn, params=params + [limit])
             return df
         except (sqlite3.Error, pd.errors.DatabaseError) as e:
             print(f"Error retrieving top processes: {e}")
             return pd.DataFrame()
 
-    def get_process_trend(self, process_name: str) -> pd.DataFrame:
-        if not self.conn:
-            self.initialize_database()
+    # Trends default to at most about this many points, and never finer than DEFAULT_RESOLUTION
+    MAX_POINTS = 1000
+    DEFAULT_RESOLUTION = 300
+
+    def _resolution_ms(self, hours: Optional[float], resolution: Optional[float]) -> int:
+        if resolution is None:
+            resolution = self.DEFAULT_RESOLUTION
+            wanted = hours * 3600 / self.MAX_POINTS if hours is not None else 0
+            if wanted > resolution:
+                # Round up to a tier's bucket, so the query reads that tier as is
+                sizes = [size / 1000 for _, size in ROLLUP_TIERS if size / 1000 >= wanted]
+                resolution = min(sizes) if sizes else wanted
+        return max(1, to_ms(resolution))
+
+    def get_process_trend(self, process_name: str, hours: Optional[float] = None,
+                          resolution: Optional[float] = None) -> 'pd.DataFrame':
+        """CPU and memory of all processes named process_name, per resolution seconds.
+
+        Reads the coarsest rollup tier that still resolves the requested
+        buckets, so long ranges cost a few rows per bucket rather than a
+        scan of every raw sample. hours=None covers all history.
+        """
+        return self.engine.call(self._read_trend, 'process', process_name, hours,
+                                self._resolution_ms(hours, resolution))
+
+    def get_system_trend(self, hours: Optional[float] = 24,
+                         resolution: Optional[float] = None) -> 'pd.DataFrame':
+        """System CPU, memory and disk usage per resolution seconds, like get_process_trend."""
+        return self.engine.call(self._read_trend, 'system', None, hours,
+                                self._resolution_ms(hours, resolution))
+
+    def _read_trend(self, table: str, process_name: Optional[str], hours: Optional[float],
+                    resolution_ms: int) -> 'pd.DataFrame':
+        pd = _pandas()
 
         try:
-            query = """
-            SELECT timestamp, cpu_percent, memory_mb
-            FROM process_history
-            WHERE name = ?
-            ORDER BY timestamp
-            """
-
-            df = pd.read_sql_query(query, self.conn, params=[process_name])
+            end = now_ms() + 1
+            start = end - to_ms(hours * 3600) if hours is not None else 0
+            query, params, _ = self.engine.trend_query(table, resolution_ms, start, end,
+                                                       process_name)
+            if query is None:
+                return pd.DataFrame()
 
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df = pd.read_sql_query(query, self.engine.conn, params=params)
 
-            if not df.empty:
-                df = df.set_index('timestamp')
-                df = df.resample('5T').mean().reset_index()
+            df['timestamp'] = _local_times(pd, df['timestamp'])
 
             return df
         except (sqlite3.Error, pd.errors.DatabaseError) as e:
-            print(f"Error retrieving process trend: {e}")
+            print(f"Error retrieving {table} trend: {e}")
             return pd.DataFrame()
 
-    def cleanup_old_data(self, days: int = 7) -> None:
-        if not self.conn:
-            self.initialize_database()
-
-        try:
-            time_limit = (datetime.now() - pd.Timedelta(days=days)).isoformat()
-
-            cursor = self.conn.cursor()
-
-            cursor.execute(
-                "DELETE FROM process_history WHERE timestamp < ?",
-                [time_limit]
-            )
-
-            cursor.execute(
-                "DELETE FROM system_history WHERE timestamp < ?",
-                [time_limit]
-            )
+    def cleanup_old_data(self, days: Optional[float] = None) -> None:
+        """Drop whole partitions past retention; days overrides the raw samples' retention.
 
-            self.conn.commit()
-        except sqlite3.Error as e:
-            print(f"Error cleaning up old data: {e}")
+        The engine already does this as each new day of samples starts, so
+        this is only needed to apply a shorter retention right away.
+        """
+        self.engine.submit(self.engine.apply_retention,
+                           ({'raw': days} if days is not None else None,))
 
     def close(self) -> None:
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        """Commit what is queued and release the engine."""
+        if not self._closed:
+            self._closed = True
+            self.engine.release()
@@ -0,0 +1,268 @@
+"""
+Process lifecycle module for TaskMaster.
+Emits "started" and "exited" events from the Linux proc connector or from snapshot diffs.
+"""
+
+import errno
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.core.snapshot import ProcessSnapshot
+
+# Linux proc connector (see linux/connector.h and linux/cn_proc.h)
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+NLMSG_DONE = 3
+PROC_EVENT_FORK = 0x00000001
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_EXIT = 0x80000000
+
+NLMSG_HEADER = struct.Struct('=IHHII')
+CN_MSG_HEADER = struct.Struct('=IIIIHH')
+PROC_EVENT_HEADER = struct.Struct('=IIQ')
+
+# Final counters reported with an exit event when the process was in a snapshot
+EXIT_COUNTERS = ('cpu_time', 'rss', 'read_bytes', 'write_bytes', 'num_threads')
+
+
+class ProcessEvent:
+    __slots__ = ('kind', 'pid', 'ppid', 'name', 'create_time', 'timestamp', 'counters')
+
+    STARTED = 'started'
+    EXITED = 'exited'
+
+    def __init__(self, kind: str, pid: int, ppid: int, name: str, create_time: float,
+                 timestamp: float, counters: Optional[Dict[str, Any]] = None):
+        self.kind = kind
+        self.pid = pid
+        self.ppid = ppid
+        self.name = name
+        self.create_time = create_time
+        self.timestamp = timestamp
+        self.counters = counters or {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'kind': self.kind,
+            'pid': self.pid,
+            'ppid': self.ppid,
+            'name': self.name,
+            'create_time': self.create_time,
+            'timestamp': self.timestamp,
+            'counters': self.counters,
+        }
+
+
+class LifecycleMonitor:
+    """Publishes process start/exit events to subscribers.
+
+    With the proc connector (root or CAP_NET_ADMIN) every fork, exec and
+    exit is seen, including processes that live shorter than a scan. Without
+    it, events come from diffing consecutive snapshots. Subscribers are called
+    on the thread that detected the event.
+
+    If the kernel drops connector messages (ENOBUFS, e.g. during a fork
+    storm), the next snapshot is diffed against the last one before the loss
+    to recover missed events. If the connector fails otherwise, the monitor
+    falls back to snapshot diffing for good.
+    """
+
+    def __init__(self, proc_path: str = '/proc'):
+        self.proc_path = proc_path
+        self.source = 'diff'
+        self._subscribers: List[Callable[[ProcessEvent], None]] = []
+        self._snapshot: Optional[ProcessSnapshot] = None
+        self._socket = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+        # pid -> (ppid, name, create_time) for processes seen via the connector
+        self._known: Dict[int, Tuple[int, str, float]] = {}
+        # Pids with connector events since the last snapshot, and the snapshot
+        # to diff against once messages were lost
+        self._connector_pids: Set[int] = set()
+        self._resync: Optional[ProcessSnapshot] = None
+        # Connector timestamps are CLOCK_MONOTONIC nanoseconds
+        self._clock_offset = time.time() - time.monotonic()
+
+    def subscribe(self, callback: Callable[[ProcessEvent], None]) -> None:
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ProcessEvent], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _emit(self, event: ProcessEvent) -> None:
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in process event subscriber: {e}")
+
+    def start(self, use_netlink: bool = True) -> str:
+        if use_netlink and self._socket is None:
+            try:
+                self._socket = self._open_connector()
+            except (OSError, AttributeError):
+                # Needs Linux and CAP_NET_ADMIN; snapshot diffing still works
+                self._socket = None
+
+        if self._socket is not None:
+            self.source = 'netlink'
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._read_connector, name='proc-connector',
+                                            daemon=True)
+            self._thread.start()
+        return self.source
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._socket is not None:
+            try:
+                self._socket.send(self._control_message(PROC_CN_MCAST_IGNORE))
+            except OSError:
+                pass
+        self._close_connector()
+
+    def _close_connector(self) -> None:
+        sock, self._socket = self._socket, None
+        if sock is not None:
+            sock.close()
+        self.source = 'diff'
+        self._resync = None
+
+    def process_snapshot(self, old: Optional[ProcessSnapshot], new: ProcessSnapshot) -> None:
+        self._snapshot = new
+        # Processes the connector did report are skipped, so they are not announced twice
+        reported, self._connector_pids = self._connector_pids, set()
+        if self.source == 'netlink':
+            baseline, self._resync = self._resync, None
+            if baseline is not None and len(baseline):
+                self._diff(baseline, new, reported)
+            return
+        if old is None or not len(old):
+            return
+        self._diff(old, new, reported)
+
+    def _diff(self, old: ProcessSnapshot, new: ProcessSnapshot, skip: Set[int] = frozenset()) -> None:
+        old_keys = dict(zip(zip(old['pid'].tolist(), old['create_time'].tolist()), range(len(old))))
+        new_keys = dict(zip(zip(new['pid'].tolist(), new['create_time'].tolist()), range(len(new))))
+        now = time.time()
+
+        for key, index in old_keys.items():
+            if key not in new_keys and key[0] not in skip:
+                self._emit(self._event_from_row(ProcessEvent.EXITED, old, index, now))
+        for key, index in new_keys.items():
+            if key not in old_keys and key[0] not in skip:
+                self._emit(self._event_from_row(ProcessEvent.STARTED, new, index, now))
+
+    def _event_from_row(self, kind: str, snapshot: ProcessSnapshot, index: int,
+                        timestamp: float) -> ProcessEvent:
+        counters = {}
+        if kind == ProcessEvent.EXITED:
+            counters = {name: snapshot[name][index].item() for name in EXIT_COUNTERS}
+        return ProcessEvent(kind, int(snapshot['pid'][index]), int(snapshot['ppid'][index]),
+                            snapshot.names[snapshot['name_id'][index]],
+                            float(snapshot['create_time'][index]), timestamp, counters)
+
+    def _control_message(self, op: int) -> bytes:
+        payload = struct.pack('=I', op)
+        cn_msg = CN_MSG_HEADER.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(payload), 0) + payload
+        header = NLMSG_HEADER.pack(NLMSG_HEADER.size + len(cn_msg), NLMSG_DONE, 0, 0, os.getpid())
+        return header + cn_msg
+
+    def _open_connector(self):
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+        try:
+            sock.bind((0, CN_IDX_PROC))
+            sock.send(self._control_message(PROC_CN_MCAST_LISTEN))
+            sock.settimeout(0.5)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _read_comm(self, pid: int) -> str:
+        try:
+            with open(f"{self.proc_path}/{pid}/comm", 'rb') as f:
+                return f.read().strip().decode('utf-8', 'replace')
+        except OSError:
+            return ''
+
+    def _read_connector(self) -> None:
+        while not self._stop_event.is_set():
+            sock = self._socket
+            if sock is None:
+                return
+            try:
+                data = sock.recv(4096)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if self._stop_event.is_set():
+                    return
+                if e.errno == errno.ENOBUFS:
+                    # The socket buffer overflowed and messages were dropped
+                    if self._resync is None:
+                        self._resync = self._snapshot
+                    continue
+                print(f"Process connector failed, falling back to snapshot diffs: {e}")
+                self._close_connector()
+                return
+
+            offset = 0
+            while offset + NLMSG_HEADER.size <= len(data):
+                length = NLMSG_HEADER.unpack_from(data, offset)[0]
+                if length < NLMSG_HEADER.size:
+                    break
+                self._handle_proc_event(data, offset + NLMSG_HEADER.size + CN_MSG_HEADER.size)
+                offset += (length + 3) & ~3
+
+    def _handle_proc_event(self, data: bytes, offset: int) -> None:
+        if offset + PROC_EVENT_HEADER.size + 16 > len(data):
+            return
+        what, _, timestamp_ns = PROC_EVENT_HEADER.unpack_from(data, offset)
+        body = offset + PROC_EVENT_HEADER.size
+        event_time = self._clock_offset + timestamp_ns / 1e9
+
+        if what == PROC_EVENT_FORK:
+            parent_pid, parent_tgid, child_pid, child_tgid = struct.unpack_from('=IIII', data, body)
+            if child_pid != child_tgid:
+                return  # a new thread, not a new process
+            # Until it calls exec the child runs the parent's program
+            name = self._known.get(parent_tgid, (0, self._read_comm(parent_tgid), 0.0))[1]
+            self._known[child_tgid] = (parent_tgid, name, event_time)
+            self._connector_pids.add(child_tgid)
+            self._emit(ProcessEvent(ProcessEvent.STARTED, child_tgid, parent_tgid, name,
+                                    event_time, event_time))
+
+        elif what == PROC_EVENT_EXEC:
+            pid, tgid = struct.unpack_from('=II', data, body)
+            ppid, _, create_time = self._known.get(tgid, (0, '', event_time))
+            self._known[tgid] = (ppid, self._read_comm(tgid), create_time)
+
+        elif what == PROC_EVENT_EXIT:
+            pid, tgid, exit_code, exit_signal = struct.unpack_from('=IIII', data, body)
+            if pid != tgid:
+                return  # a thread exiting
+            ppid, name, create_time = self._known.pop(tgid, (0, '', 0.0))
+            self._connector_pids.add(tgid)
+            # exit_code is the wait() status: exit status in the high byte, signal in the low bits
+            counters = {'exit_code': (exit_code >> 8) & 0xff, 'term_signal': exit_code & 0x7f}
+
+            # Enrich with the last counters scanned for this process, if any
+            snapshot = self._snapshot
+            index = snapshot.index_of(tgid) if snapshot is not None else None
+            if index is not None:
+                row = self._event_from_row(ProcessEvent.EXITED, snapshot, index, event_time)
+                ppid, name, create_time = row.ppid, name or row.name, row.create_time
+                counters.update(row.counters)
+            self._emit(ProcessEvent(ProcessEvent.EXITED, tgid, ppid, name, create_time,
+                                    event_time, counters))
@@ -0,0 +1,218 @@
+"""
+Metrics exporter module for TaskMaster.
+Serves the published system, process and cgroup state in OpenMetrics text format over HTTP.
+"""
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# SystemStats keeps memory and filesystem sizes in GB
+GB = 1024 * 1024 * 1024
+
+# (metric, help, SystemStats.disks field)
+DISK_METRICS = [
+    ('taskmaster_disk_read_iops', "Completed reads per second", 'read_iops'),
+    ('taskmaster_disk_write_iops', "Completed writes per second", 'write_iops'),
+    ('taskmaster_disk_read_bytes_per_second', "Bytes read per second", 'read_bps'),
+    ('taskmaster_disk_write_bytes_per_second', "Bytes written per second", 'write_bps'),
+    ('taskmaster_disk_await_milliseconds', "Average time per completed request", 'await_ms'),
+    ('taskmaster_disk_utilization_percent', "Time the device was busy", 'util_percent'),
+]
+
+# (metric, help, SystemStats.interfaces field)
+INTERFACE_METRICS = [
+    ('taskmaster_network_receive_bytes_per_second', "Bytes received per second", 'rx_bps'),
+    ('taskmaster_network_transmit_bytes_per_second', "Bytes sent per second", 'tx_bps'),
+    ('taskmaster_network_receive_packets_per_second', "Packets received per second", 'rx_pps'),
+    ('taskmaster_network_transmit_packets_per_second', "Packets sent per second", 'tx_pps'),
+]
+
+# (metric, help, snapshot column)
+PROCESS_METRICS = [
+    ('taskmaster_process_cpu_percent', "CPU usage of the process", 'cpu_percent'),
+    ('taskmaster_process_resident_bytes', "Resident set size", 'rss'),
+    ('taskmaster_process_read_bytes_per_second', "Bytes read per second", 'read_bps'),
+    ('taskmaster_process_write_bytes_per_second', "Bytes written per second", 'write_bps'),
+    ('taskmaster_process_threads', "Number of threads", 'num_threads'),
+]
+
+# (metric, help, cgroup field)
+CGROUP_METRICS = [
+    ('taskmaster_cgroup_cpu_percent', "CPU usage of the cgroup", 'cpu_percent'),
+    ('taskmaster_cgroup_memory_bytes', "Memory charged to the cgroup", 'memory_bytes'),
+    ('taskmaster_cgroup_io_bytes_per_second', "Bytes read and written per second", 'io_bps'),
+    ('taskmaster_cgroup_pids', "Tasks in the cgroup", 'pids'),
+]
+
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def gauge(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """Lines for one gauge family: metadata, then one sample per label set."""
+    lines = [f"# TYPE {name} gauge", f"# HELP {name} {help_text}"]
+    for labels, value in samples:
+        if labels:
+            label_text = ','.join(f'{key}="{escape_label(str(val))}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {format_value(value)}")
+        else:
+            lines.append(f"{name} {format_value(value)}")
+    return lines
+
+
+class MetricsExporter:
+    """Renders ProcessManager's published state as OpenMetrics text.
+
+    Only already-published state is read, so a scrape never triggers
+    collection. Each section is cached against the object it was rendered
+    from (SystemStats, the snapshot of one seq, the cgroup table), which
+    are replaced rather than mutated, so a section is rendered once per
+    update and scrapes in between return the cached bytes.
+
+    Label cardinality is bounded: processes are limited to the union of the
+    top_k by CPU, memory and I/O, cgroups to the top cgroup_k by CPU and
+    memory, and disks and interfaces to max_devices each.
+    """
+
+    def __init__(self, process_manager, top_k: int = 10, cgroup_k: int = 20,
+                 max_devices: int = 32):
+        self.process_manager = process_manager
+        self.top_k = top_k
+        self.cgroup_k = cgroup_k
+        self.max_devices = max_devices
+        # section -> (cache key, rendered text)
+        self._sections: Dict[str, Tuple[Any, str]] = {}
+        self._output: Tuple[Tuple[Any, ...], bytes] = ((), b'')
+
+    def _cached(self, section: str, key: Any, render) -> str:
+        cached = self._sections.get(section)
+        if cached is not None and cached[0] is key:
+            return cached[1]
+        text = render()
+        self._sections[section] = (key, text)
+        return text
+
+    def render(self) -> bytes:
+        pm = self.process_manager
+        stats = pm.system_stats
+        snapshot = pm.snapshot
+        cgroups = getattr(pm, 'cgroups', None)
+        groups = cgroups.groups if cgroups is not None else None
+
+        keys, output = self._output
+        if len(keys) == 3 and keys[0] is stats and keys[1] is snapshot and keys[2] is groups:
+            return output
+
+        parts = [
+            self._cached('system', stats, lambda: self._render_system(stats)),
+            self._cached('processes', snapshot, lambda: self._render_processes(snapshot)),
+            self._cached('cgroups', groups, lambda: self._render_cgroups(groups)),
+        ]
+        output = (''.join(parts) + '# EOF\n').encode('utf-8')
+        self._output = ((stats, snapshot, groups), output)
+        return output
+
+    def _render_system(self, stats) -> str:
+        if stats is None:
+            return ''
+        lines = []
+        lines += gauge('taskmaster_cpu_percent', "Total CPU usage", [({}, stats.cpu_percent)])
+        lines += gauge('taskmaster_cpu_core_percent', "CPU usage per logical core",
+                       [({'cpu': str(i)}, value) for i, value in enumerate(stats.per_cpu)])
+        lines += gauge('taskmaster_memory_total_bytes', "Total physical memory",
+                       [({}, stats.total_memory * GB)])
+        lines += gauge('taskmaster_memory_available_bytes', "Memory available without swapping",
+                       [({}, stats.available_memory * GB)])
+        lines += gauge('taskmaster_memory_percent', "Memory in use", [({}, stats.memory_percent)])
+        lines += gauge('taskmaster_filesystem_used_percent', "Root filesystem usage",
+                       [({}, stats.disk_percent)])
+
+        disks = sorted(stats.disks.items())[:self.max_devices]
+        for name, help_text, field in DISK_METRICS:
+            lines += gauge(name, help_text, [({'device': device}, rates[field]) for device, rates in disks])
+        interfaces = sorted(stats.interfaces.items())[:self.max_devices]
+        for name, help_text, field in INTERFACE_METRICS:
+            lines += gauge(name, help_text,
+                           [({'interface': interface}, rates[field]) for interface, rates in interfaces])
+        return '\n'.join(lines) + '\n'
+
+    def _render_processes(self, snapshot) -> str:
+        lines = gauge('taskmaster_processes', "Processes in the last scan", [({}, len(snapshot))])
+        top = self.process_manager.select(snapshot, {'cpu': self.top_k, 'rss': self.top_k,
+                                                     'io': self.top_k})
+        labels = [{'pid': str(pid), 'name': snapshot.names[name_id]}
+                  for pid, name_id in zip(top['pid'].tolist(), top['name_id'].tolist())]
+        for name, help_text, column in PROCESS_METRICS:
+            lines += gauge(name, help_text, zip(labels, top[column].tolist()))
+        return '\n'.join(lines) + '\n'
+
+    def _render_cgroups(self, groups: Optional[Dict[str, Dict[str, float]]]) -> str:
+        if not groups:
+            return ''
+        by_cpu = sorted(groups.values(), key=lambda group: group['cpu_percent'], reverse=True)
+        by_memory = sorted(groups.values(), key=lambda group: group['memory_bytes'], reverse=True)
+        selected = {group['path']: group for group in by_cpu[:self.cgroup_k] + by_memory[:self.cgroup_k]}
+        rows = [selected[path] for path in sorted(selected)]
+
+        lines = []
+        for name, help_text, field in CGROUP_METRICS:
+            lines += gauge(name, help_text,
+                           [({'cgroup': group['path'] or '(unknown)'}, group[field])
+                            for group in rows if group[field] >= 0])
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """Serves MetricsExporter.render() at /metrics on a background thread."""
+
+    def __init__(self, exporter: MetricsExporter, host: str = '127.0.0.1', port: int = 9717):
+        self.exporter = exporter
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter.render()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,127 @@
+"""
+Process identity cache for TaskMaster.
+Keeps attributes that never change while a process lives, keyed by (pid, create_time),
+and rate-limited copies of expensive per-process readings.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.core.collectors import MemoryBreakdown, ProcessSample
+
+
+class StaticAttributes:
+    __slots__ = ('create_time', 'username', 'cmdline', 'exe')
+
+    def __init__(self, create_time: float, username: str, cmdline: List[str], exe: str):
+        self.create_time = create_time
+        self.username = username
+        self.cmdline = cmdline
+        self.exe = exe
+
+
+class StaticAttributeCache:
+    """Attributes read once per process identity.
+
+    Shared by the collector and GUI threads: lookups read an entry with a
+    single get(), while stores and pruning take a lock.
+    """
+
+    def __init__(self, collector):
+        self.collector = collector
+        self._entries: Dict[int, StaticAttributes] = {}
+        self._lock = threading.Lock()
+
+    def get(self, sample: ProcessSample) -> StaticAttributes:
+        entry = self._entries.get(sample.pid)
+        # A different create_time means the PID was reused by a new process
+        if entry is None or entry.create_time != sample.create_time:
+            entry = StaticAttributes(
+                sample.create_time,
+                self.collector.username(sample.pid, sample.uid),
+                self.collector.cmdline(sample.pid),
+                self.collector.exe(sample.pid),
+            )
+            with self._lock:
+                self._entries[sample.pid] = entry
+        return entry
+
+    def peek(self, sample: ProcessSample) -> Optional[StaticAttributes]:
+        """The cached attributes of sample's process, without reading them if missing."""
+        entry = self._entries.get(sample.pid)
+        if entry is None or entry.create_time != sample.create_time:
+            return None
+        return entry
+
+    def retain(self, live: Iterable[Tuple[int, float]]) -> None:
+        live = dict(live)
+        with self._lock:
+            self._entries = {pid: entry for pid, entry in self._entries.items()
+                             if live.get(pid) == entry.create_time}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MemoryBreakdownCache:
+    """Caches PSS/USS/swap breakdowns, which are too expensive to read every tick.
+
+    An entry is reused for max_age seconds. refresh() re-reads at most budget
+    stale entries per call, the longest-unread first, so the cost per tick is
+    bounded however many processes are tracked. Like StaticAttributeCache it
+    is shared with GUI threads.
+    """
+
+    def __init__(self, collector, max_age: float = 30.0, budget: int = 10,
+                 clock: Callable[[], float] = time.monotonic):
+        self.collector = collector
+        self.max_age = max_age
+        self.budget = budget
+        self.clock = clock
+        # pid -> (create_time, read at, breakdown)
+        self._entries: Dict[int, Tuple[float, float, Optional[MemoryBreakdown]]] = {}
+        self._lock = threading.Lock()
+
+    def _read(self, pid: int, create_time: float) -> Optional[MemoryBreakdown]:
+        breakdown = self.collector.memory_breakdown(pid)
+        with self._lock:
+            self._entries[pid] = (create_time, self.clock(), breakdown)
+        return breakdown
+
+    def _age(self, pid: int, create_time: float) -> float:
+        entry = self._entries.get(pid)
+        if entry is None or entry[0] != create_time:
+            return float('inf')
+        return self.clock() - entry[1]
+
+    def peek(self, pid: int, create_time: float) -> Optional[MemoryBreakdown]:
+        entry = self._entries.get(pid)
+        if entry is None or entry[0] != create_time:
+            return None
+        return entry[2]
+
+    def get(self, pid: int, create_time: float,
+            max_age: Optional[float] = None) -> Optional[MemoryBreakdown]:
+        max_age = self.max_age if max_age is None else max_age
+        entry = self._entries.get(pid)
+        if entry is None or entry[0] != create_time or self.clock() - entry[1] > max_age:
+            return self._read(pid, create_time)
+        return entry[2]
+
+    def refresh(self, keys: Iterable[Tuple[int, float]]) -> int:
+        stale = [(age, key) for age, key in ((self._age(*key), key) for key in keys)
+                 if age > self.max_age]
+        stale.sort(reverse=True)
+        for _, (pid, create_time) in stale[:self.budget]:
+            self._read(pid, create_time)
+        return min(len(stale), self.budget)
+
+    def retain(self, live: Iterable[Tuple[int, float]]) -> None:
+        live = dict(live)
+        with self._lock:
+            self._entries = {pid: entry for pid, entry in self._entries.items()
+                             if live.get(pid) == entry[0]}
+
+    def __len__(self) -> int:
+        return len(self._entries)
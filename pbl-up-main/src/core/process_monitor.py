@@ -1,24 +1,115 @@
+import heapq
+from collections import deque
+import numpy as np
 import psutil
 import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
+
+from src.core.cgroups import CgroupMonitor
+from src.core.collectors import MemoryBreakdown, ProcessSample, get_collector
+from src.core.counter_delta import CounterDeltaEngine
+from src.core.lifecycle import LifecycleMonitor
+from src.core.parallel_collector import ParallelCollector
+from src.core.process_cache import MemoryBreakdownCache, StaticAttributeCache
+from src.core.process_tree import ProcessTree, ProcessTreeView
+from src.core.snapshot import ProcessSnapshot, SnapshotChanges, StringTable
+from src.core.system_collectors import get_system_reader
 
 class ProcessInfo:
-    def __init__(self, pid: int):
+    def __init__(self, pid: int, collector=None, sample: Optional[ProcessSample] = None,
+                 cpu_percent: Optional[float] = None,
+                 static_cache: Optional[StaticAttributeCache] = None,
+                 memory_cache: Optional[MemoryBreakdownCache] = None,
+                 total_memory: Optional[float] = None):
         self.pid = pid
-        self.process = psutil.Process(pid)
-        self.update()
+        self.collector = collector
+        # MB of memory on the process's host, if the caller knows it
+        self.total_memory = total_memory
+        if static_cache is None and collector is not None:
+            static_cache = StaticAttributeCache(collector)
+        self.static_cache = static_cache
+        self.memory_cache = memory_cache
+        self._process = None
+        self._last_cpu_time = None
+        self._last_sample_time = None
+        if sample is not None:
+            self.update_from_sample(sample, cpu_percent)
+        else:
+            self.update()
+
+    @property
+    def is_local(self) -> bool:
+        """False for a process mirrored from a remote agent, which psutil cannot reach."""
+        return getattr(self.collector, 'name', None) != 'remote'
+
+    def system_memory(self) -> float:
+        """Total memory in MB of the machine the process runs on, 0 if unknown."""
+        if self.total_memory is not None:
+            return self.total_memory
+        if self.is_local:
+            return psutil.virtual_memory().total / (1024 * 1024)
+        return 0.0
+
+    @property
+    def process(self) -> psutil.Process:
+        if self._process is None:
+            self._process = psutil.Process(self.pid)
+        return self._process
 
     def update(self) -> None:
+        if self.collector is None:
+            self._update_psutil()
+            return
+
+        sample = self.collector.read(self.pid)
+        if sample is None:
+            self.is_running = False
+            return
+        self.update_from_sample(sample)
+
+    def update_from_sample(self, sample: ProcessSample, cpu_percent: Optional[float] = None) -> None:
+        now = time.monotonic()
+
+        self.name = sample.name
+        self.status = sample.status
+        self.start_timestamp = sample.create_time
+        self.create_time = datetime.fromtimestamp(sample.create_time)
+
+        if cpu_percent is not None:
+            self.cpu_percent = cpu_percent
+        elif self._last_cpu_time is None:
+            self.cpu_percent = 0.0
+        else:
+            elapsed = now - self._last_sample_time
+            delta = sample.cpu_time - self._last_cpu_time
+            self.cpu_percent = max(delta, 0.0) / elapsed * 100 if elapsed > 0 else 0.0
+        self._last_cpu_time = sample.cpu_time
+        self._last_sample_time = now
+
+        self.memory_usage = sample.rss / (1024 * 1024)
+        self.virtual_memory_usage = sample.vms / (1024 * 1024)
+        self.num_threads = sample.num_threads
+
+        static = self.static_cache.get(sample)
+        self.username = static.username
+        self.cmdline = static.cmdline
+        self.exe = static.exe
+
+        self.is_running = True
+
+    def _update_psutil(self) -> None:
         try:
             self.name = self.process.name()
             self.status = self.process.status()
             self.username = self.process.username()
-            self.create_time = datetime.fromtimestamp(self.process.create_time())
+            self.start_timestamp = self.process.create_time()
+            self.create_time = datetime.fromtimestamp(self.start_timestamp)
 
             self.cpu_percent = self.process.cpu_percent(interval=None)
             mem_info = self.process.memory_info()
             self.memory_usage = mem_info.rss / (1024 * 1024)
+            self.virtual_memory_usage = mem_info.vms / (1024 * 1024)
 
             self.num_threads = self.process.num_threads()
 
@@ -29,6 +120,18 @@ class ProcessInfo:
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
             self.is_running = False
 
+    def memory_breakdown(self, max_age: Optional[float] = None) -> Optional[MemoryBreakdown]:
+        if self.memory_cache is not None:
+            return self.memory_cache.get(self.pid, self.start_timestamp, max_age)
+        if self.collector is not None:
+            return self.collector.memory_breakdown(self.pid)
+        try:
+            info = self.process.memory_full_info()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+        return MemoryBreakdown(info.rss, getattr(info, 'pss', -1), getattr(info, 'uss', -1),
+                               getattr(info, 'swap', -1), -1, getattr(info, 'shared', -1))
+
     def terminate(self) -> bool:
         try:
             self.process.terminate()
@@ -44,78 +147,486 @@ class ProcessInfo:
             return False
 
 
+class SystemStats(NamedTuple):
+    """One immutable reading of whole-system usage, published by SystemMonitor."""
+    timestamp: float
+    cpu_percent: float
+    per_cpu: Tuple[float, ...]
+    cpu_count: int
+    cpu_freq: Any
+    total_memory: float
+    available_memory: float
+    memory_percent: float
+    disk_total: float
+    disk_used: float
+    disk_percent: float
+    disks: Dict[str, Dict[str, float]]
+    interfaces: Dict[str, Dict[str, float]]
+    net_rx_bps: float
+    net_tx_bps: float
+    net_rx_pps: float
+    net_tx_pps: float
+
+
 class SystemMonitor:
-    def __init__(self):
-        self.update()
+    """Whole-system usage, with per-core, per-disk and per-interface rates.
 
-    def update(self) -> None:
-        self.cpu_percent = psutil.cpu_percent(interval=None)
+    Each update() builds a new SystemStats and publishes it by replacing
+    the stats reference, so readers on other threads always see one
+    complete reading. Rates are computed between consecutive update()
+    calls, so they read 0 until the second call.
+    """
+
+    def __init__(self, reader=None):
+        self.reader = reader or get_system_reader()
+        self._cpu_rates = CounterDeltaEngine(2)
+        self._disk_rates = CounterDeltaEngine(6)
+        self._net_rates = CounterDeltaEngine(4)
         self.cpu_count = psutil.cpu_count()
-        self.cpu_freq = psutil.cpu_freq()
+        self.stats: Optional[SystemStats] = None
+        self.update()
 
-        mem = psutil.virtual_memory()
-        self.total_memory = mem.total / (1024 * 1024 * 1024)
-        self.available_memory = mem.available / (1024 * 1024 * 1024)
-        self.memory_percent = mem.percent
+    def update(self) -> SystemStats:
+        now = time.monotonic()
+        cpu_percent, per_cpu = self._cpu_usage(now)
 
+        mem = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
-        self.disk_total = disk.total / (1024 * 1024 * 1024)
-        self.disk_used = disk.used / (1024 * 1024 * 1024)
-        self.disk_percent = disk.percent
+        interfaces = self._interface_rates(now)
+        # Totals leave out loopback traffic, which never touches a NIC
+        external = [rates for name, rates in interfaces.items() if name != 'lo']
+
+        self.stats = SystemStats(
+            timestamp=time.time(),
+            cpu_percent=cpu_percent,
+            per_cpu=per_cpu,
+            cpu_count=self.cpu_count,
+            cpu_freq=psutil.cpu_freq(),
+            total_memory=mem.total / (1024 * 1024 * 1024),
+            available_memory=mem.available / (1024 * 1024 * 1024),
+            memory_percent=mem.percent,
+            disk_total=disk.total / (1024 * 1024 * 1024),
+            disk_used=disk.used / (1024 * 1024 * 1024),
+            disk_percent=disk.percent,
+            disks=self._disk_rates_by_device(now),
+            interfaces=interfaces,
+            net_rx_bps=sum(rates['rx_bps'] for rates in external),
+            net_tx_bps=sum(rates['tx_bps'] for rates in external),
+            net_rx_pps=sum(rates['rx_pps'] for rates in external),
+            net_tx_pps=sum(rates['tx_pps'] for rates in external),
+        )
+        return self.stats
+
+    def _cpu_usage(self, now: float) -> Tuple[float, Tuple[float, ...]]:
+        self._cpu_rates.begin(now)
+        percents = {}
+        for cpu, counters in self.reader.cpu_times().items():
+            busy, total = self._cpu_rates.update(cpu, counters)
+            percents[cpu] = min(100.0, 100.0 * busy / total) if total > 0 else 0.0
+        self._cpu_rates.end()
+
+        overall = percents.pop('cpu', 0.0)
+        return overall, tuple(percents[cpu] for cpu in sorted(percents, key=lambda name: int(name[3:])))
+
+    def _disk_rates_by_device(self, now: float) -> Dict[str, Dict[str, float]]:
+        self._disk_rates.begin(now)
+        disks = {}
+        for device, counters in self.reader.disk_counters().items():
+            reads, writes, read_bps, write_bps, io_ms, busy_ms = \
+                self._disk_rates.update(device, counters)
+            iops = reads + writes
+            disks[device] = {
+                'read_iops': reads,
+                'write_iops': writes,
+                'read_bps': read_bps,
+                'write_bps': write_bps,
+                # Average time per completed request, queueing included
+                'await_ms': io_ms / iops if iops else 0.0,
+                'util_percent': min(100.0, busy_ms / 10.0),
+            }
+        self._disk_rates.end()
+        return disks
+
+    def _interface_rates(self, now: float) -> Dict[str, Dict[str, float]]:
+        self._net_rates.begin(now)
+        interfaces = {}
+        for interface, counters in self.reader.net_counters().items():
+            rx_bps, tx_bps, rx_pps, tx_pps = self._net_rates.update(interface, counters)
+            interfaces[interface] = {
+                'rx_bps': rx_bps,
+                'tx_bps': tx_bps,
+                'rx_pps': rx_pps,
+                'tx_pps': tx_pps,
+            }
+        self._net_rates.end()
+        return interfaces
 
-        self.net_io = psutil.net_io_counters()
+
+class PublishedState(NamedTuple):
+    """Everything ProcessManager publishes after a scan, swapped in as one reference."""
+    snapshot: ProcessSnapshot
+    selection: ProcessSnapshot
+    tree: ProcessTreeView
 
 
 class ProcessManager:
-    def __init__(self):
-        self.processes = {}
-        self.system_monitor = SystemMonitor()
+    # Metric names accepted by top()/top_many(), mapped to snapshot columns
+    TOP_METRICS = {
+        'cpu': 'cpu_percent',
+        'rss': 'rss',
+        'io': 'io_rate',
+        'read': 'read_bps',
+        'write': 'write_bps',
+        'syscalls': 'syscall_rate',
+        'ctx_vol': 'ctx_switch_vol_rate',
+        'ctx_invol': 'ctx_switch_invol_rate',
+        'threads': 'num_threads',
+        'fds': 'num_fds',
+    }
 
-    def update_all(self) -> None:
+    # Metric names accepted by top_cgroups(), mapped to cgroup usage fields
+    CGROUP_METRICS = {
+        'cpu': 'cpu_percent',
+        'rss': 'memory_bytes',
+        'io': 'io_bps',
+        'read': 'read_bps',
+        'write': 'write_bps',
+        'pids': 'pids',
+    }
+
+    # Metric names accepted by top_memory(), all read from the memory breakdown cache
+    MEMORY_METRICS = ('pss', 'uss', 'swap', 'rss')
+    # The largest-RSS processes whose breakdown is kept fresh; PSS and USS never
+    # exceed RSS, so the top processes by real memory cost are among them
+    MEMORY_CANDIDATES = 20
+
+    # Published snapshots kept for changes_since(); older sequence numbers get a reset
+    HISTORY = 32
+
+    def __init__(self, engine: str = 'auto', workers: int = 0, parallel: str = 'thread',
+                 collector=None):
+        # A given collector (e.g. a remote host's mirror) replaces local
+        # collection, and then this machine's system and cgroup monitors are
+        # not created either. Otherwise workers > 1 shards each scan across a
+        # thread or process pool
+        local = collector is None
+        if not local:
+            self.collector = collector
+        elif workers > 1:
+            self.collector = ParallelCollector(engine, workers, parallel)
+        else:
+            self.collector = get_collector(engine)
+        self.static_cache = StaticAttributeCache(self.collector)
+        self.memory_cache = MemoryBreakdownCache(self.collector)
+        self.system_monitor = SystemMonitor() if local else None
+
+        # Interned strings are append-only, so every snapshot can share them
+        self.names = StringTable()
+        self.users = StringTable()
+        self.states = StringTable()
+        self._uid_users: Dict[int, int] = {}
+        # Collection builds each snapshot off to the side and publishes it by
+        # replacing self.state, so readers on other threads never take a lock
+        # and never see a half-built view; they should read self.state once
+        # and use its fields together
+        empty = ProcessSnapshot.empty()
+        self.state = PublishedState(empty, empty, ProcessTreeView.empty())
+        self.seq = 0
+        self._history = deque([empty], maxlen=self.HISTORY)
+        # Updated in place by the collector; readers use state.tree
+        self.tree = ProcessTree()
+        # Subscribe here for process start/exit events; call lifecycle.start()
+        # to use the proc connector where permitted
+        self.lifecycle = LifecycleMonitor()
+        # Per-cgroup usage, refreshed by update_cgroups()
+        self.cgroups = CgroupMonitor() if local else None
+
+        # Processes that get detail collection each tick: the union of these top-K lists
+        self.top_requests: Dict[str, int] = {}
+        self.set_top_requests({'cpu': 50, 'rss': 20})
+        # What a withdrawn request falls back to
+        self.default_top_requests = dict(self.top_requests)
+
+        # Cumulative counters of every live process, keyed by (pid, create_time)
+        # so a reused PID never inherits the previous owner's baseline. A scan
+        # right after a top refresh reuses its rates rather than measuring
+        # over a few milliseconds
+        self._rates = CounterDeltaEngine(6, min_interval=0.5)
+
+        # Idle selected processes are refreshed every 1, 2, 4, ... top refreshes:
+        # (pid, create_time) -> [period, refreshes left to skip]
+        self._backoff: Dict[Tuple[int, float], List[int]] = {}
+
+    def set_top_requests(self, requests: Dict[str, int]) -> None:
+        for metric in requests:
+            if metric not in self.TOP_METRICS:
+                raise ValueError(f"Unknown top metric: {metric}")
+        self.top_requests = dict(requests)
+        self.collector.count_fds = 'fds' in self.top_requests
+
+    def request_top(self, metric: str, k: int, replaces: Optional[str] = None) -> None:
+        """Select at least the top k processes by metric from the next scan on.
+
+        replaces is a metric the caller requested before and no longer needs,
+        e.g. the previous sort order: it goes back to its default request, or
+        is dropped if it has none.
+        """
+        requests = dict(self.top_requests)
+        if replaces is not None and replaces != metric:
+            if replaces in self.default_top_requests:
+                requests[replaces] = self.default_top_requests[replaces]
+            else:
+                requests.pop(replaces, None)
+        requests[metric] = max(k, requests.get(metric, 0))
+        self.set_top_requests(requests)
+
+    MAX_IDLE_BACKOFF = 8
+
+    def _collect(self, pids: Optional[List[int]] = None) -> Tuple[List[ProcessSample], Dict[str, List[float]]]:
+        wall = time.time()
+        self._rates.begin(time.monotonic())
+        samples = self.collector.collect(pids)
+
+        cpu_percent, read_bps, write_bps, io_rate = [], [], [], []
+        syscall_rate, ctx_vol_rate, ctx_invol_rate = [], [], []
+        for sample in samples:
+            # Processes without a baseline are measured from their start: exact for
+            # processes started since the last scan, a lifetime average on the first scan
+            rates = self._rates.update(
+                (sample.pid, sample.create_time),
+                (sample.cpu_time, sample.read_bytes, sample.write_bytes, sample.syscalls,
+                 sample.ctx_switches_vol, sample.ctx_switches_invol),
+                age=wall - sample.create_time,
+            )
+            cpu_percent.append(rates[0] * 100)
+            read_bps.append(rates[1])
+            write_bps.append(rates[2])
+            io_rate.append(rates[1] + rates[2])
+            syscall_rate.append(rates[3])
+            ctx_vol_rate.append(rates[4])
+            ctx_invol_rate.append(rates[5])
+
+        # Only a full scan knows which processes are gone
+        full_scan = pids is None
+        self._rates.end(evict=full_scan)
+        if full_scan:
+            self.static_cache.retain(self._rates.keys())
+            self.memory_cache.retain(self._rates.keys())
+            self._backoff = {key: value for key, value in self._backoff.items() if key in self._rates}
+        return samples, {
+            'cpu_percent': cpu_percent,
+            'read_bps': read_bps,
+            'write_bps': write_bps,
+            'io_rate': io_rate,
+            'syscall_rate': syscall_rate,
+            'ctx_switch_vol_rate': ctx_vol_rate,
+            'ctx_switch_invol_rate': ctx_invol_rate,
+        }
+
+    def _user_id(self, sample: ProcessSample) -> int:
+        user_id = self._uid_users.get(sample.uid)
+        if user_id is None:
+            if sample.uid < 0:
+                # No numeric uid on this platform: the per-process name is only
+                # looked up for selected processes (see _publish), others show
+                # it once it is cached
+                attributes = self.static_cache.peek(sample)
+                return self.users.intern(attributes.username if attributes else '')
+            user_id = self.users.intern(self.collector.username(sample.pid, sample.uid))
+            self._uid_users[sample.uid] = user_id
+        return user_id
+
+    def _build_snapshot(self, samples: List[ProcessSample], derived: Dict[str, List[float]]) -> ProcessSnapshot:
+        user_ids = [self._user_id(sample) for sample in samples]
+        return ProcessSnapshot.from_samples(
+            samples, derived, user_ids, self.names, self.users, self.states, time.time())
+
+    def _publish(self, snapshot: ProcessSnapshot, notify_lifecycle: bool = True) -> None:
+        # Expensive per-process details are only loaded for the selected processes
+        indices = self.select_indices(snapshot)
+        user_ids = None
+        for index in indices.tolist():
+            attributes = self.static_cache.get(snapshot.sample(index))
+            if snapshot['uid'][index] < 0:
+                user_id = self.users.intern(attributes.username)
+                if user_id != snapshot['user_id'][index]:
+                    if user_ids is None:
+                        user_ids = snapshot['user_id'].copy()
+                    user_ids[index] = user_id
+        if user_ids is not None:
+            columns = dict(snapshot.columns, user_id=user_ids)
+            snapshot = ProcessSnapshot(columns, snapshot.names, snapshot.users, snapshot.states,
+                                       snapshot.timestamp)
+        # Numbered before the selection is taken, which copies the seq
+        self.seq += 1
+        snapshot.seq = self.seq
+        selection = snapshot.take(indices)
+
+        self.tree.update(snapshot)
+        previous = self.snapshot
+        self.state = PublishedState(snapshot, selection, self.tree.view())
+        self._history.append(snapshot)
+        if notify_lifecycle:
+            self.lifecycle.process_snapshot(previous, snapshot)
+
+    @property
+    def snapshot(self) -> ProcessSnapshot:
+        return self.state.snapshot
+
+    @property
+    def selection(self) -> ProcessSnapshot:
+        return self.state.selection
+
+    @property
+    def system_stats(self) -> Optional[SystemStats]:
+        return self.system_monitor.stats if self.system_monitor is not None else None
+
+    def update_system(self) -> None:
         self.system_monitor.update()
 
-        process_data = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent']):
-            try:
-                process_data.append((proc.info['pid'], proc.info['cpu_percent'] or 0))
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
+    def scan_all(self) -> None:
+        samples, derived = self._collect()
+        self._publish(self._build_snapshot(samples, derived))
+
+    def refresh_top(self) -> None:
+        snapshot = self.snapshot
+        if not len(snapshot):
+            self.scan_all()
+            return
+
+        selection = self.select(snapshot)
+        due = []
+        for pid, create_time in zip(selection['pid'].tolist(), selection['create_time'].tolist()):
+            backoff = self._backoff.get((pid, create_time))
+            if backoff is not None and backoff[1] > 0:
+                backoff[1] -= 1
                 continue
+            due.append(pid)
 
-        process_data.sort(key=lambda x: x[1], reverse=True)
-        top_pids = set(pid for pid, _ in process_data[:50])
+        samples, derived = self._collect(due)
+        for sample, cpu, io in zip(samples, derived['cpu_percent'], derived['io_rate']):
+            key = (sample.pid, sample.create_time)
+            period = self._backoff.get(key, [1, 0])[0]
+            period = min(period * 2, self.MAX_IDLE_BACKOFF) if cpu == 0 and io == 0 else 1
+            self._backoff[key] = [period, period - 1]
 
-        for pid in list(self.processes.keys()):
-            if pid not in top_pids or not self.processes[pid].is_running:
-                del self.processes[pid]
+        seen = set(sample.pid for sample in samples)
+        gone = [pid for pid in due if pid not in seen]
+        self._publish(snapshot.replace_rows(self._build_snapshot(samples, derived), gone))
 
-        for pid in top_pids:
-            if pid not in self.processes:
-                try:
-                    self.processes[pid] = ProcessInfo(pid)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            else:
-                self.processes[pid].update()
-
-    def get_process_list(self) -> List[Dict[str, Any]]:
-        process_list = []
-        for pid, process in self.processes.items():
-            if process.is_running:
-                process_info = {
-                    'pid': pid,
-                    'name': process.name,
-                    'status': process.status,
-                    'cpu_percent': process.cpu_percent,
-                    'memory_mb': process.memory_usage,
-                    'threads': process.num_threads,
-                    'username': process.username,
-                    'start_time': process.create_time
-                }
-                process_list.append(process_info)
-        return process_list
+    def update_cgroups(self) -> None:
+        self.cgroups.update(self.snapshot)
+
+    def _memory_candidates(self) -> ProcessSnapshot:
+        k = max(self.top_requests.get('rss', 0), self.MEMORY_CANDIDATES)
+        return self.top('rss', k)
+
+    def update_memory(self) -> None:
+        candidates = self._memory_candidates()
+        self.memory_cache.refresh(zip(candidates['pid'].tolist(), candidates['create_time'].tolist()))
+
+    def update_all(self) -> None:
+        self.update_system()
+        self.scan_all()
+
+    def changes_since(self, seq: int) -> SnapshotChanges:
+        """Rows added, removed and changed between snapshot seq and the current one."""
+        current = self.snapshot
+        for old in list(self._history):
+            if old.seq == seq:
+                return current.changes_from(old)
+
+        # Too old (or never published): everything is new
+        return SnapshotChanges(seq, current.seq, current, [], current.take(np.empty(0, np.intp)),
+                               [], reset=True)
+
+    def top(self, metric: str = 'cpu', k: int = 10,
+            snapshot: Optional[ProcessSnapshot] = None) -> ProcessSnapshot:
+        if metric not in self.TOP_METRICS:
+            raise ValueError(f"Unknown top metric: {metric}")
+        snapshot = self.snapshot if snapshot is None else snapshot
+        return snapshot.top_k(self.TOP_METRICS[metric], k)
+
+    def top_many(self, requests: Optional[Dict[str, int]] = None,
+                 snapshot: Optional[ProcessSnapshot] = None) -> Dict[str, ProcessSnapshot]:
+        requests = self.top_requests if requests is None else requests
+        snapshot = self.snapshot if snapshot is None else snapshot
+        return {metric: self.top(metric, k, snapshot) for metric, k in requests.items()}
+
+    def select_indices(self, snapshot: Optional[ProcessSnapshot] = None,
+                       requests: Optional[Dict[str, int]] = None) -> np.ndarray:
+        requests = self.top_requests if requests is None else requests
+        snapshot = self.snapshot if snapshot is None else snapshot
+
+        indices = [snapshot.top_k_indices(self.TOP_METRICS[metric], k)
+                   for metric, k in requests.items()]
+        if not indices:
+            return np.empty(0, np.intp)
+        return np.unique(np.concatenate(indices))
+
+    def select(self, snapshot: Optional[ProcessSnapshot] = None,
+               requests: Optional[Dict[str, int]] = None) -> ProcessSnapshot:
+        snapshot = self.snapshot if snapshot is None else snapshot
+        return snapshot.take(self.select_indices(snapshot, requests))
+
+    def top_subtrees(self, metric: str = 'cpu', k: int = 10,
+                     min_processes: int = 2) -> List[Dict[str, Any]]:
+        column = self.TOP_METRICS.get(metric)
+        if column not in ProcessTree.METRICS:
+            raise ValueError(f"Unknown subtree metric: {metric}")
+
+        state = self.state
+        snapshot = state.snapshot
+        subtrees = []
+        for pid, totals in state.tree.top_subtrees(column, k, min_processes):
+            index = snapshot.index_of(pid)
+            totals['pid'] = pid
+            totals['name'] = snapshot.names[snapshot['name_id'][index]] if index is not None else ''
+            subtrees.append(totals)
+        return subtrees
+
+    def top_cgroups(self, metric: str = 'cpu', k: int = 10) -> List[Dict[str, Any]]:
+        field = self.CGROUP_METRICS.get(metric)
+        if field is None:
+            raise ValueError(f"Unknown cgroup metric: {metric}")
+        groups = list(self.cgroups.groups.values())
+        return heapq.nlargest(k, groups, key=lambda group: group[field])
+
+    def top_memory(self, metric: str = 'pss', k: int = 10) -> List[Dict[str, Any]]:
+        if metric not in self.MEMORY_METRICS:
+            raise ValueError(f"Unknown memory metric: {metric}")
+
+        candidates = self._memory_candidates()
+        rows = []
+        for index, (pid, create_time) in enumerate(zip(candidates['pid'].tolist(),
+                                                       candidates['create_time'].tolist())):
+            breakdown = self.memory_cache.peek(pid, create_time)
+            if breakdown is None:
+                continue
+            rows.append({
+                'pid': pid,
+                'name': candidates.names[candidates['name_id'][index]],
+                'rss': breakdown.rss,
+                'pss': breakdown.pss,
+                'uss': breakdown.uss,
+                'swap': breakdown.swap,
+            })
+        return heapq.nlargest(k, rows, key=lambda row: row[metric])
+
+    def get_process_list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        return list(self.top('cpu', limit).rows())
 
     def get_process(self, pid: int) -> Optional[ProcessInfo]:
-        return self.processes.get(pid)
+        snapshot = self.snapshot
+        index = snapshot.index_of(pid)
+        if index is None:
+            return None
+        # A remote host's total comes from its published stats, not from this machine
+        stats = self.system_stats
+        total_memory = stats.total_memory * 1024 if stats is not None else None
+        return ProcessInfo(pid, self.collector, snapshot.sample(index),
+                           float(snapshot['cpu_percent'][index]), self.static_cache,
+                           self.memory_cache, total_memory)
 
     def terminate_process(self, pid: int) -> bool:
         process = self.get_process(pid)
@@ -128,3 +639,8 @@ class ProcessManager:
         if process:
             return process.set_priority(priority)
         return False
+
+    def close(self) -> None:
+        close = getattr(self.collector, 'close', None)
+        if close is not None:
+            close()
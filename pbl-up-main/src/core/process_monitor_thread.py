@@ -1,27 +1,42 @@
 from PyQt6.QtCore import QThread, pyqtSignal
-import time
+import threading
+
+from src.core.scheduler import SamplingScheduler
 
 class ProcessMonitorThread(QThread):
     update_complete = pyqtSignal()
+    # Carries src.core.lifecycle.ProcessEvent objects to the GUI thread
+    process_event = pyqtSignal(object)
 
-    def __init__(self, process_manager, update_interval=5):
+    def __init__(self, process_manager, update_interval=10, system_interval=1, top_interval=2,
+                 memory_interval=5):
         super().__init__()
         self.process_manager = process_manager
         self.update_interval = update_interval
-        self.running = True
+        self._stop_event = threading.Event()
 
-    def run(self):
-        while self.running:
-            try:
-                self.process_manager.update_all()
+        # System totals are cheap and sampled often, the selected top processes
+        # at a medium rate and the full process scan least often. Static process
+        # attributes are only re-read when a process identity changes.
+        self.scheduler = SamplingScheduler()
+        self.scheduler.add('system', system_interval, process_manager.update_system)
+        self.scheduler.add('top', top_interval, process_manager.refresh_top, run_immediately=False)
+        self.scheduler.add('scan', update_interval, process_manager.scan_all)
+        # Cgroup usage is read per group, so it is cheap enough for the top cadence
+        self.scheduler.add('cgroups', top_interval, process_manager.update_cgroups)
+        # PSS/USS breakdowns are expensive; the cache bounds how many are re-read per run
+        self.scheduler.add('memory', memory_interval, process_manager.update_memory)
 
-                self.update_complete.emit()
+        process_manager.lifecycle.subscribe(self.process_event.emit)
+
+    def run(self):
+        self._stop_event.clear()
+        self.scheduler.run(self._stop_event, lambda ran: self.update_complete.emit())
 
-                time.sleep(self.update_interval)
-            except Exception as e:
-                print(f"Error in process monitor thread: {e}")
-                time.sleep(1)
+    def set_interval(self, task, interval):
+        self.scheduler.set_interval(task, interval)
 
     def stop(self):
-        self.running = False
+        self.process_manager.lifecycle.unsubscribe(self.process_event.emit)
+        self._stop_event.set()
         self.wait()
@@ -0,0 +1,270 @@
+"""
+Process tree module for TaskMaster.
+Maintains a parent/child index with subtree resource totals, updated incrementally per snapshot.
+"""
+
+import heapq
+import numpy as np
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.core.snapshot import ProcessSnapshot
+
+# Guards against ppid loops (e.g. pid 0 entries) while walking up the tree
+MAX_DEPTH = 512
+
+
+class ProcessTreeView:
+    """Immutable copy of a ProcessTree's parent links and subtree totals.
+
+    ProcessTree is updated in place by the collector; a view is what gets
+    published to readers on other threads. Rows whose pid is -1 are free
+    slots left by exited processes.
+    """
+
+    def __init__(self, pids: np.ndarray, parents: np.ndarray, totals: np.ndarray):
+        for array in (pids, parents, totals):
+            array.flags.writeable = False
+        self.pids = pids
+        # -1 where the process has no parent in the tree
+        self.parents = parents
+        self.totals = totals
+        self._index: Optional[Dict[int, int]] = None
+
+    @classmethod
+    def empty(cls) -> 'ProcessTreeView':
+        return cls(np.empty(0, np.int64), np.empty(0, np.int64),
+                   np.empty((0, len(ProcessTree.METRICS))))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.pids >= 0))
+
+    def _row(self, pid: int) -> Optional[int]:
+        if self._index is None:
+            self._index = {pid: i for i, pid in enumerate(self.pids.tolist()) if pid >= 0}
+        return self._index.get(pid)
+
+    def parent(self, pid: int) -> Optional[int]:
+        row = self._row(pid)
+        if row is None or self.parents[row] < 0:
+            return None
+        return int(self.parents[row])
+
+    def children(self, pid: int) -> Set[int]:
+        return set(self.pids[self.parents == pid].tolist())
+
+    def subtree_totals(self, pid: int) -> Optional[Dict[str, float]]:
+        row = self._row(pid)
+        if row is None:
+            return None
+        # Clamp the tiny negative residue that repeated float deltas can leave behind
+        return dict(zip(ProcessTree.METRICS, np.maximum(self.totals[row], 0.0).tolist()))
+
+    def top_subtrees(self, metric: str = 'cpu_percent', k: int = 10,
+                     min_processes: int = 2, include_roots: bool = False) -> List[Tuple[int, Dict[str, float]]]:
+        column = ProcessTree.METRICS.index(metric)
+        mask = (self.pids >= 0) & (self.totals[:, 0] >= min_processes)
+        if not include_roots:
+            mask &= self.parents >= 0
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(-self.totals[rows, column], kind='stable')[:k]]
+        return [(int(self.pids[row]), self.subtree_totals(int(self.pids[row]))) for row in rows]
+
+
+class ProcessTree:
+    """Parent/child index whose subtree totals are updated in O(changed nodes x depth)."""
+
+    # Aggregated per subtree; 'processes' counts the nodes themselves
+    METRICS = ('processes', 'cpu_percent', 'rss', 'num_threads', 'io_rate')
+
+    def __init__(self):
+        self._ppid: Dict[int, int] = {}
+        self._parent: Dict[int, Optional[int]] = {}
+        self._children: Dict[int, Set[int]] = {}
+        # Children whose parent is not (yet) in the tree, keyed by their ppid
+        self._waiting: Dict[int, Set[int]] = {}
+        self._own: Dict[int, np.ndarray] = {}
+        self._total: Dict[int, np.ndarray] = {}
+
+        # The last published view, its row of each pid and its free rows, and
+        # what changed since: view() copies the arrays and rewrites only those rows
+        self._view = ProcessTreeView.empty()
+        self._rows: Dict[int, int] = {}
+        self._free_rows: List[int] = []
+        self._dirty: Set[int] = set()
+        self._removed: Set[int] = set()
+
+        # Previous snapshot, sorted by pid, used to find what changed
+        self._prev_pids = np.empty(0, np.int64)
+        self._prev_create = np.empty(0, np.float64)
+        self._prev_ppids = np.empty(0, np.int64)
+        self._prev_values = np.empty((0, len(self.METRICS)), np.float64)
+
+    def __len__(self) -> int:
+        return len(self._own)
+
+    def _values(self, snapshot: ProcessSnapshot) -> np.ndarray:
+        columns = [np.ones(len(snapshot))]
+        columns += [snapshot[metric].astype(np.float64) for metric in self.METRICS[1:]]
+        return np.column_stack(columns) if len(snapshot) else np.empty((0, len(self.METRICS)))
+
+    def _propagate(self, pid: Optional[int], delta: np.ndarray) -> None:
+        depth = 0
+        while pid is not None and depth < MAX_DEPTH:
+            self._total[pid] += delta
+            self._dirty.add(pid)
+            pid = self._parent.get(pid)
+            depth += 1
+
+    def _attach(self, pid: int, ppid: int) -> None:
+        self._ppid[pid] = ppid
+        self._dirty.add(pid)
+        if ppid in self._own and ppid != pid:
+            self._parent[pid] = ppid
+            self._children[ppid].add(pid)
+            self._propagate(ppid, self._total[pid])
+        else:
+            self._parent[pid] = None
+            self._waiting.setdefault(ppid, set()).add(pid)
+
+    def _detach(self, pid: int) -> None:
+        parent = self._parent.get(pid)
+        if parent is not None:
+            self._propagate(parent, -self._total[pid])
+            self._children[parent].discard(pid)
+        else:
+            waiting = self._waiting.get(self._ppid[pid])
+            if waiting is not None:
+                waiting.discard(pid)
+                if not waiting:
+                    del self._waiting[self._ppid[pid]]
+        self._parent[pid] = None
+
+    def _add(self, pid: int, ppid: int, values: np.ndarray) -> None:
+        self._own[pid] = values.copy()
+        self._total[pid] = values.copy()
+        self._children[pid] = set()
+
+        # Adopt children that showed up before this process did
+        for child in self._waiting.pop(pid, ()):
+            self._parent[child] = pid
+            self._dirty.add(child)
+            self._children[pid].add(child)
+            self._total[pid] += self._total[child]
+
+        self._attach(pid, ppid)
+
+    def _remove(self, pid: int) -> None:
+        self._detach(pid)
+        # Orphans wait under this pid until the next snapshot reports their new parent
+        for child in self._children.pop(pid):
+            self._parent[child] = None
+            self._waiting.setdefault(pid, set()).add(child)
+            self._dirty.add(child)
+        del self._own[pid], self._total[pid], self._parent[pid], self._ppid[pid]
+        self._removed.add(pid)
+
+    def update(self, snapshot: ProcessSnapshot) -> None:
+        order = np.argsort(snapshot['pid'], kind='stable')
+        pids = snapshot['pid'][order].astype(np.int64)
+        create = snapshot['create_time'][order]
+        ppids = snapshot['ppid'][order].astype(np.int64)
+        values = self._values(snapshot)[order]
+
+        # Align with the previous snapshot on (pid, create_time)
+        prev_n = len(self._prev_pids)
+        idx = np.searchsorted(self._prev_pids, pids)
+        idx_clipped = np.minimum(idx, max(prev_n - 1, 0))
+        if prev_n:
+            matched = (idx < prev_n) & (self._prev_pids[idx_clipped] == pids) & \
+                      (self._prev_create[idx_clipped] == create)
+        else:
+            matched = np.zeros(len(pids), bool)
+
+        prev_matched = np.zeros(prev_n, bool)
+        prev_matched[idx_clipped[matched]] = True
+
+        for i in np.flatnonzero(~prev_matched):
+            self._remove(int(self._prev_pids[i]))
+
+        reparented = matched & (self._prev_ppids[idx_clipped] != ppids) if prev_n else matched
+        for i in np.flatnonzero(reparented):
+            pid = int(pids[i])
+            self._detach(pid)
+            self._attach(pid, int(ppids[i]))
+
+        # Parents first, so children attach directly instead of waiting
+        added = np.flatnonzero(~matched)
+        for i in added[np.argsort(create[added], kind='stable')]:
+            self._add(int(pids[i]), int(ppids[i]), values[i])
+
+        if prev_n:
+            changed = matched & np.any(values != self._prev_values[idx_clipped], axis=1)
+            for i in np.flatnonzero(changed):
+                pid = int(pids[i])
+                delta = values[i] - self._own[pid]
+                self._own[pid] = values[i].copy()
+                self._propagate(pid, delta)
+
+        self._prev_pids = pids
+        self._prev_create = create
+        self._prev_ppids = ppids
+        self._prev_values = values
+
+    def view(self) -> ProcessTreeView:
+        """An immutable view of the tree, sharing the last one if nothing changed."""
+        if not self._dirty and not self._removed:
+            return self._view
+
+        # Exited processes free their rows, new ones take free rows or append
+        freed = [self._rows.pop(pid) for pid in self._removed if pid in self._rows]
+        self._free_rows.extend(freed)
+        dirty = [pid for pid in self._dirty if pid in self._total]
+        size = len(self._view.pids)
+        for pid in dirty:
+            if pid not in self._rows:
+                if self._free_rows:
+                    self._rows[pid] = self._free_rows.pop()
+                else:
+                    self._rows[pid] = size
+                    size += 1
+
+        grow = size - len(self._view.pids)
+        pids = np.concatenate([self._view.pids, np.full(grow, -1, np.int64)])
+        parents = np.concatenate([self._view.parents, np.full(grow, -1, np.int64)])
+        totals = np.concatenate([self._view.totals, np.zeros((grow, len(self.METRICS)))])
+
+        pids[freed] = -1
+        parents[freed] = -1
+        totals[freed] = 0.0
+        if dirty:
+            rows = [self._rows[pid] for pid in dirty]
+            pids[rows] = dirty
+            parents[rows] = [-1 if self._parent[pid] is None else self._parent[pid] for pid in dirty]
+            totals[rows] = [self._total[pid] for pid in dirty]
+
+        self._dirty = set()
+        self._removed = set()
+        self._view = ProcessTreeView(pids, parents, totals)
+        return self._view
+
+    def parent(self, pid: int) -> Optional[int]:
+        return self._parent.get(pid)
+
+    def children(self, pid: int) -> Set[int]:
+        return set(self._children.get(pid, ()))
+
+    def subtree_totals(self, pid: int) -> Optional[Dict[str, float]]:
+        total = self._total.get(pid)
+        if total is None:
+            return None
+        # Clamp the tiny negative residue that repeated float deltas can leave behind
+        return dict(zip(self.METRICS, np.maximum(total, 0.0).tolist()))
+
+    def top_subtrees(self, metric: str = 'cpu_percent', k: int = 10,
+                     min_processes: int = 2, include_roots: bool = False) -> List[Tuple[int, Dict[str, float]]]:
+        column = self.METRICS.index(metric)
+        candidates = (
+            (total[column], pid) for pid, total in self._total.items()
+            if total[0] >= min_processes and (include_roots or self._parent[pid] is not None)
+        )
+        return [(pid, self.subtree_totals(pid)) for _, pid in heapq.nlargest(k, candidates)]
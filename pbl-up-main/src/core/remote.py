@@ -0,0 +1,523 @@
+"""
+Remote agent module for TaskMaster.
+Streams ProcessManager snapshots over a TCP or Unix socket and mirrors them on the other side.
+"""
+
+import json
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.process_monitor import ProcessManager, SystemStats
+from src.core.snapshot import ProcessSnapshot, StringTable
+
+# Frame: magic, protocol version, frame type, payload length, then the payload
+FRAME_HEADER = struct.Struct('!2sBBI')
+MAGIC = b'TM'
+VERSION = 1
+MAX_FRAME = 64 * 1024 * 1024
+
+# Client -> agent
+SUBSCRIBE = 1
+# Agent -> client
+KEYFRAME = 2
+DELTA = 3
+SYSTEM = 4
+ERROR = 5
+
+# Snapshot frames: seq, timestamp, then string table appends, removed keys and rows
+SNAPSHOT_HEADER = struct.Struct('<Qd')
+COUNT = struct.Struct('<I')
+STRING_RANGE = struct.Struct('<II')
+
+COLUMN_NAMES = tuple(ProcessSnapshot.COLUMNS)
+# Little-endian on the wire, whatever the hosts are
+WIRE_DTYPES = {name: np.dtype(dtype).newbyteorder('<') for name, dtype in ProcessSnapshot.COLUMNS.items()}
+# Always sent: identity, tree links and what the process table shows
+REQUIRED_FIELDS = ('pid', 'create_time', 'ppid', 'state', 'name_id', 'user_id', 'uid')
+
+
+class CpuFreq(NamedTuple):
+    current: float
+    min: float
+    max: float
+
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """Turn "host:port" or "unix:/path/to/socket" into a socket family and address."""
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[5:]
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid agent address: {address}")
+    return socket.AF_INET6 if ':' in host else socket.AF_INET, (host.strip('[]'), int(port))
+
+
+def send_frame(sock: socket.socket, frame_type: int, payload: bytes) -> None:
+    sock.sendall(FRAME_HEADER.pack(MAGIC, VERSION, frame_type, len(payload)) + payload)
+
+
+class FrameReader:
+    """Reassembles frames from a byte stream that arrives in arbitrary chunks."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> Iterator[Tuple[int, bytes]]:
+        self._buffer += data
+        while len(self._buffer) >= FRAME_HEADER.size:
+            magic, version, frame_type, length = FRAME_HEADER.unpack_from(self._buffer)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Unsupported frame or protocol version")
+            if length > MAX_FRAME:
+                raise ValueError(f"Frame too large: {length} bytes")
+            end = FRAME_HEADER.size + length
+            if len(self._buffer) < end:
+                return
+            payload = bytes(self._buffer[FRAME_HEADER.size:end])
+            del self._buffer[:end]
+            yield frame_type, payload
+
+
+def _encode_strings(strings: Sequence[str]) -> bytes:
+    parts = []
+    for value in strings:
+        data = value.encode('utf-8')
+        parts.append(COUNT.pack(len(data)))
+        parts.append(data)
+    return b''.join(parts)
+
+
+def encode_snapshot(rows: ProcessSnapshot, previous: Optional[ProcessSnapshot],
+                    fields: Sequence[str], sent_strings: List[int]) -> bytes:
+    """Encode rows as a keyframe (previous is None) or as the delta from previous.
+
+    A delta carries only the removed keys and the rows whose subscribed
+    fields changed. String tables are append-only, so only the strings
+    added since the last frame are sent; sent_strings is updated in place.
+    """
+    if previous is None:
+        removed: List[Tuple[int, float]] = []
+        upserts = [rows]
+    else:
+        changes = rows.changes_from(previous)
+        subscribed = set(fields)
+        relevant = np.array([bool(subscribed.intersection(changed)) for changed in changes.changed_fields],
+                            dtype=bool)
+        removed = changes.removed
+        upserts = [changes.added, changes.changed.filter(relevant)]
+
+    parts = [SNAPSHOT_HEADER.pack(rows.seq, rows.timestamp)]
+
+    for i, table in enumerate((rows.names, rows.users, rows.states)):
+        start = sent_strings[i]
+        added = table.since(start)
+        parts.append(STRING_RANGE.pack(start, len(added)))
+        parts.append(_encode_strings(added))
+        sent_strings[i] = start + len(added)
+
+    parts.append(COUNT.pack(len(removed)))
+    parts.append(np.array([key[0] for key in removed], WIRE_DTYPES['pid']).tobytes())
+    parts.append(np.array([key[1] for key in removed], WIRE_DTYPES['create_time']).tobytes())
+
+    count = sum(len(snapshot) for snapshot in upserts)
+    mask = sum(1 << COLUMN_NAMES.index(name) for name in fields)
+    parts.append(struct.pack('<II', count, mask))
+    for name in COLUMN_NAMES:
+        if mask & (1 << COLUMN_NAMES.index(name)):
+            for snapshot in upserts:
+                parts.append(snapshot[name].astype(WIRE_DTYPES[name]).tobytes())
+    return b''.join(parts)
+
+
+class DecodedFrame(NamedTuple):
+    seq: int
+    timestamp: float
+    strings: List[Tuple[int, List[str]]]
+    removed: List[Tuple[int, float]]
+    columns: Dict[str, np.ndarray]
+    count: int
+
+
+def decode_snapshot(payload: bytes) -> DecodedFrame:
+    seq, timestamp = SNAPSHOT_HEADER.unpack_from(payload)
+    offset = SNAPSHOT_HEADER.size
+
+    strings = []
+    for _ in range(3):
+        start, count = STRING_RANGE.unpack_from(payload, offset)
+        offset += STRING_RANGE.size
+        values = []
+        for _ in range(count):
+            (length,) = COUNT.unpack_from(payload, offset)
+            offset += COUNT.size
+            values.append(payload[offset:offset + length].decode('utf-8'))
+            offset += length
+        strings.append((start, values))
+
+    (removed_count,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    pids = np.frombuffer(payload, WIRE_DTYPES['pid'], removed_count, offset)
+    offset += pids.nbytes
+    create_times = np.frombuffer(payload, WIRE_DTYPES['create_time'], removed_count, offset)
+    offset += create_times.nbytes
+    removed = list(zip(pids.tolist(), create_times.tolist()))
+
+    count, mask = struct.unpack_from('<II', payload, offset)
+    offset += 8
+    columns = {}
+    for i, name in enumerate(COLUMN_NAMES):
+        if mask & (1 << i):
+            values = np.frombuffer(payload, WIRE_DTYPES[name], count, offset)
+            offset += values.nbytes
+            columns[name] = values.astype(ProcessSnapshot.COLUMNS[name])
+    return DecodedFrame(seq, timestamp, strings, removed, columns, count)
+
+
+def encode_system_stats(stats: SystemStats) -> bytes:
+    data = stats._asdict()
+    freq = data['cpu_freq']
+    data['cpu_freq'] = [freq.current, freq.min, freq.max] if freq else None
+    return json.dumps(data).encode('utf-8')
+
+
+def decode_system_stats(payload: bytes) -> SystemStats:
+    data = json.loads(payload.decode('utf-8'))
+    data['cpu_freq'] = CpuFreq(*data['cpu_freq']) if data['cpu_freq'] else None
+    data['per_cpu'] = tuple(data['per_cpu'])
+    return SystemStats(**data)
+
+
+class RemoteAgent:
+    """Serves a ProcessManager's published state to remote clients.
+
+    Each client subscribes to a set of fields and optionally to the union
+    of some top-N lists. The first frame is a keyframe, later ones are
+    deltas against what that client was last sent. The agent only reads
+    the published state, so collection must run elsewhere (for example in
+    CollectorDaemon).
+
+    The protocol has no authentication, so listen on loopback or a Unix
+    socket and reach it through SSH or similar. A client's top-N lists
+    widen what the collector refreshes for everyone, so each N is capped
+    at MAX_TOP and a client's lists are withdrawn when it disconnects.
+    """
+
+    MAX_TOP = 200
+
+    def __init__(self, process_manager: ProcessManager, address: str, interval: float = 0.5):
+        self.process_manager = process_manager
+        self.interval = interval
+        # The collector's own top-N lists, and each connected client's
+        self._base_requests = dict(process_manager.top_requests)
+        self._client_requests: Dict[int, Dict[str, int]] = {}
+        self._requests_lock = threading.Lock()
+        family, sockaddr = parse_address(address)
+        self._listener = socket.socket(family, socket.SOCK_STREAM)
+        if family != socket.AF_UNIX:
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(sockaddr)
+        self._listener.listen()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        sockaddr = self._listener.getsockname()
+        if self._listener.family == socket.AF_UNIX:
+            return f"unix:{sockaddr}"
+        return f"{sockaddr[0]}:{sockaddr[1]}"
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._accept, name='remote-agent', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._listener.close()
+
+    def _accept(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), name='remote-client',
+                             daemon=True).start()
+
+    def _subscribe(self, client: int, payload: bytes) -> Tuple[List[str], Dict[str, int]]:
+        request = json.loads(payload.decode('utf-8'))
+        fields = request.get('fields') or list(COLUMN_NAMES)
+        unknown = [name for name in fields if name not in ProcessSnapshot.COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        top = {}
+        for metric, k in (request.get('top') or {}).items():
+            if metric not in ProcessManager.TOP_METRICS:
+                raise ValueError(f"Unknown top metric: {metric}")
+            top[metric] = min(max(int(k), 0), self.MAX_TOP)
+        self._set_client_requests(client, top)
+        fields = [name for name in COLUMN_NAMES if name in fields or name in REQUIRED_FIELDS]
+        return fields, top
+
+    def _set_client_requests(self, client: int, top: Optional[Dict[str, int]]) -> None:
+        # The collector serves the union of its own and every client's lists,
+        # which also makes it gather what a client ranks by, e.g. fd counts
+        with self._requests_lock:
+            if top:
+                self._client_requests[client] = top
+            else:
+                self._client_requests.pop(client, None)
+            requests = dict(self._base_requests)
+            for client_top in self._client_requests.values():
+                for metric, k in client_top.items():
+                    requests[metric] = max(k, requests.get(metric, 0))
+            if requests != self.process_manager.top_requests:
+                self.process_manager.set_top_requests(requests)
+
+    def _serve(self, conn: socket.socket) -> None:
+        reader = FrameReader()
+        fields: Optional[List[str]] = None
+        top: Dict[str, int] = {}
+        view: Optional[ProcessSnapshot] = None
+        sent_strings = [0, 0, 0]
+        last_stats = None
+
+        try:
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([conn], [], [], self.interval)
+                if readable:
+                    data = conn.recv(65536)
+                    if not data:
+                        return
+                    for frame_type, payload in reader.feed(data):
+                        if frame_type != SUBSCRIBE:
+                            continue
+                        try:
+                            fields, top = self._subscribe(id(conn), payload)
+                        except (ValueError, TypeError, AttributeError) as e:
+                            send_frame(conn, ERROR, str(e).encode('utf-8'))
+                            continue
+                        # A new subscription starts over with a keyframe
+                        view = None
+                        sent_strings = [0, 0, 0]
+
+                if fields is None:
+                    continue
+
+                snapshot = self.process_manager.state.snapshot
+                if view is None or snapshot.seq != view.seq:
+                    rows = self.process_manager.select(snapshot, top) if top else snapshot
+                    send_frame(conn, KEYFRAME if view is None else DELTA,
+                               encode_snapshot(rows, view, fields, sent_strings))
+                    view = rows
+
+                stats = self.process_manager.system_stats
+                if stats is not None and stats is not last_stats:
+                    send_frame(conn, SYSTEM, encode_system_stats(stats))
+                    last_stats = stats
+        except ConnectionError:
+            # The client went away
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error serving remote client: {e}")
+        finally:
+            self._set_client_requests(id(conn), None)
+            conn.close()
+
+
+class RemoteCollector:
+    """Collector interface over the mirrored snapshot; nothing is read locally."""
+
+    name = 'remote'
+
+    def __init__(self):
+        self.snapshot = ProcessSnapshot.empty()
+        self.count_fds = False
+
+    def pids(self) -> List[int]:
+        return self.snapshot['pid'].tolist()
+
+    def read(self, pid: int):
+        index = self.snapshot.index_of(pid)
+        return self.snapshot.sample(index) if index is not None else None
+
+    def collect(self, pids=None):
+        pids = self.pids() if pids is None else pids
+        return [sample for sample in map(self.read, pids) if sample is not None]
+
+    def username(self, pid: int, uid: int) -> str:
+        index = self.snapshot.index_of(pid)
+        if index is None:
+            return str(uid)
+        return self.snapshot.users[self.snapshot['user_id'][index]]
+
+    def cmdline(self, pid: int) -> List[str]:
+        return []
+
+    def exe(self, pid: int) -> str:
+        return ''
+
+    def memory_breakdown(self, pid: int):
+        return None
+
+    def threads(self, pid: int):
+        return []
+
+
+class RemoteProcessManager(ProcessManager):
+    """Read side of ProcessManager, fed by a RemoteAgent instead of local collection.
+
+    The collection entry points (scan_all, refresh_top, update_system) read
+    whatever frames have arrived, so ProcessMonitorThread drives a remote
+    host exactly like the local one. Process control is not forwarded.
+    """
+
+    RECONNECT_INTERVAL = 5.0
+
+    def __init__(self, address: str, fields: Optional[Sequence[str]] = None,
+                 top: Optional[Dict[str, int]] = None):
+        super().__init__(collector=RemoteCollector())
+        self.address = address
+        self.subscribed_fields = list(fields) if fields else None
+        self.subscribed_top = dict(top) if top else None
+        if self.subscribed_top:
+            self.set_top_requests(self.subscribed_top)
+            self.default_top_requests = dict(self.subscribed_top)
+
+        self._system_stats: Optional[SystemStats] = None
+        self._rows = self.snapshot
+        self._sock: Optional[socket.socket] = None
+        self._reader = FrameReader()
+        self._last_attempt = 0.0
+        self._connect()
+
+    @property
+    def system_stats(self) -> Optional[SystemStats]:
+        return self._system_stats
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def _subscription(self) -> bytes:
+        return json.dumps({'fields': self.subscribed_fields, 'top': self.subscribed_top}).encode('utf-8')
+
+    def _connect(self) -> bool:
+        self._last_attempt = time.monotonic()
+        family, sockaddr = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(2.0)
+            sock.connect(sockaddr)
+            send_frame(sock, SUBSCRIBE, self._subscription())
+            sock.setblocking(False)
+        except OSError as e:
+            print(f"Error connecting to remote agent {self.address}: {e}")
+            sock.close()
+            return False
+
+        self._sock = sock
+        self._reader = FrameReader()
+        return True
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def poll(self) -> None:
+        if self._sock is None:
+            if time.monotonic() - self._last_attempt < self.RECONNECT_INTERVAL or not self._connect():
+                return
+        try:
+            while True:
+                data = self._sock.recv(1 << 20)
+                if not data:
+                    raise ConnectionError("agent closed the connection")
+                for frame_type, payload in self._reader.feed(data):
+                    self._handle(frame_type, payload)
+        except BlockingIOError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error reading from remote agent {self.address}: {e}")
+            self._disconnect()
+
+    def _handle(self, frame_type: int, payload: bytes) -> None:
+        if frame_type in (KEYFRAME, DELTA):
+            self._apply(decode_snapshot(payload), frame_type == KEYFRAME)
+        elif frame_type == SYSTEM:
+            self._system_stats = decode_system_stats(payload)
+        elif frame_type == ERROR:
+            print(f"Remote agent error: {payload.decode('utf-8', 'replace')}")
+
+    def _apply(self, frame: DecodedFrame, keyframe: bool) -> None:
+        if keyframe:
+            # Every (re)subscription starts over with fresh string tables
+            self.names, self.users, self.states = StringTable(), StringTable(), StringTable()
+        for table, (start, values) in zip((self.names, self.users, self.states), frame.strings):
+            if start != len(table):
+                raise ValueError("String tables out of sync with the agent")
+            for value in values:
+                table.intern(value)
+
+        current = ProcessSnapshot.empty() if keyframe else self._rows
+        replaced = set(frame.removed)
+        if frame.count:
+            replaced.update(zip(frame.columns['pid'].tolist(), frame.columns['create_time'].tolist()))
+        keep = np.fromiter(((key not in replaced) for key in
+                            zip(current['pid'].tolist(), current['create_time'].tolist())),
+                           bool, len(current))
+
+        columns = {}
+        for name, dtype in ProcessSnapshot.COLUMNS.items():
+            # Fields the client did not subscribe to read as 0
+            values = frame.columns.get(name)
+            if values is None:
+                values = np.zeros(frame.count, dtype)
+            columns[name] = np.concatenate([current[name][keep], values])
+
+        snapshot = ProcessSnapshot(columns, self.names, self.users, self.states, frame.timestamp)
+        self._rows = snapshot
+        self.collector.snapshot = snapshot
+        self._publish(snapshot, notify_lifecycle=not self.subscribed_top)
+
+    def request_top(self, metric: str, k: int, replaces: Optional[str] = None) -> None:
+        super().request_top(metric, k, replaces)
+        if self.subscribed_top is not None and self._sock is not None:
+            self.subscribed_top = dict(self.top_requests)
+            try:
+                send_frame(self._sock, SUBSCRIBE, self._subscription())
+            except OSError as e:
+                print(f"Error updating remote subscription: {e}")
+                self._disconnect()
+
+    def update_system(self) -> None:
+        self.poll()
+
+    def scan_all(self) -> None:
+        self.poll()
+
+    def refresh_top(self) -> None:
+        self.poll()
+
+    def update_cgroups(self) -> None:
+        pass
+
+    def update_memory(self) -> None:
+        pass
+
+    def terminate_process(self, pid: int) -> bool:
+        return False
+
+    def set_process_priority(self, pid: int, priority: int) -> bool:
+        return False
+
+    def close(self) -> None:
+        self._disconnect()
@@ -0,0 +1,77 @@
+"""
+Sampling scheduler for TaskMaster.
+Runs each collection task at its own cadence on drift-free deadlines.
+"""
+
+import math
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class ScheduledTask:
+    __slots__ = ('name', 'interval', 'callback', 'deadline')
+
+    def __init__(self, name: str, interval: float, callback: Callable[[], None], deadline: float):
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.deadline = deadline
+
+
+class SamplingScheduler:
+    """Multi-rate scheduler whose deadlines are start + n * interval.
+
+    Deadlines never accumulate the time a task took to run. A task that
+    overruns skips the ticks it missed instead of running them back to back.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.tasks: List[ScheduledTask] = []
+
+    def add(self, name: str, interval: float, callback: Callable[[], None],
+            run_immediately: bool = True) -> ScheduledTask:
+        now = self.clock()
+        task = ScheduledTask(name, interval, callback, now if run_immediately else now + interval)
+        self.tasks.append(task)
+        return task
+
+    def set_interval(self, name: str, interval: float) -> None:
+        for task in self.tasks:
+            if task.name == name:
+                task.deadline += interval - task.interval
+                task.interval = interval
+
+    def run_pending(self) -> List[str]:
+        ran = []
+        now = self.clock()
+        for task in self.tasks:
+            if task.deadline > now:
+                continue
+
+            try:
+                task.callback()
+                ran.append(task.name)
+            except Exception as e:
+                print(f"Error in scheduled task '{task.name}': {e}")
+
+            task.deadline += task.interval
+            finished = self.clock()
+            if task.deadline <= finished:
+                missed = math.floor((finished - task.deadline) / task.interval) + 1
+                task.deadline += missed * task.interval
+        return ran
+
+    def time_until_next(self) -> float:
+        if not self.tasks:
+            return 1.0
+        return max(0.0, min(task.deadline for task in self.tasks) - self.clock())
+
+    def run(self, stop_event: threading.Event,
+            on_tick: Optional[Callable[[List[str]], None]] = None) -> None:
+        while not stop_event.is_set():
+            ran = self.run_pending()
+            if ran and on_tick is not None:
+                on_tick(ran)
+            stop_event.wait(self.time_until_next())
@@ -0,0 +1,264 @@
+"""
+Process snapshot module for TaskMaster.
+Stores one collection pass as immutable NumPy columns with interned string tables.
+"""
+
+import numpy as np
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.core.collectors import ProcessSample
+
+
+class StringTable:
+    """Append-only string interning table shared by consecutive snapshots."""
+
+    def __init__(self):
+        self._strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._ids[value] = string_id
+        return string_id
+
+    def ids_matching(self, text: str) -> np.ndarray:
+        text = text.lower()
+        return np.array([i for i, value in enumerate(self._strings) if text in value.lower()],
+                        dtype=np.int32)
+
+    def since(self, start: int) -> List[str]:
+        """Strings interned at or after id start, in id order."""
+        return self._strings[start:]
+
+    def __getitem__(self, string_id: int) -> str:
+        return self._strings[string_id]
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+class ProcessSnapshot:
+    """Immutable, column-oriented view of every process seen in one scan."""
+
+    COLUMNS = {
+        'pid': np.int32,
+        'ppid': np.int32,
+        'cpu_percent': np.float64,
+        'cpu_time': np.float64,
+        'rss': np.int64,
+        'vms': np.int64,
+        'num_threads': np.int32,
+        'read_bytes': np.int64,
+        'write_bytes': np.int64,
+        'read_bps': np.float64,
+        'write_bps': np.float64,
+        'io_rate': np.float64,
+        'syscall_rate': np.float64,
+        'ctx_switch_vol_rate': np.float64,
+        'ctx_switch_invol_rate': np.float64,
+        'num_fds': np.int32,
+        'state': np.int16,
+        'create_time': np.float64,
+        'uid': np.int32,
+        'name_id': np.int32,
+        'user_id': np.int32,
+    }
+
+    # Columns that identify a process rather than describe it
+    IDENTITY = ('pid', 'create_time')
+
+    def __init__(self, columns: Dict[str, np.ndarray], names: StringTable,
+                 users: StringTable, states: StringTable, timestamp: float, seq: int = 0):
+        for array in columns.values():
+            array.flags.writeable = False
+        self.columns = columns
+        self.names = names
+        self.users = users
+        self.states = states
+        self.timestamp = timestamp
+        # Publication sequence number, assigned by ProcessManager; 0 if never published
+        self.seq = seq
+        self._pid_index = None
+
+    @classmethod
+    def from_samples(cls, samples: Sequence[ProcessSample], derived: Dict[str, Sequence[float]],
+                     user_ids: Sequence[int], names: StringTable, users: StringTable,
+                     states: StringTable, timestamp: float) -> 'ProcessSnapshot':
+        """Build a snapshot from raw samples plus per-row derived columns such as rates."""
+        n = len(samples)
+        columns = {
+            'pid': np.fromiter((s.pid for s in samples), np.int32, n),
+            'ppid': np.fromiter((s.ppid for s in samples), np.int32, n),
+            'cpu_time': np.fromiter((s.cpu_time for s in samples), np.float64, n),
+            'rss': np.fromiter((s.rss for s in samples), np.int64, n),
+            'vms': np.fromiter((s.vms for s in samples), np.int64, n),
+            'num_threads': np.fromiter((s.num_threads for s in samples), np.int32, n),
+            'read_bytes': np.fromiter((s.read_bytes for s in samples), np.int64, n),
+            'write_bytes': np.fromiter((s.write_bytes for s in samples), np.int64, n),
+            'num_fds': np.fromiter((s.num_fds for s in samples), np.int32, n),
+            'state': np.fromiter((states.intern(s.status) for s in samples), np.int16, n),
+            'create_time': np.fromiter((s.create_time for s in samples), np.float64, n),
+            'uid': np.fromiter((s.uid for s in samples), np.int32, n),
+            'name_id': np.fromiter((names.intern(s.name) for s in samples), np.int32, n),
+            'user_id': np.fromiter(user_ids, np.int32, n),
+        }
+        for name, values in derived.items():
+            columns[name] = np.fromiter(values, cls.COLUMNS[name], n)
+        return cls(columns, names, users, states, timestamp)
+
+    @classmethod
+    def empty(cls) -> 'ProcessSnapshot':
+        columns = {name: np.empty(0, dtype) for name, dtype in cls.COLUMNS.items()}
+        return cls(columns, StringTable(), StringTable(), StringTable(), 0.0)
+
+    def __len__(self) -> int:
+        return len(self.columns['pid'])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def take(self, indices: np.ndarray) -> 'ProcessSnapshot':
+        columns = {name: array[indices] for name, array in self.columns.items()}
+        return ProcessSnapshot(columns, self.names, self.users, self.states, self.timestamp,
+                               self.seq)
+
+    def filter(self, mask: np.ndarray) -> 'ProcessSnapshot':
+        return self.take(np.flatnonzero(mask))
+
+    def name_contains(self, text: str) -> np.ndarray:
+        return np.isin(self.columns['name_id'], self.names.ids_matching(text))
+
+    def sort_by(self, column: str, descending: bool = True) -> 'ProcessSnapshot':
+        values = self.columns[column]
+        order = np.argsort(-values if descending else values, kind='stable')
+        return self.take(order)
+
+    def top_k_indices(self, column: str, k: int) -> np.ndarray:
+        values = self.columns[column]
+        if k <= 0:
+            return np.empty(0, np.intp)
+        if k >= len(values):
+            return np.argsort(-values, kind='stable')
+
+        # O(n) partition, then only the k selected rows are sorted
+        candidates = np.argpartition(-values, k - 1)[:k]
+        return candidates[np.argsort(-values[candidates], kind='stable')]
+
+    def top_k(self, column: str, k: int) -> 'ProcessSnapshot':
+        return self.take(self.top_k_indices(column, k))
+
+    def replace_rows(self, updated: 'ProcessSnapshot', removed_pids=()) -> 'ProcessSnapshot':
+        """Return a copy with the rows of updated's PIDs replaced and removed_pids dropped."""
+        positions = np.array([self.index_of(int(pid)) for pid in updated['pid']], np.intp)
+        columns = {}
+        for name, array in self.columns.items():
+            array = array.copy()
+            array[positions] = updated[name]
+            columns[name] = array
+
+        snapshot = ProcessSnapshot(columns, self.names, self.users, self.states, updated.timestamp)
+        if len(removed_pids):
+            snapshot = snapshot.filter(~np.isin(snapshot['pid'], list(removed_pids)))
+        return snapshot
+
+    def changes_from(self, old: 'ProcessSnapshot') -> 'SnapshotChanges':
+        """Rows added, removed and changed since old, matched on (pid, create_time)."""
+        old_order = np.argsort(old['pid'], kind='stable')
+        old_pids = old['pid'][old_order]
+        idx = np.searchsorted(old_pids, self['pid'])
+        clipped = np.minimum(idx, max(len(old) - 1, 0))
+        if len(old):
+            matched = (idx < len(old)) & (old_pids[clipped] == self['pid']) & \
+                      (old['create_time'][old_order][clipped] == self['create_time'])
+            old_rows = old_order[clipped]
+        else:
+            matched = np.zeros(len(self), bool)
+            old_rows = np.zeros(len(self), np.intp)
+
+        still_there = np.zeros(len(old), bool)
+        still_there[old_rows[matched]] = True
+        removed = np.flatnonzero(~still_there)
+
+        fields = [name for name in self.columns if name not in self.IDENTITY]
+        new_rows = np.flatnonzero(matched)
+        differs = np.column_stack([self[name][new_rows] != old[name][old_rows[new_rows]]
+                                   for name in fields]) if len(new_rows) \
+            else np.zeros((0, len(fields)), bool)
+        changed = np.any(differs, axis=1)
+
+        return SnapshotChanges(
+            old.seq, self.seq,
+            added=self.take(np.flatnonzero(~matched)),
+            removed=list(zip(old['pid'][removed].tolist(), old['create_time'][removed].tolist())),
+            changed=self.take(new_rows[changed]),
+            changed_fields=[tuple(name for name, flag in zip(fields, row) if flag)
+                            for row in differs[changed].tolist()],
+        )
+
+    def index_of(self, pid: int) -> Optional[int]:
+        if self._pid_index is None:
+            self._pid_index = {int(p): i for i, p in enumerate(self.columns['pid'])}
+        return self._pid_index.get(pid)
+
+    def sample(self, index: int) -> ProcessSample:
+        c = self.columns
+        return ProcessSample(
+            int(c['pid'][index]), int(c['ppid'][index]), self.names[c['name_id'][index]],
+            self.states[c['state'][index]], float(c['create_time'][index]),
+            float(c['cpu_time'][index]), int(c['rss'][index]), int(c['vms'][index]),
+            int(c['num_threads'][index]), int(c['uid'][index]),
+            int(c['read_bytes'][index]), int(c['write_bytes'][index]),
+            num_fds=int(c['num_fds'][index]),
+        )
+
+    def row(self, index: int) -> Dict[str, Any]:
+        c = self.columns
+        return {
+            'pid': int(c['pid'][index]),
+            'name': self.names[c['name_id'][index]],
+            'status': self.states[c['state'][index]],
+            'cpu_percent': float(c['cpu_percent'][index]),
+            'memory_mb': float(c['rss'][index]) / (1024 * 1024),
+            'threads': int(c['num_threads'][index]),
+            'username': self.users[c['user_id'][index]],
+            'start_time': datetime.fromtimestamp(c['create_time'][index]),
+        }
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self.row(index)
+
+
+class SnapshotChanges:
+    """Difference between two published snapshots.
+
+    added and changed are snapshots holding the rows' current values, with
+    changed_fields naming the columns that differ for each changed row.
+    removed lists the (pid, create_time) keys that are gone. reset means
+    the older snapshot was no longer available, so every current row is
+    reported as added and consumers should rebuild their state.
+    """
+
+    def __init__(self, since: int, seq: int, added: ProcessSnapshot,
+                 removed: List[Tuple[int, float]], changed: ProcessSnapshot,
+                 changed_fields: List[Tuple[str, ...]], reset: bool = False):
+        self.since = since
+        self.seq = seq
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.changed_fields = changed_fields
+        self.reset = reset
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def changed_rows(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (pid, {column: new value}) for each changed row."""
+        for index, fields in enumerate(self.changed_fields):
+            yield (int(self.changed['pid'][index]),
+                   {name: self.changed[name][index].item() for name in fields})
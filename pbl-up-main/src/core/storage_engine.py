@@ -0,0 +1,832 @@
+"""
+Storage engine module for TaskMaster.
+Owns the SQLite database: versioned schema, migration and a single writer thread.
+"""
+
+import bisect
+import calendar
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+SCHEMA_VERSION = 4
+
+# Version 1 is the layout written before versioning: two pairs of overlapping
+# tables with ISO text timestamps
+SCHEMA_V2 = [
+    '''
+    CREATE TABLE IF NOT EXISTS names (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    ''',
+    # timestamp and start_time are epoch milliseconds; start_time is the
+    # process create time, 0 where unknown, and tells reused PIDs apart
+    '''
+    CREATE TABLE IF NOT EXISTS process_samples (
+        timestamp INTEGER NOT NULL,
+        pid INTEGER NOT NULL,
+        start_time INTEGER NOT NULL,
+        name_id INTEGER REFERENCES names(id),
+        cpu_percent REAL,
+        memory_mb REAL,
+        threads INTEGER,
+        status TEXT,
+        user_id INTEGER REFERENCES users(id),
+        data TEXT
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS process_samples_time ON process_samples(timestamp)',
+    'CREATE INDEX IF NOT EXISTS process_samples_process ON process_samples(pid, start_time, timestamp)',
+    # Covers trend queries, which only read these columns
+    '''CREATE INDEX IF NOT EXISTS process_samples_name
+       ON process_samples(name_id, timestamp, cpu_percent, memory_mb)''',
+    '''
+    CREATE TABLE IF NOT EXISTS system_samples (
+        timestamp INTEGER NOT NULL,
+        cpu_percent REAL,
+        memory_percent REAL,
+        disk_percent REAL,
+        total_processes INTEGER,
+        data TEXT
+    )
+    ''',
+    '''CREATE INDEX IF NOT EXISTS system_samples_time
+       ON system_samples(timestamp, cpu_percent, memory_percent, disk_percent, total_processes)''',
+    '''
+    CREATE TABLE IF NOT EXISTS events (
+        timestamp INTEGER NOT NULL,
+        event_type TEXT,
+        description TEXT,
+        data TEXT
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS events_time ON events(timestamp)',
+]
+
+
+# Rollup tiers as (table suffix, bucket size in ms), finest first. Each bucket
+# keeps min, max, sum and count, so tiers can be merged into coarser buckets
+ROLLUP_TIERS = [('1m', 60 * 1000), ('1h', 3600 * 1000)]
+
+# Rolled-up columns of each table: {table: [(raw column, rollup prefix)]}
+ROLLUP_COLUMNS = {
+    'process': [('cpu_percent', 'cpu'), ('memory_mb', 'memory')],
+    'system': [('cpu_percent', 'cpu'), ('memory_percent', 'memory'), ('disk_percent', 'disk')],
+}
+
+
+def _rollup_table(table: str, name: str) -> str:
+    key = 'name_id INTEGER NOT NULL, ' if table == 'process' else ''
+    stats = ', '.join(f'{prefix}_min REAL, {prefix}_max REAL, {prefix}_sum REAL'
+                      for _, prefix in ROLLUP_COLUMNS[table])
+    primary = 'name_id, bucket' if key else 'bucket'
+    return f'''
+        CREATE TABLE IF NOT EXISTS {name} (
+            bucket INTEGER NOT NULL, {key}{stats}, count INTEGER NOT NULL,
+            PRIMARY KEY ({primary})
+        ) WITHOUT ROWID
+    '''
+
+
+def _rollup_schema() -> List[str]:
+    return [_rollup_table(table, f'{table}_rollup_{tier}')
+            for tier, _ in ROLLUP_TIERS for table in ('process', 'system')]
+
+
+def _rollup_upsert(table: str, name: str) -> str:
+    columns = ['bucket'] + (['name_id'] if table == 'process' else [])
+    updates = []
+    for _, prefix in ROLLUP_COLUMNS[table]:
+        columns += [f'{prefix}_min', f'{prefix}_max', f'{prefix}_sum']
+        updates += [f'{prefix}_min = min({prefix}_min, excluded.{prefix}_min)',
+                    f'{prefix}_max = max({prefix}_max, excluded.{prefix}_max)',
+                    f'{prefix}_sum = {prefix}_sum + excluded.{prefix}_sum']
+    columns.append('count')
+    updates.append('count = count + excluded.count')
+    conflict = 'name_id, bucket' if table == 'process' else 'bucket'
+    return (f"INSERT INTO {name} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT({conflict}) DO UPDATE SET {', '.join(updates)}")
+
+
+DAY_MS = 86400 * 1000
+
+# Days kept per retention class before whole partitions are dropped; None keeps forever
+RETENTION_DAYS = {'raw': 7, 'events': 30, '1m': 30, '1h': 365}
+
+# Time-partitioned tables: {table: (period, retention class, time column)}.
+# Rows live in one table per UTC day or month, named <table>_p<YYYYMMDD or
+# YYYYMM> and listed in the partitions table, so retention is a DROP TABLE
+# per expired period instead of a DELETE scanning every row
+PARTITIONS = {
+    'process_samples': ('day', 'raw', 'timestamp'),
+    'system_samples': ('day', 'raw', 'timestamp'),
+    'events': ('day', 'events', 'timestamp'),
+    'process_rollup_1m': ('day', '1m', 'bucket'),
+    'system_rollup_1m': ('day', '1m', 'bucket'),
+    'process_rollup_1h': ('month', '1h', 'bucket'),
+    'system_rollup_1h': ('month', '1h', 'bucket'),
+}
+
+PARTITION_CATALOG = '''
+    CREATE TABLE IF NOT EXISTS partitions (
+        name TEXT PRIMARY KEY,
+        base TEXT NOT NULL,
+        start_ms INTEGER NOT NULL,
+        end_ms INTEGER NOT NULL
+    )
+'''
+
+# Layout of one partition, with {name} for the partition table
+PARTITION_SCHEMA = {
+    # timestamp and start_time are epoch milliseconds; start_time is the
+    # process create time, 0 where unknown, and tells reused PIDs apart
+    'process_samples': [
+        '''
+        CREATE TABLE IF NOT EXISTS {name} (
+            timestamp INTEGER NOT NULL,
+            pid INTEGER NOT NULL,
+            start_time INTEGER NOT NULL,
+            name_id INTEGER REFERENCES names(id),
+            cpu_percent REAL,
+            memory_mb REAL,
+            threads INTEGER,
+            status TEXT,
+            user_id INTEGER REFERENCES users(id),
+            data TEXT
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS {name}_time ON {name}(timestamp)',
+        'CREATE INDEX IF NOT EXISTS {name}_process ON {name}(pid, start_time, timestamp)',
+        # Covers raw trend queries, which only read these columns
+        'CREATE INDEX IF NOT EXISTS {name}_name ON {name}(name_id, timestamp, cpu_percent, memory_mb)',
+    ],
+    'system_samples': [
+        '''
+        CREATE TABLE IF NOT EXISTS {name} (
+            timestamp INTEGER NOT NULL,
+            cpu_percent REAL,
+            memory_percent REAL,
+            disk_percent REAL,
+            total_processes INTEGER,
+            data TEXT
+        )
+        ''',
+        '''CREATE INDEX IF NOT EXISTS {name}_time
+           ON {name}(timestamp, cpu_percent, memory_percent, disk_percent, total_processes)''',
+    ],
+    'events': [
+        '''
+        CREATE TABLE IF NOT EXISTS {name} (
+            timestamp INTEGER NOT NULL,
+            event_type TEXT,
+            description TEXT,
+            data TEXT
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS {name}_time ON {name}(timestamp)',
+    ],
+    **{f'{table}_rollup_{tier}': [_rollup_table(table, '{name}')]
+       for tier, _ in ROLLUP_TIERS for table in ('process', 'system')},
+}
+
+
+def _period(period: str, timestamp: int) -> Tuple[int, int, str]:
+    """(start, end, suffix) of the UTC day or month holding timestamp."""
+    if period == 'day':
+        start = timestamp // DAY_MS * DAY_MS
+        return start, start + DAY_MS, time.strftime('%Y%m%d', time.gmtime(start // 1000))
+    day = time.gmtime(timestamp // 1000)
+    year, month = day.tm_year, day.tm_mon
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    start = calendar.timegm((year, month, 1, 0, 0, 0)) * 1000
+    end = calendar.timegm((next_year, next_month, 1, 0, 0, 0)) * 1000
+    return start, end, f'{year:04d}{month:02d}'
+
+
+def _create_partition(conn: sqlite3.Connection, base: str, timestamp: int) -> Tuple[int, int, str]:
+    """Create (if needed) and register the partition of base holding timestamp."""
+    start, end, suffix = _period(PARTITIONS[base][0], timestamp)
+    name = f'{base}_p{suffix}'
+    for statement in PARTITION_SCHEMA[base]:
+        conn.execute(statement.format(name=name))
+    conn.execute('INSERT OR IGNORE INTO partitions (name, base, start_ms, end_ms) VALUES (?, ?, ?, ?)',
+                 (name, base, start, end))
+    return start, end, name
+
+
+def choose_tier(resolution_ms: int) -> Tuple[str, int]:
+    """The coarsest tier whose buckets are no wider than resolution_ms; ('raw', 1) if none."""
+    chosen = ('raw', 1)
+    for tier, size in ROLLUP_TIERS:
+        if size <= resolution_ms:
+            chosen = (tier, size)
+    return chosen
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def to_ms(seconds: float) -> int:
+    return int(seconds * 1000)
+
+
+def _iso_to_ms(column: str) -> str:
+    # Version 1 wrote local-time datetime.now().isoformat() strings
+    return f"CAST(ROUND((julianday({column}, 'utc') - 2440587.5) * 86400000) AS INTEGER)"
+
+
+def _migrate_v1(conn: sqlite3.Connection, tables: set) -> None:
+    # The new events table takes the old name
+    if 'events' in tables:
+        conn.execute('ALTER TABLE events RENAME TO events_v1')
+        tables = (tables - {'events'}) | {'events_v1'}
+
+    for statement in SCHEMA_V2:
+        conn.execute(statement)
+
+    name_sources = [f"SELECT name FROM {table} WHERE name IS NOT NULL"
+                    for table in ('process_history', 'process_snapshots') if table in tables]
+    if name_sources:
+        conn.execute(f"INSERT OR IGNORE INTO names(name) {' UNION '.join(name_sources)}")
+
+    if 'process_history' in tables:
+        conn.execute('''
+            INSERT OR IGNORE INTO users(name)
+            SELECT DISTINCT username FROM process_history WHERE username IS NOT NULL
+        ''')
+        conn.execute(f'''
+            INSERT INTO process_samples
+            (timestamp, pid, start_time, name_id, cpu_percent, memory_mb, status, user_id)
+            SELECT {_iso_to_ms('h.timestamp')}, h.pid, 0, n.id, h.cpu_percent, h.memory_mb,
+                   h.status, u.id
+            FROM process_history h
+            LEFT JOIN names n ON n.name = h.name
+            LEFT JOIN users u ON u.name = h.username
+        ''')
+    if 'process_snapshots' in tables:
+        conn.execute(f'''
+            INSERT INTO process_samples
+            (timestamp, pid, start_time, name_id, cpu_percent, memory_mb, threads, data)
+            SELECT {_iso_to_ms('s.timestamp')}, s.pid, 0, n.id, s.cpu_percent, s.memory_mb,
+                   s.threads, s.data
+            FROM process_snapshots s LEFT JOIN names n ON n.name = s.name
+        ''')
+    if 'system_history' in tables:
+        conn.execute(f'''
+            INSERT INTO system_samples
+            (timestamp, cpu_percent, memory_percent, disk_percent, total_processes)
+            SELECT {_iso_to_ms('timestamp')}, cpu_percent, memory_percent, disk_percent,
+                   total_processes
+            FROM system_history
+        ''')
+    if 'system_snapshots' in tables:
+        conn.execute(f'''
+            INSERT INTO system_samples (timestamp, cpu_percent, memory_percent, disk_percent, data)
+            SELECT {_iso_to_ms('timestamp')}, cpu_percent, memory_percent, disk_percent, data
+            FROM system_snapshots
+        ''')
+    if 'events_v1' in tables:
+        conn.execute(f'''
+            INSERT INTO events (timestamp, event_type, description, data)
+            SELECT {_iso_to_ms('timestamp')}, event_type, description, data FROM events_v1
+        ''')
+
+    for table in ('process_history', 'process_snapshots', 'system_history', 'system_snapshots',
+                  'events_v1'):
+        if table in tables:
+            conn.execute(f'DROP TABLE {table}')
+
+
+def _migrate_v2(conn: sqlite3.Connection) -> None:
+    for statement in _rollup_schema():
+        conn.execute(statement)
+
+    # Build the rollups from the raw samples already stored
+    for tier, size in ROLLUP_TIERS:
+        for table, key in (('process', 'name_id'), ('system', None)):
+            stats = ', '.join(f'MIN(COALESCE({column}, 0)), MAX(COALESCE({column}, 0)), '
+                              f'SUM(COALESCE({column}, 0))'
+                              for column, _ in ROLLUP_COLUMNS[table])
+            keys = f'(timestamp / {size}) * {size}' + (f', {key}' if key else '')
+            where = f'WHERE {key} IS NOT NULL' if key else ''
+            conn.execute(f'''
+                INSERT INTO {table}_rollup_{tier}
+                SELECT {keys}, {stats}, COUNT(*)
+                FROM {table}_samples {where}
+                GROUP BY {keys}
+            ''')
+
+
+def _migrate_v3(conn: sqlite3.Connection) -> None:
+    conn.execute(PARTITION_CATALOG)
+
+    # Move every table into one partition per period its rows cover
+    for base, (_, _, column) in PARTITIONS.items():
+        days = [row[0] for row in conn.execute(
+            f'SELECT DISTINCT {column} / {DAY_MS} * {DAY_MS} FROM {base}')]
+        partitions = {_create_partition(conn, base, day) for day in days}
+        for start, end, name in partitions:
+            conn.execute(f'INSERT INTO {name} SELECT * FROM {base} WHERE {column} >= ? AND {column} < ?',
+                         (start, end))
+        conn.execute(f'DROP TABLE {base}')
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    """Switch the file to auto_vacuum=INCREMENTAL, so pages freed by dropped
+    partitions can be returned to the OS a few at a time.
+
+    New files are created in this mode. An existing file only changes mode
+    through one full VACUUM, which rewrites all of it and blocks every
+    writer meanwhile, so this is only run on request (main.py --vacuum).
+    Returns False if the file already was in this mode.
+    """
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+        return False
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    return True
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Bring the database to SCHEMA_VERSION in one transaction; returns the version found."""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version == SCHEMA_VERSION:
+        return version
+    if version > SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(
+            f"database schema v{version} is newer than this TaskMaster (v{SCHEMA_VERSION})")
+
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if version < 2:
+            _migrate_v1(conn, tables)
+        if version < 3:
+            _migrate_v2(conn)
+        if version < 4:
+            _migrate_v3(conn)
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return version
+
+
+class StorageEngine:
+    """The one writer of a TaskMaster database.
+
+    A thread owns the connection and runs jobs from a bounded queue: stores
+    are queued and return at once, reads wait for their result and see
+    every store queued before them. Stores are group-committed once
+    batch_size of them are pending or flush_interval seconds after the
+    first one.
+
+    Engines are shared per database file, so DataStorage and DatabaseManager
+    in one process write through the same connection; the first open()
+    decides durability and batching. durability sets PRAGMA synchronous:
+    'full' fsyncs every commit, 'normal' only at WAL checkpoints (a power
+    loss may drop the last commits but never corrupts the file), 'off'
+    leaves it to the OS.
+
+    Samples, events and rollups are partitioned by time (see PARTITIONS).
+    The writer drops partitions older than their class's retention in days
+    at start-up and whenever a new day of raw samples starts. In files with
+    incremental auto-vacuum (new files, or old ones converted with
+    enable_incremental_vacuum) it then hands the freed pages back to the OS
+    a step at a time while no jobs are waiting; other files reuse them.
+    """
+
+    # Free pages returned per incremental vacuum step
+    VACUUM_PAGES = 1024
+
+    DURABILITY = {'off': 'OFF', 'normal': 'NORMAL', 'full': 'FULL'}
+
+    _engines: Dict[str, 'StorageEngine'] = {}
+    _engines_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, db_path: str, durability: str = 'normal', batch_size: int = 500,
+             flush_interval: float = 1.0, max_pending: int = 10000,
+             retention: Optional[Dict[str, Optional[float]]] = None) -> 'StorageEngine':
+        key = os.path.abspath(db_path)
+        with cls._engines_lock:
+            engine = cls._engines.get(key)
+            if engine is None or not engine._writer.is_alive():
+                engine = cls(db_path, durability, batch_size, flush_interval, max_pending,
+                             retention)
+                cls._engines[key] = engine
+            engine._users += 1
+            return engine
+
+    def __init__(self, db_path: str, durability: str = 'normal', batch_size: int = 500,
+                 flush_interval: float = 1.0, max_pending: int = 10000,
+                 retention: Optional[Dict[str, Optional[float]]] = None):
+        if durability not in self.DURABILITY:
+            raise ValueError(f"Unknown durability: {durability}")
+        unknown = set(retention or {}) - set(RETENTION_DAYS)
+        if unknown:
+            raise ValueError(f"Unknown retention class: {', '.join(sorted(unknown))}")
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+        self.db_path = db_path
+        self.durability = durability
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention = {**RETENTION_DAYS, **(retention or {})}
+        self.conn: Optional[sqlite3.Connection] = None
+        self._users = 0
+        self._uncommitted = 0
+        # table -> {string: id} for names and users; cleared if a commit fails
+        self._ids: Dict[str, Dict[str, int]] = {'names': {}, 'users': {}}
+        # table -> [(start, end, partition)] in time order, mirroring the partitions table
+        self._partitions: Dict[str, List[Tuple[int, int, str]]] = {base: [] for base in PARTITIONS}
+        # Maintenance the writer runs between jobs: retention after the job that
+        # started a new day (and at start-up), vacuum steps while the queue is empty
+        self._retention_due = True
+        self._vacuum_due = False
+
+        # (function, args, Future or None) jobs, or None to stop
+        self._jobs: queue.Queue = queue.Queue(max_pending)
+        self._ready = threading.Event()
+        self._writer = threading.Thread(target=self._run, name='storage-writer', daemon=True)
+        self._writer.start()
+        self._ready.wait()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        if conn.execute('PRAGMA page_count').fetchone()[0] == 0:
+            # Only free before the first page is written, which switching to WAL does
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={self.DURABILITY[self.durability]}')
+        return conn
+
+    def _run(self) -> None:
+        try:
+            self.conn = self._connect()
+            migrate(self.conn)
+            self._load_partitions()
+        except sqlite3.Error as e:
+            print(f"Database initialization error: {e}")
+            self._retention_due = False
+        self._ready.set()
+
+        deadline = 0.0
+        while True:
+            if self._retention_due:
+                self._retention_due = False
+                self.apply_retention()
+
+            if self._vacuum_due:
+                timeout = 0.0
+            elif self._uncommitted:
+                timeout = max(0.0, deadline - time.monotonic())
+            else:
+                timeout = None
+            try:
+                job = self._jobs.get(timeout=timeout)
+            except queue.Empty:
+                self.commit()
+                if self._vacuum_due:
+                    self._vacuum_step()
+                continue
+            if job is None:
+                break
+
+            func, args, future = job
+            try:
+                result = func(*args)
+            except Exception as e:
+                if future is None:
+                    print(f"Error in database job: {e}")
+                else:
+                    future.set_exception(e)
+            else:
+                if future is not None:
+                    future.set_result(result)
+
+            if future is None:
+                self._uncommitted += 1
+                if self._uncommitted == 1:
+                    deadline = time.monotonic() + self.flush_interval
+                if self._uncommitted >= self.batch_size:
+                    self.commit()
+
+        self.commit()
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def commit(self) -> None:
+        """Writer thread only."""
+        self._uncommitted = 0
+        try:
+            if self.conn is not None and self.conn.in_transaction:
+                self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error committing database changes: {e}")
+            # Ids interned in the failed transaction are gone
+            for ids in self._ids.values():
+                ids.clear()
+            # So are partitions created in it
+            self._load_partitions()
+
+    def submit(self, func, args: tuple = (), block: bool = True) -> bool:
+        """Queue a store; with block=False a full queue drops it and returns False."""
+        if not self._writer.is_alive():
+            print("Error storing data: database is closed")
+            return False
+        try:
+            self._jobs.put((func, args, None), block=block)
+            return True
+        except queue.Full:
+            print("Error storing data: database writer is behind, sample dropped")
+            return False
+
+    def call(self, func, *args) -> Any:
+        """Run func on the writer thread and wait for its result."""
+        if not self._writer.is_alive():
+            raise RuntimeError("database is closed")
+        future: Future = Future()
+        self._jobs.put((func, args, future))
+        return future.result()
+
+    def flush(self) -> None:
+        """Wait until everything queued so far is committed."""
+        if self._writer.is_alive():
+            self.call(self.commit)
+
+    def release(self) -> None:
+        """Drop one user; the last one commits what is queued and stops the writer."""
+        with self._engines_lock:
+            self._users -= 1
+            if self._users > 0:
+                return
+            if self._engines.get(os.path.abspath(self.db_path)) is self:
+                del self._engines[os.path.abspath(self.db_path)]
+        if self._writer.is_alive():
+            self._jobs.put(None)
+            self._writer.join()
+
+    # Helpers for jobs, run on the writer thread
+
+    def _load_partitions(self) -> None:
+        self._partitions = {base: [] for base in PARTITIONS}
+        for name, base, start, end in self.conn.execute(
+                'SELECT name, base, start_ms, end_ms FROM partitions ORDER BY start_ms'):
+            self._partitions[base].append((start, end, name))
+
+    def partition(self, base: str, timestamp: int) -> str:
+        """The partition of base holding timestamp, created on first use."""
+        partitions = self._partitions[base]
+        # Writes almost always land in the newest partition
+        for start, end, name in reversed(partitions):
+            if start <= timestamp < end:
+                return name
+        partition = _create_partition(self.conn, base, timestamp)
+        bisect.insort(partitions, partition)
+        if PARTITIONS[base][1] == 'raw':
+            # A new day of samples, so the oldest day may now be past retention
+            self._retention_due = True
+        return partition[2]
+
+    def partitions(self, base: str, start: Optional[int] = None,
+                   end: Optional[int] = None) -> List[str]:
+        """Partitions of base overlapping [start, end), oldest first."""
+        return [name for first, last, name in self._partitions[base]
+                if (start is None or last > start) and (end is None or first < end)]
+
+    def union(self, base: str, branch: str, params: Sequence = (), start: Optional[int] = None,
+              end: Optional[int] = None) -> Tuple[Optional[str], List]:
+        """branch, a SELECT from {table}, over every partition of base overlapping
+        [start, end), joined with UNION ALL; params are repeated per partition.
+        Returns (None, []) when there is no such partition."""
+        tables = self.partitions(base, start, end)
+        if not tables:
+            return None, []
+        sql = ' UNION ALL '.join(f'SELECT * FROM ({branch.format(table=table)})' for table in tables)
+        return sql, list(params) * len(tables)
+
+    def trend_query(self, table: str, resolution_ms: int, start: int, end: int,
+                    process_name: Optional[str] = None) -> Tuple[Optional[str], List, int]:
+        """SQL and parameters for min/avg/max/count per resolution_ms bucket from the best tier.
+
+        Also returns the bucket width actually used, which is resolution_ms
+        rounded down to a multiple of the tier's bucket so rolled-up buckets
+        are never split. Before the oldest data a tier still holds, the range
+        is read from the next coarser tier, so history past a finer tier's
+        retention comes back at that tier's width instead of being cut off.
+        Each partition is aggregated on its own and the partial buckets
+        merged, which min, max, sum and count allow.
+        """
+        tiers = [('raw', 1)] + ROLLUP_TIERS
+        first = tiers.index(choose_tier(resolution_ms))
+        widths = [max(size, resolution_ms // size * size) for _, size in tiers]
+
+        unions, params = [], []
+        segment_end = end
+        for position in range(first, len(tiers)):
+            tier = tiers[position][0]
+            if tier == 'raw':
+                base, time_column, count = f'{table}_samples', 'timestamp', '1'
+            else:
+                base, time_column, count = f'{table}_rollup_{tier}', 'bucket', 'count'
+
+            segment_start = start
+            if position + 1 < len(tiers):
+                partitions = self._partitions[base]
+                covered = partitions[0][0] if partitions else segment_end
+                # Hand over on a boundary of the coarser tier's buckets
+                coarser = widths[position + 1]
+                segment_start = min(segment_end, max(start, -(-covered // coarser) * coarser))
+
+            if segment_start < segment_end:
+                union, union_params = self.union(
+                    base, self._trend_branch(table, tier, time_column, count, widths[position],
+                                             process_name is not None),
+                    ([process_name] if process_name is not None else []) + [segment_start, segment_end],
+                    segment_start, segment_end)
+                if union is not None:
+                    unions.append(union)
+                    params += union_params
+            segment_end = segment_start
+            if segment_end <= start:
+                break
+
+        width = widths[first]
+        if not unions:
+            return None, [], width
+        merged = []
+        for column, prefix in ROLLUP_COLUMNS[table]:
+            merged += [f'SUM({prefix}_sum) * 1.0 / SUM(count) AS {column}',
+                       f'MIN({prefix}_min) AS {prefix}_min', f'MAX({prefix}_max) AS {prefix}_max']
+        merged.append('SUM(count) AS count')
+        sql = (f"SELECT bucket AS timestamp, {', '.join(merged)} "
+               f"FROM ({' UNION ALL '.join(unions)}) GROUP BY bucket ORDER BY bucket")
+        return sql, params, width
+
+    @staticmethod
+    def _trend_branch(table: str, tier: str, time_column: str, count: str, width: int,
+                      by_name: bool) -> str:
+        partial = []
+        for column, prefix in ROLLUP_COLUMNS[table]:
+            if tier == 'raw':
+                low = high = total = f'COALESCE({column}, 0)'
+            else:
+                low, high, total = f'{prefix}_min', f'{prefix}_max', f'{prefix}_sum'
+            partial += [f'MIN({low}) AS {prefix}_min', f'MAX({high}) AS {prefix}_max',
+                        f'SUM({total}) AS {prefix}_sum']
+        partial.append(f'SUM({count}) AS count')
+
+        where = [f'{time_column} >= ?', f'{time_column} < ?']
+        if by_name:
+            where.insert(0, 'name_id = (SELECT id FROM names WHERE name = ?)')
+        return (f"SELECT ({time_column} / {width}) * {width} AS bucket, {', '.join(partial)} "
+                f"FROM {{table}} WHERE {' AND '.join(where)} GROUP BY 1")
+
+    def apply_retention(self, overrides: Optional[Dict[str, Optional[float]]] = None) -> int:
+        """Drop partitions that ended more than their class's retention ago.
+
+        overrides replaces the configured days of some classes for this run.
+        Returns the number of partitions dropped.
+        """
+        retention = {**self.retention, **(overrides or {})}
+        now = now_ms()
+        dropped = 0
+        try:
+            for base, (_, kind, _) in PARTITIONS.items():
+                days = retention.get(kind)
+                if days is None:
+                    continue
+                cutoff = now - int(days * DAY_MS)
+                partitions = self._partitions[base]
+                while partitions and partitions[0][1] <= cutoff:
+                    _, _, name = partitions.pop(0)
+                    self.conn.execute(f'DROP TABLE IF EXISTS {name}')
+                    self.conn.execute('DELETE FROM partitions WHERE name = ?', (name,))
+                    dropped += 1
+        except sqlite3.Error as e:
+            print(f"Error applying retention: {e}")
+        if dropped:
+            self.commit()
+            self._vacuum_due = True
+        return dropped
+
+    def convert_to_incremental_vacuum(self) -> bool:
+        """Run enable_incremental_vacuum on this file; see there for the cost."""
+        self.commit()
+        converted = enable_incremental_vacuum(self.conn)
+        self._vacuum_due = True
+        return converted
+
+    def _vacuum_step(self) -> None:
+        # Returns a bounded number of free pages; the writer runs the next
+        # step once the queue is empty again, so stores are not held up
+        self._vacuum_due = False
+        try:
+            if self.conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                return  # Not converted; free pages are reused by later writes
+            self.conn.execute(f'PRAGMA incremental_vacuum({self.VACUUM_PAGES})').fetchall()
+            self._vacuum_due = self.conn.execute('PRAGMA freelist_count').fetchone()[0] > 0
+        except sqlite3.Error as e:
+            print(f"Error vacuuming database: {e}")
+
+    def intern(self, table: str, value: Optional[str]) -> Optional[int]:
+        if value is None:
+            return None
+        ids = self._ids[table]
+        string_id = ids.get(value)
+        if string_id is None:
+            self.conn.execute(f'INSERT OR IGNORE INTO {table}(name) VALUES (?)', (value,))
+            string_id = self.conn.execute(f'SELECT id FROM {table} WHERE name = ?',
+                                          (value,)).fetchone()[0]
+            ids[value] = string_id
+        return string_id
+
+    def insert_processes(self, timestamp: int, rows: Sequence[Tuple]) -> None:
+        """rows are (pid, start_time_ms, name, cpu_percent, memory_mb, threads, status, username, data)."""
+        try:
+            samples = [
+                (timestamp, pid, start_time, self.intern('names', name), cpu, memory_mb, threads,
+                 status, self.intern('users', username), data)
+                for pid, start_time, name, cpu, memory_mb, threads, status, username, data in rows
+            ]
+            self.conn.executemany(f'''
+                INSERT INTO {self.partition('process_samples', timestamp)}
+                (timestamp, pid, start_time, name_id, cpu_percent, memory_mb, threads, status,
+                 user_id, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', samples)
+
+            # One rollup row per name: processes sharing a name are merged
+            merged: Dict[int, List[float]] = {}
+            for sample in samples:
+                name_id, cpu, memory = sample[3], sample[4] or 0.0, sample[5] or 0.0
+                if name_id is None:
+                    continue
+                stats = merged.get(name_id)
+                if stats is None:
+                    merged[name_id] = [cpu, cpu, cpu, memory, memory, memory, 1]
+                    continue
+                for offset, value in ((0, cpu), (3, memory)):
+                    stats[offset] = min(stats[offset], value)
+                    stats[offset + 1] = max(stats[offset + 1], value)
+                    stats[offset + 2] += value
+                stats[6] += 1
+            for tier, size in ROLLUP_TIERS:
+                bucket = timestamp // size * size
+                rollup = self.partition(f'process_rollup_{tier}', bucket)
+                self.conn.executemany(_rollup_upsert('process', rollup),
+                                      [(bucket, name_id, *stats) for name_id, stats in merged.items()])
+        except sqlite3.Error as e:
+            print(f"Error storing process data: {e}")
+
+    def insert_system(self, timestamp: int, cpu_percent: float, memory_percent: float,
+                      disk_percent: float, total_processes: Optional[int],
+                      data: Optional[str]) -> None:
+        try:
+            self.conn.execute(f'''
+                INSERT INTO {self.partition('system_samples', timestamp)}
+                (timestamp, cpu_percent, memory_percent, disk_percent, total_processes, data)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (timestamp, cpu_percent, memory_percent, disk_percent, total_processes, data))
+
+            stats = []
+            for value in (cpu_percent, memory_percent, disk_percent):
+                value = value or 0.0
+                stats += [value, value, value]
+            for tier, size in ROLLUP_TIERS:
+                bucket = timestamp // size * size
+                rollup = self.partition(f'system_rollup_{tier}', bucket)
+                self.conn.execute(_rollup_upsert('system', rollup), (bucket, *stats, 1))
+        except sqlite3.Error as e:
+            print(f"Error storing system data: {e}")
+
+    def insert_event(self, timestamp: int, event_type: str, description: str, data: str) -> None:
+        try:
+            self.conn.execute(
+                f"INSERT INTO {self.partition('events', timestamp)} "
+                "(timestamp, event_type, description, data) VALUES (?, ?, ?, ?)",
+                (timestamp, event_type, description, data))
+        except sqlite3.Error as e:
+            print(f"Error logging event: {e}")
+
+    def query(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        """Writer thread only; use call(engine.query, ...) from elsewhere."""
+        cursor = self.conn.execute(sql, params)
+        cursor.row_factory = sqlite3.Row
+        return cursor.fetchall()
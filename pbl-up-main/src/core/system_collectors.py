@@ -0,0 +1,126 @@
+"""
+System counter readers for TaskMaster.
+Reads cumulative per-CPU, per-disk and per-interface counters for the system monitor.
+"""
+
+import os
+from typing import Dict, Tuple
+
+import psutil
+
+# /proc/diskstats always counts in 512-byte sectors, whatever the device's block size
+SECTOR_SIZE = 512
+
+# Virtual devices that never carry real I/O
+IGNORED_DISK_PREFIXES = ('loop', 'ram', 'zram', 'fd')
+
+
+class ProcSystemReader:
+    """Reads /proc/stat, /proc/diskstats and /proc/net/dev, each once per call.
+
+    cpu_times() returns {cpu: (busy_ticks, total_ticks)} with 'cpu' the
+    aggregate line, disk_counters() returns {device: (reads, writes,
+    read_bytes, write_bytes, io_ms, busy_ms)} for whole disks and
+    net_counters() returns {interface: (rx_bytes, tx_bytes, rx_packets,
+    tx_packets)}.
+    """
+
+    name = 'procfs'
+
+    def __init__(self, proc_path: str = '/proc', sys_path: str = '/sys'):
+        self.proc_path = proc_path
+        self.sys_path = sys_path
+        # device name -> whether it is a whole disk rather than a partition
+        self._whole_disks: Dict[str, bool] = {}
+
+    def available(self) -> bool:
+        return os.path.exists(f"{self.proc_path}/stat")
+
+    def _read_lines(self, name: str):
+        with open(f"{self.proc_path}/{name}", 'rb') as f:
+            return f.read().splitlines()
+
+    def cpu_times(self) -> Dict[str, Tuple[int, int]]:
+        times = {}
+        for line in self._read_lines('stat'):
+            if not line.startswith(b'cpu'):
+                break
+            fields = line.split()
+            # user nice system idle iowait irq softirq steal [guest guest_nice]
+            # guest time is already included in user and nice
+            ticks = [int(value) for value in fields[1:9]]
+            total = sum(ticks)
+            times[fields[0].decode()] = (total - ticks[3] - ticks[4], total)
+        return times
+
+    def _is_whole_disk(self, device: str) -> bool:
+        whole = self._whole_disks.get(device)
+        if whole is None:
+            whole = not device.startswith(IGNORED_DISK_PREFIXES) and \
+                os.path.exists(f"{self.sys_path}/block/{device}")
+            self._whole_disks[device] = whole
+        return whole
+
+    def disk_counters(self) -> Dict[str, Tuple[int, ...]]:
+        counters = {}
+        for line in self._read_lines('diskstats'):
+            fields = line.split()
+            device = fields[2].decode()
+            if len(fields) < 14 or not self._is_whole_disk(device):
+                continue
+            reads, sectors_read, read_ms = int(fields[3]), int(fields[5]), int(fields[6])
+            writes, sectors_written, write_ms = int(fields[7]), int(fields[9]), int(fields[10])
+            counters[device] = (reads, writes, sectors_read * SECTOR_SIZE,
+                                sectors_written * SECTOR_SIZE, read_ms + write_ms, int(fields[12]))
+        return counters
+
+    def net_counters(self) -> Dict[str, Tuple[int, int, int, int]]:
+        counters = {}
+        # Two header lines, then "iface: rx_bytes rx_packets ... tx_bytes tx_packets ..."
+        for line in self._read_lines('net/dev')[2:]:
+            interface, _, data = line.partition(b':')
+            fields = data.split()
+            counters[interface.strip().decode()] = (int(fields[0]), int(fields[8]),
+                                                    int(fields[1]), int(fields[9]))
+        return counters
+
+
+class PsutilSystemReader:
+    """Same interface as ProcSystemReader, backed by psutil for other platforms."""
+
+    name = 'psutil'
+
+    def available(self) -> bool:
+        return True
+
+    def cpu_times(self) -> Dict[str, Tuple[float, float]]:
+        def busy_total(times) -> Tuple[float, float]:
+            total = sum(times)
+            idle = times.idle + getattr(times, 'iowait', 0.0)
+            return total - idle, total
+
+        times = {'cpu': busy_total(psutil.cpu_times())}
+        for i, core in enumerate(psutil.cpu_times(percpu=True)):
+            times[f"cpu{i}"] = busy_total(core)
+        return times
+
+    def disk_counters(self) -> Dict[str, Tuple[float, ...]]:
+        counters = {}
+        for device, io in (psutil.disk_io_counters(perdisk=True, nowrap=True) or {}).items():
+            if device.startswith(IGNORED_DISK_PREFIXES):
+                continue
+            io_ms = getattr(io, 'read_time', 0) + getattr(io, 'write_time', 0)
+            counters[device] = (io.read_count, io.write_count, io.read_bytes, io.write_bytes,
+                                io_ms, getattr(io, 'busy_time', -1))
+        return counters
+
+    def net_counters(self) -> Dict[str, Tuple[int, int, int, int]]:
+        return {
+            interface: (io.bytes_recv, io.bytes_sent, io.packets_recv, io.packets_sent)
+            for interface, io in psutil.net_io_counters(pernic=True, nowrap=True).items()
+        }
+
+
+def get_system_reader():
+    reader = ProcSystemReader()
+    return reader if reader.available() else PsutilSystemReader()
@@ -0,0 +1,50 @@
+"""
+Thread sampler module for TaskMaster.
+Samples per-thread CPU usage of a single process on demand.
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from src.core.collectors import get_collector
+from src.core.counter_delta import CounterDeltaEngine
+
+
+class ThreadSampler:
+    """Per-thread CPU rates for one process, computed between sample() calls.
+
+    Each call reads one stat file per thread and keeps only the previous CPU
+    time per (tid, create_time), so it is meant to be driven while a view is
+    showing the process and dropped afterwards.
+    """
+
+    def __init__(self, pid: int, collector=None):
+        self.pid = pid
+        self.collector = collector or get_collector()
+        self._rates = CounterDeltaEngine(1)
+        self._last_wall: Optional[float] = None
+
+    def sample(self) -> List[Dict[str, Any]]:
+        wall = time.time()
+        self._rates.begin(time.monotonic())
+
+        rows = []
+        for thread in self.collector.threads(self.pid):
+            # Threads started since the last sample are measured from their start
+            age = None
+            if self._last_wall is not None and thread.create_time >= self._last_wall:
+                age = wall - thread.create_time
+            rate = self._rates.update((thread.tid, thread.create_time), (thread.cpu_time,), age)[0]
+            rows.append({
+                'tid': thread.tid,
+                'name': thread.name,
+                'status': thread.status,
+                'cpu_percent': rate * 100,
+                'cpu_time': thread.cpu_time,
+                'processor': thread.processor,
+            })
+
+        self._rates.end()
+        self._last_wall = wall
+        rows.sort(key=lambda row: row['cpu_percent'], reverse=True)
+        return rows
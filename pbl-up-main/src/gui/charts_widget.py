@@ -153,12 +153,12 @@ class ChartsWidget(QWidget):
 
         self.setStyleSheet("background-color: #1E1E1E; color: white;")
 
-    def update_data(self, system_monitor):
+    def update_data(self, system_stats):
         try:
-            self.cpu_graph.update_data(system_monitor.cpu_percent)
+            self.cpu_graph.update_data(system_stats.cpu_percent)
 
-            self.memory_graph.update_data(system_monitor.memory_percent)
+            self.memory_graph.update_data(system_stats.memory_percent)
 
-            self.disk_graph.update_data(system_monitor.disk_percent)
+            self.disk_graph.update_data(system_stats.disk_percent)
         except Exception as e:
             print(f"Error updating charts: {e}")
@@ -9,27 +9,47 @@ from PyQt6.QtGui import QAction, QFont, QColor
 
 import psutil
 from datetime import datetime
+from typing import Optional
 
 from src.core.process_monitor import ProcessManager
-from src.gui.performance_dialog import PerformanceDialog
 from src.core.process_monitor_thread import ProcessMonitorThread
 from src.core.database_manager import DatabaseManager  # Add this import
+from src.core.data_storage import DataStorage
 
 class MainWindow(QMainWindow):
 
-    def __init__(self):
+    def __init__(self, remote_address: Optional[str] = None):
         super().__init__()
 
-        self.setWindowTitle("TaskMaster")
+        self.remote_address = remote_address
+        self.setWindowTitle(f"TaskMaster - {remote_address}" if remote_address else "TaskMaster")
         self.setMinimumSize(800, 500)
 
-        self.process_manager = ProcessManager()
+        if remote_address:
+            # Imported here so the local-only GUI never loads the socket client
+            from src.core.remote import RemoteProcessManager
+            self.process_manager = RemoteProcessManager(remote_address)
+        else:
+            self.process_manager = ProcessManager()
+        # The metric this window asked the collector to select by, see change_sort_metric
+        self.sort_request = None
         self.db_manager = DatabaseManager()  # Initialize DatabaseManager
 
-        self.process_manager.update_all()
+        # The first scan runs on the monitor thread, so the window is drawn
+        # right away and filled in by on_background_update when it lands
+        self._first_scan_shown = False
+
+        # Process start/exit events are logged on the collector thread and shown in the status bar
+        # A remote host's events and history belong to its own agent, not the local database
+        self.event_storage = None
+        if not remote_address:
+            self.event_storage = DataStorage()
+            self.process_manager.lifecycle.subscribe(self.event_storage.log_process_event)
+            self.process_manager.lifecycle.start()
 
-        self.monitor_thread = ProcessMonitorThread(self.process_manager, update_interval=5)
+        self.monitor_thread = ProcessMonitorThread(self.process_manager)
         self.monitor_thread.update_complete.connect(self.on_background_update)
+        self.monitor_thread.process_event.connect(self.on_process_event)
         self.monitor_thread.start()
 
         self._setup_ui()
@@ -41,7 +61,8 @@ class MainWindow(QMainWindow):
         # Add timer for database updates
         self.db_update_timer = QTimer(self)
         self.db_update_timer.timeout.connect(self.update_database)
-        self.db_update_timer.start(300000)  # 5 minutes
+        if not remote_address:
+            self.db_update_timer.start(300000)  # 5 minutes
 
     def _setup_ui(self):
         central_widget = QWidget()
@@ -68,6 +89,35 @@ class MainWindow(QMainWindow):
         """)
         search_layout.addWidget(self.search_box)
 
+        search_layout.addWidget(QLabel("View:"))
+        self.view_combo = QComboBox()
+        self.view_combo.addItem("Processes", 'process')
+        if self.process_manager.cgroups is not None and self.process_manager.cgroups.available():
+            self.view_combo.addItem("Cgroups", 'cgroup')
+        self.view_combo.currentIndexChanged.connect(self.change_view)
+        search_layout.addWidget(self.view_combo)
+
+        search_layout.addWidget(QLabel("Sort by:"))
+        self.sort_combo = QComboBox()
+        for label, metric in [("CPU", 'cpu'), ("Memory", 'rss'), ("Disk I/O", 'io'),
+                              ("Disk Read", 'read'), ("Disk Write", 'write'),
+                              ("Syscalls", 'syscalls'), ("Voluntary Switches", 'ctx_vol'),
+                              ("Involuntary Switches", 'ctx_invol'),
+                              ("Threads", 'threads'), ("File Descriptors", 'fds')]:
+            self.sort_combo.addItem(label, metric)
+        self.sort_combo.currentIndexChanged.connect(self.change_sort_metric)
+        self.sort_combo.setStyleSheet("""
+            QComboBox {
+                background-color: #3E4154;
+                color: white;
+                border: 1px solid #4F5D75;
+                border-radius: 3px;
+                padding: 3px;
+            }
+        """)
+        search_layout.addWidget(self.sort_combo)
+        self.view_combo.setStyleSheet(self.sort_combo.styleSheet())
+
         start_process_layout = QHBoxLayout()
 
         button_style = """
@@ -199,7 +249,9 @@ class MainWindow(QMainWindow):
 
         self.setCentralWidget(central_widget)
 
-        self.statusBar().showMessage("Ready")
+        self.statusBar().showMessage("Scanning processes...")
+        self.last_event_label = QLabel("")
+        self.statusBar().addPermanentWidget(self.last_event_label)
         self.statusBar().setStyleSheet("""
             QStatusBar {
                 background-color: #3E4154;
@@ -282,30 +334,44 @@ class MainWindow(QMainWindow):
 
     @pyqtSlot()
     def on_background_update(self):
-        pass
+        if not self._first_scan_shown and len(self.process_manager.snapshot):
+            self._first_scan_shown = True
+            self.update_ui()
+
+    @pyqtSlot(object)
+    def on_process_event(self, event):
+        self.last_event_label.setText(
+            f"{event.name} (PID {event.pid}) {event.kind} at "
+            f"{datetime.fromtimestamp(event.timestamp).strftime('%H:%M:%S')}"
+        )
 
     @pyqtSlot()
     def update_ui(self):
-        self._update_process_table()
+        # One published snapshot serves the whole refresh, however often the monitor thread swaps it
+        snapshot = self.process_manager.snapshot
+        self._update_process_table(snapshot)
 
-        total_processes = len(psutil.pids())
+        total_processes = len(snapshot)
         self.total_processes_label.setText(str(total_processes))
-        self.statusBar().showMessage(f"Showing top 10 processes | Last updated: {datetime.now().strftime('%H:%M:%S')}")
+        self.statusBar().showMessage(f"Showing top 10 {self.view_combo.currentText().lower()} by {self.sort_combo.currentText()} | Last updated: {datetime.now().strftime('%H:%M:%S')}")
 
         selected_row = self.process_table.currentRow()
         if selected_row >= 0:
             self.show_process_info()
 
-    def _update_process_table(self):
-        process_list = self.process_manager.get_process_list()
+    def _update_process_table(self, snapshot=None):
+        if self.view_combo.currentData() == 'cgroup':
+            self._update_cgroup_table()
+            return
 
-        filter_text = self.search_box.text().lower()
-        if filter_text:
-            process_list = [p for p in process_list if filter_text in p['name'].lower()]
+        if snapshot is None:
+            snapshot = self.process_manager.snapshot
 
-        process_list.sort(key=lambda x: x['cpu_percent'], reverse=True)
+        filter_text = self.search_box.text()
+        if filter_text:
+            snapshot = snapshot.filter(snapshot.name_contains(filter_text))
 
-        process_list = process_list[:10]
+        snapshot = self.process_manager.top(self.sort_combo.currentData(), 10, snapshot)
 
         self.process_table.setRowCount(10)
 
@@ -313,7 +379,9 @@ class MainWindow(QMainWindow):
             for col in range(5):
                 self.process_table.setItem(row, col, QTableWidgetItem(""))
 
-        for row, process in enumerate(process_list):
+        total_memory = psutil.virtual_memory().total / (1024 * 1024)
+
+        for row, process in enumerate(snapshot.rows()):
             self.process_table.setItem(row, 0, QTableWidgetItem(str(process['pid'])))
 
             self.process_table.setItem(row, 1, QTableWidgetItem(process['name']))
@@ -324,7 +392,6 @@ class MainWindow(QMainWindow):
             cpu_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
             self.process_table.setItem(row, 3, cpu_item)
 
-            total_memory = psutil.virtual_memory().total / (1024 * 1024)
             memory_percent = (process['memory_mb'] / total_memory) * 100
             mem_item = QTableWidgetItem(f"{memory_percent:.1f}")
             mem_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
@@ -335,14 +402,72 @@ class MainWindow(QMainWindow):
                     item = self.process_table.item(row, col)
                     item.setBackground(QColor(120, 60, 60))
 
+    def _update_cgroup_table(self):
+        metric = self.sort_combo.currentData()
+        if metric not in self.process_manager.CGROUP_METRICS:
+            metric = 'cpu'
+        groups = self.process_manager.top_cgroups(metric, len(self.process_manager.cgroups.groups))
+
+        filter_text = self.search_box.text().lower()
+        if filter_text:
+            groups = [group for group in groups if filter_text in group['path'].lower()]
+        groups = groups[:10]
+
+        self.process_table.setRowCount(10)
+        for row in range(10):
+            for col in range(5):
+                self.process_table.setItem(row, col, QTableWidgetItem(""))
+
+        total_memory = psutil.virtual_memory().total
+
+        for row, group in enumerate(groups):
+            self.process_table.setItem(row, 0, QTableWidgetItem(str(group['pids'])))
+
+            name_item = QTableWidgetItem(group['name'])
+            name_item.setToolTip(group['path'])
+            self.process_table.setItem(row, 1, name_item)
+
+            io_item = QTableWidgetItem(f"{group['io_bps'] / (1024 * 1024):.2f} MB/s")
+            io_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.process_table.setItem(row, 2, io_item)
+
+            cpu_item = QTableWidgetItem(f"{group['cpu_percent']:.1f}")
+            cpu_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.process_table.setItem(row, 3, cpu_item)
+
+            mem_item = QTableWidgetItem(f"{group['memory_bytes'] / total_memory * 100:.1f}")
+            mem_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.process_table.setItem(row, 4, mem_item)
+
+    def change_view(self):
+        if self.view_combo.currentData() == 'cgroup':
+            headers = ["Tasks", "Cgroup", "Disk I/O", "CPU %", "Memory %"]
+        else:
+            headers = ["PID", "Name", "User", "CPU %", "Memory %"]
+        self.process_table.setHorizontalHeaderLabels(headers)
+        self.process_table.clearSelection()
+        self._update_process_table()
+
     def filter_processes(self):
         self._update_process_table()
 
+    def change_sort_metric(self):
+        # Make sure the collector gathers the metric (e.g. fd counts) from the next scan on,
+        # and stops selecting by the previous sort order
+        metric = self.sort_combo.currentData()
+        self.process_manager.request_top(metric, 10, replaces=self.sort_request)
+        self.sort_request = metric
+        self._update_process_table()
+
     def set_update_interval(self, interval_ms):
         self.update_timer.stop()
         self.update_timer.start(interval_ms)
 
     def get_selected_pid(self):
+        # Cgroup rows are not processes
+        if self.view_combo.currentData() == 'cgroup':
+            return None
+
         selected_items = self.process_table.selectedItems()
         if not selected_items:
             return None
@@ -402,8 +527,11 @@ class MainWindow(QMainWindow):
         self.info_status_label.setText(process.status)
         self.info_cpu_label.setText(f"{process.cpu_percent:.1f}%")
 
-        total_memory = psutil.virtual_memory().total / (1024 * 1024)
-        memory_percent = (process.memory_usage / total_memory) * 100
+        stats = self.process_manager.system_stats
+        # total_memory is in GB; a remote host's comes from its agent
+        total_memory = (stats.total_memory * 1024 if stats is not None
+                        else psutil.virtual_memory().total / (1024 * 1024))
+        memory_percent = (process.memory_usage / total_memory) * 100 if total_memory else 0.0
         self.info_memory_label.setText(f"{memory_percent:.1f}% ({process.memory_usage:.1f} MB)")
 
         self.info_threads_label.setText(str(process.num_threads))
@@ -415,6 +543,10 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Warning", "No process selected.")
             return
 
+        if self.remote_address:
+            QMessageBox.warning(self, "Warning", "Priorities cannot be changed on a remote host.")
+            return
+
         process = self.process_manager.get_process(pid)
         if not process:
             QMessageBox.warning(self, "Warning", f"Process with PID {pid} not found.")
@@ -488,6 +620,11 @@ class MainWindow(QMainWindow):
 
         priority_menu = context_menu.addMenu("Set Priority")
 
+        # Process control is not forwarded to remote agents
+        if self.remote_address:
+            end_process_action.setEnabled(False)
+            priority_menu.setEnabled(False)
+
         priorities = [
             ("Realtime", psutil.REALTIME_PRIORITY_CLASS if hasattr(psutil, 'REALTIME_PRIORITY_CLASS') else 256),
             ("High", psutil.HIGH_PRIORITY_CLASS if hasattr(psutil, 'HIGH_PRIORITY_CLASS') else 128),
@@ -616,32 +753,40 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Error", f"Failed to start process: {str(e)}")
 
     def show_performance_dialog(self):
+        # Imported on first use: the charts pull in matplotlib, which would slow down start-up
+        from src.gui.performance_dialog import PerformanceDialog
+
         dialog = PerformanceDialog(self.process_manager, self)
         dialog.exec()
 
     def closeEvent(self, event):
         if hasattr(self, 'monitor_thread') and self.monitor_thread.isRunning():
             self.monitor_thread.stop()
+        self.process_manager.lifecycle.stop()
+        self.process_manager.close()
+        if self.event_storage is not None:
+            self.event_storage.close()
+        self.db_manager.close()
 
         event.accept()
 
     def update_database(self):
         """Store current process and system data in the database."""
         try:
-            # Get current process list
-            process_list = self.process_manager.get_process_list()
-            
-            # Store in database
-            self.db_manager.store_process_data(process_list)
+            # Store the selected top processes (by CPU, memory, ...) of the current snapshot.
+            # Only queues work for the writer thread; if it is behind, the sample is dropped
+            snapshot = self.process_manager.snapshot
+            self.db_manager.store_snapshot(self.process_manager.select(snapshot), block=False)
             
-            # Get and store system data
+            # Store the latest published system reading
+            stats = self.process_manager.system_stats
             system_data = {
-                'cpu_percent': psutil.cpu_percent(),
-                'memory_percent': psutil.virtual_memory().percent,
-                'disk_percent': psutil.disk_usage('/').percent,
-                'total_processes': len(psutil.pids())
+                'cpu_percent': stats.cpu_percent,
+                'memory_percent': stats.memory_percent,
+                'disk_percent': stats.disk_percent,
+                'total_processes': len(snapshot)
             }
-            self.db_manager.store_system_data(system_data)
+            self.db_manager.store_system_data(system_data, block=False)
         except Exception as e:
             print(f"Error updating database: {e}")
 
@@ -85,7 +85,7 @@ class PerformanceDialog(QDialog):
         """Update the charts with current system data."""
         # Only update if dialog is visible to save resources
         if self.is_visible:
-            self.charts_widget.update_data(self.process_manager.system_monitor)
+            self.charts_widget.update_data(self.process_manager.system_stats)
 
     def showEvent(self, event):
         """Handle dialog show event."""
@@ -14,6 +14,11 @@ from PyQt6.QtGui import QFont
 import psutil
 from datetime import datetime
 
+from src.core.thread_sampler import ThreadSampler
+
+# Rows shown in the thread table, busiest first
+MAX_THREAD_ROWS = 50
+
 class ProcessDetailDialog(QDialog):
     """Dialog for displaying detailed process information."""
 
@@ -33,6 +38,11 @@ class ProcessDetailDialog(QDialog):
         self.update_timer.timeout.connect(self.update_data)
         self.update_timer.start(5000)  # Update every 5 seconds
 
+        # Per-thread CPU rates need a short interval; the timer only runs while the dialog is shown
+        self.thread_sampler = ThreadSampler(process.pid, process.collector)
+        self.thread_timer = QTimer(self)
+        self.thread_timer.timeout.connect(self._update_thread_table)
+
         # Initial update
         self.update_data()
 
@@ -116,6 +126,14 @@ class ProcessDetailDialog(QDialog):
         self.thread_count_label.setFont(QFont('Arial', 12, QFont.Weight.Bold))
         threads_layout.addWidget(self.thread_count_label)
 
+        self.thread_table = QTableWidget()
+        self.thread_table.setColumnCount(5)
+        self.thread_table.setHorizontalHeaderLabels(["TID", "Name", "State", "CPU %", "Last CPU"])
+        self.thread_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.thread_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.thread_table.verticalHeader().setVisible(False)
+        threads_layout.addWidget(self.thread_table)
+
         # Create memory tab
         memory_tab = QWidget()
         memory_layout = QVBoxLayout(memory_tab)
@@ -160,6 +178,7 @@ class ProcessDetailDialog(QDialog):
 
             if not self.process.is_running:
                 self.update_timer.stop()
+                self.thread_timer.stop()
                 self.setWindowTitle(f"Process Details: {self.process.name} (PID: {self.process.pid}) - TERMINATED")
                 return
 
@@ -176,35 +195,68 @@ class ProcessDetailDialog(QDialog):
             self.cpu_bar.setValue(int(self.process.cpu_percent))
 
             self.memory_label.setText(f"{self.process.memory_usage:.1f} MB")
-            # Set memory bar to percentage of system memory
-            total_memory = psutil.virtual_memory().total / (1024 * 1024)  # MB
-            memory_percent = (self.process.memory_usage / total_memory) * 100
+            # Set memory bar to percentage of the memory of the process's host
+            total_memory = self.process.system_memory()  # MB
+            memory_percent = (self.process.memory_usage / total_memory) * 100 if total_memory else 0
             self.memory_bar.setValue(int(memory_percent))
 
             self.threads_label.setText(str(self.process.num_threads))
 
-            # Update thread count display
-            self.thread_count_label.setText(f"{self.process.num_threads} threads running")
-
             # Update memory table
             self._update_memory_table()
 
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
             self.update_timer.stop()
+            self.thread_timer.stop()
             self.setWindowTitle(f"Process Details: {self.process.name} (PID: {self.process.pid}) - TERMINATED")
 
-    # Thread table update method removed - simplified interface
+    def showEvent(self, event):
+        """Start thread sampling when the dialog is shown."""
+        super().showEvent(event)
+        self._update_thread_table()
+        self.thread_timer.start(1000)
+
+    def hideEvent(self, event):
+        """Stop thread sampling when the dialog is closed or hidden."""
+        self.thread_timer.stop()
+        super().hideEvent(event)
+
+    @pyqtSlot()
+    def _update_thread_table(self):
+        """Update the thread table with per-thread CPU rates."""
+        threads = self.thread_sampler.sample()
+        if not threads:
+            return
+
+        shown = threads[:MAX_THREAD_ROWS]
+        text = f"{len(threads)} threads running"
+        if len(threads) > len(shown):
+            text += f" (showing the {len(shown)} busiest)"
+        self.thread_count_label.setText(text)
+
+        self.thread_table.setRowCount(len(shown))
+        for row, thread in enumerate(shown):
+            self.thread_table.setItem(row, 0, QTableWidgetItem(str(thread['tid'])))
+            self.thread_table.setItem(row, 1, QTableWidgetItem(thread['name']))
+            self.thread_table.setItem(row, 2, QTableWidgetItem(thread['status']))
+
+            cpu_item = QTableWidgetItem(f"{thread['cpu_percent']:.1f}")
+            cpu_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.thread_table.setItem(row, 3, cpu_item)
+
+            processor = thread['processor']
+            self.thread_table.setItem(row, 4, QTableWidgetItem(str(processor) if processor >= 0 else "N/A"))
 
     def _update_memory_table(self):
         """Update the memory table."""
         try:
-            memory_info = self.process.process.memory_info()
             memory_types = [
-                ("RSS (Resident Set Size)", memory_info.rss / (1024 * 1024), "MB"),
-                ("VMS (Virtual Memory Size)", memory_info.vms / (1024 * 1024), "MB"),
+                ("RSS (Resident Set Size)", self.process.memory_usage, "MB"),
+                ("VMS (Virtual Memory Size)", self.process.virtual_memory_usage, "MB"),
             ]
 
-            # Add platform-specific memory info
+            # Add platform-specific memory info; psutil only sees processes on this machine
+            memory_info = self.process.process.memory_info() if self.process.is_local else None
             if hasattr(memory_info, 'shared'):
                 memory_types.append(("Shared", memory_info.shared / (1024 * 1024), "MB"))
             if hasattr(memory_info, 'text'):
@@ -215,12 +267,18 @@ class ProcessDetailDialog(QDialog):
                 memory_types.append(("Lib", memory_info.lib / (1024 * 1024), "MB"))
             if hasattr(memory_info, 'dirty'):
                 memory_types.append(("Dirty", memory_info.dirty / (1024 * 1024), "MB"))
-            if hasattr(memory_info, 'uss'):
-                memory_types.append(("USS (Unique Set Size)", memory_info.uss / (1024 * 1024), "MB"))
-            if hasattr(memory_info, 'pss'):
-                memory_types.append(("PSS (Proportional Set Size)", memory_info.pss / (1024 * 1024), "MB"))
-            if hasattr(memory_info, 'swap'):
-                memory_types.append(("Swap", memory_info.swap / (1024 * 1024), "MB"))
+
+            # PSS/USS/swap come from the cached smaps_rollup breakdown, refreshed at most every 5 seconds
+            breakdown = self.process.memory_breakdown(max_age=5.0)
+            if breakdown is not None:
+                if breakdown.uss >= 0:
+                    memory_types.append(("USS (Unique Set Size)", breakdown.uss / (1024 * 1024), "MB"))
+                if breakdown.pss >= 0:
+                    memory_types.append(("PSS (Proportional Set Size)", breakdown.pss / (1024 * 1024), "MB"))
+                if breakdown.swap >= 0:
+                    memory_types.append(("Swap", breakdown.swap / (1024 * 1024), "MB"))
+                if breakdown.swap_pss >= 0:
+                    memory_types.append(("Swap PSS", breakdown.swap_pss / (1024 * 1024), "MB"))
 
             self.memory_table.setRowCount(len(memory_types))
 
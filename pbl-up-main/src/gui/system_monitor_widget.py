@@ -5,7 +5,7 @@ Displays system resource usage information.
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, QGridLayout,
-    QLabel, QProgressBar, QSizePolicy
+    QLabel, QProgressBar, QSizePolicy, QTableWidget, QTableWidgetItem, QHeaderView
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
@@ -52,6 +52,11 @@ class SystemMonitorWidget(QWidget):
         self.cpu_freq_label = QLabel()
         cpu_info_layout.addWidget(self.cpu_freq_label, 1, 1)
         
+        cpu_info_layout.addWidget(QLabel("Per-Core Usage:"), 2, 0)
+        self.per_cpu_label = QLabel()
+        self.per_cpu_label.setWordWrap(True)
+        cpu_info_layout.addWidget(self.per_cpu_label, 2, 1)
+        
         cpu_layout.addLayout(cpu_info_layout)
         
         # Memory group
@@ -120,17 +125,22 @@ class SystemMonitorWidget(QWidget):
         
         disk_layout.addLayout(disk_info_layout)
         
+        # Per-device I/O rates
+        self.disk_table = self._create_rate_table(
+            ["Device", "Read IOPS", "Write IOPS", "Read/s", "Write/s", "Await", "Util"])
+        disk_layout.addWidget(self.disk_table)
+        
         # Network group
         network_group = QGroupBox("Network Usage")
         network_layout = QGridLayout(network_group)
         
-        network_layout.addWidget(QLabel("Bytes Sent:"), 0, 0)
-        self.bytes_sent_label = QLabel()
-        network_layout.addWidget(self.bytes_sent_label, 0, 1)
+        network_layout.addWidget(QLabel("Send Rate:"), 0, 0)
+        self.send_rate_label = QLabel()
+        network_layout.addWidget(self.send_rate_label, 0, 1)
         
-        network_layout.addWidget(QLabel("Bytes Received:"), 1, 0)
-        self.bytes_recv_label = QLabel()
-        network_layout.addWidget(self.bytes_recv_label, 1, 1)
+        network_layout.addWidget(QLabel("Receive Rate:"), 1, 0)
+        self.recv_rate_label = QLabel()
+        network_layout.addWidget(self.recv_rate_label, 1, 1)
         
         network_layout.addWidget(QLabel("Packets Sent:"), 2, 0)
         self.packets_sent_label = QLabel()
@@ -140,6 +150,11 @@ class SystemMonitorWidget(QWidget):
         self.packets_recv_label = QLabel()
         network_layout.addWidget(self.packets_recv_label, 3, 1)
         
+        # Per-interface rates
+        self.network_table = self._create_rate_table(
+            ["Interface", "Receive/s", "Send/s", "Packets In/s", "Packets Out/s"])
+        network_layout.addWidget(self.network_table, 4, 0, 1, 2)
+        
         # Add groups to main layout
         main_layout.addWidget(cpu_group)
         main_layout.addWidget(memory_group)
@@ -149,49 +164,89 @@ class SystemMonitorWidget(QWidget):
         # Add stretch to push everything to the top
         main_layout.addStretch()
     
-    def update_data(self, system_monitor):
-        """Update the widget with system monitor data."""
+    def update_data(self, system_stats):
+        """Update the widget with a SystemStats reading."""
         # Update CPU information
-        self.cpu_bar.setValue(int(system_monitor.cpu_percent))
-        self.cpu_percent_label.setText(f"{system_monitor.cpu_percent:.1f}%")
+        self.cpu_bar.setValue(int(system_stats.cpu_percent))
+        self.cpu_percent_label.setText(f"{system_stats.cpu_percent:.1f}%")
         
-        self.cpu_count_label.setText(f"{system_monitor.cpu_count} cores")
+        self.cpu_count_label.setText(f"{system_stats.cpu_count} cores")
         
-        if system_monitor.cpu_freq:
-            freq_text = f"{system_monitor.cpu_freq.current:.2f} MHz"
-            if hasattr(system_monitor.cpu_freq, 'min') and system_monitor.cpu_freq.min:
-                freq_text += f" (Min: {system_monitor.cpu_freq.min:.2f} MHz"
-            if hasattr(system_monitor.cpu_freq, 'max') and system_monitor.cpu_freq.max:
-                freq_text += f", Max: {system_monitor.cpu_freq.max:.2f} MHz)"
+        if system_stats.cpu_freq:
+            freq_text = f"{system_stats.cpu_freq.current:.2f} MHz"
+            if hasattr(system_stats.cpu_freq, 'min') and system_stats.cpu_freq.min:
+                freq_text += f" (Min: {system_stats.cpu_freq.min:.2f} MHz"
+            if hasattr(system_stats.cpu_freq, 'max') and system_stats.cpu_freq.max:
+                freq_text += f", Max: {system_stats.cpu_freq.max:.2f} MHz)"
             self.cpu_freq_label.setText(freq_text)
         else:
             self.cpu_freq_label.setText("N/A")
         
         # Update memory information
-        self.memory_bar.setValue(int(system_monitor.memory_percent))
-        self.memory_percent_label.setText(f"{system_monitor.memory_percent:.1f}%")
+        self.memory_bar.setValue(int(system_stats.memory_percent))
+        self.memory_percent_label.setText(f"{system_stats.memory_percent:.1f}%")
         
-        self.total_memory_label.setText(f"{system_monitor.total_memory:.2f} GB")
-        self.available_memory_label.setText(f"{system_monitor.available_memory:.2f} GB")
+        self.total_memory_label.setText(f"{system_stats.total_memory:.2f} GB")
+        self.available_memory_label.setText(f"{system_stats.available_memory:.2f} GB")
         
-        used_memory = system_monitor.total_memory - system_monitor.available_memory
+        used_memory = system_stats.total_memory - system_stats.available_memory
         self.used_memory_label.setText(f"{used_memory:.2f} GB")
         
         # Update disk information
-        self.disk_bar.setValue(int(system_monitor.disk_percent))
-        self.disk_percent_label.setText(f"{system_monitor.disk_percent:.1f}%")
+        self.disk_bar.setValue(int(system_stats.disk_percent))
+        self.disk_percent_label.setText(f"{system_stats.disk_percent:.1f}%")
         
-        self.total_disk_label.setText(f"{system_monitor.disk_total:.2f} GB")
-        self.used_disk_label.setText(f"{system_monitor.disk_used:.2f} GB")
+        self.total_disk_label.setText(f"{system_stats.disk_total:.2f} GB")
+        self.used_disk_label.setText(f"{system_stats.disk_used:.2f} GB")
         
-        free_disk = system_monitor.disk_total - system_monitor.disk_used
+        free_disk = system_stats.disk_total - system_stats.disk_used
         self.free_disk_label.setText(f"{free_disk:.2f} GB")
         
+        self._fill_rate_table(self.disk_table, [
+            [device, f"{rates['read_iops']:.1f}", f"{rates['write_iops']:.1f}",
+             self._format_rate(rates['read_bps']), self._format_rate(rates['write_bps']),
+             f"{rates['await_ms']:.2f} ms", f"{rates['util_percent']:.1f}%"]
+            for device, rates in sorted(system_stats.disks.items())
+        ])
+        
+        # Update per-core usage
+        self.per_cpu_label.setText("  ".join(
+            f"{i}: {percent:.0f}%" for i, percent in enumerate(system_stats.per_cpu)))
+        
         # Update network information
-        self.bytes_sent_label.setText(self._format_bytes(system_monitor.net_io.bytes_sent))
-        self.bytes_recv_label.setText(self._format_bytes(system_monitor.net_io.bytes_recv))
-        self.packets_sent_label.setText(f"{system_monitor.net_io.packets_sent:,}")
-        self.packets_recv_label.setText(f"{system_monitor.net_io.packets_recv:,}")
+        self.send_rate_label.setText(self._format_rate(system_stats.net_tx_bps))
+        self.recv_rate_label.setText(self._format_rate(system_stats.net_rx_bps))
+        self.packets_sent_label.setText(f"{system_stats.net_tx_pps:,.1f}/s")
+        self.packets_recv_label.setText(f"{system_stats.net_rx_pps:,.1f}/s")
+        
+        self._fill_rate_table(self.network_table, [
+            [interface, self._format_rate(rates['rx_bps']), self._format_rate(rates['tx_bps']),
+             f"{rates['rx_pps']:,.1f}", f"{rates['tx_pps']:,.1f}"]
+            for interface, rates in sorted(system_stats.interfaces.items())
+        ])
+    
+    def _create_rate_table(self, headers):
+        """Create a read-only table for per-device rates."""
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        return table
+    
+    def _fill_rate_table(self, table, rows):
+        """Replace the contents of a rate table."""
+        table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            for j, text in enumerate(row):
+                item = QTableWidgetItem(text)
+                if j > 0:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(i, j, item)
+    
+    def _format_rate(self, bytes_per_second):
+        """Format a byte rate to human-readable format."""
+        return f"{self._format_bytes(bytes_per_second)}/s"
     
     def _format_bytes(self, bytes_value):
         """Format bytes to human-readable format."""
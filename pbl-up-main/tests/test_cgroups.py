@@ -0,0 +1,73 @@
+from src.core.cgroups import CgroupMonitor, find_cgroup2_mount
+from tests.test_snapshot import make_snapshot, sample
+
+
+def write_cgroup(mount, path, usage_usec, memory, io=None, pids=None):
+    group = mount / path.strip('/')
+    group.mkdir(parents=True, exist_ok=True)
+    (group / 'cpu.stat').write_text(f"usage_usec {usage_usec}\nuser_usec 0\nsystem_usec 0\n")
+    (group / 'memory.current').write_text(f"{memory}\n")
+    if io is not None:
+        (group / 'io.stat').write_text(io)
+    if pids is not None:
+        (group / 'pids.current').write_text(f"{pids}\n")
+
+
+def make_tree(tmp_path, membership):
+    proc, mount = tmp_path / 'proc', tmp_path / 'cgroup'
+    (proc / 'self').mkdir(parents=True)
+    (proc / 'self' / 'mountinfo').write_text(
+        "22 1 0:21 / /sys/fs/cgroup/unified rw - cgroup cgroup rw,cpu\n"
+        f"35 24 0:30 / {mount} rw,nosuid - cgroup2 cgroup2 rw\n")
+    for pid, path in membership.items():
+        (proc / str(pid)).mkdir()
+        (proc / str(pid) / 'cgroup').write_text(f"12:cpu:/legacy\n0::{path}\n")
+    return proc, mount
+
+
+def test_groups_read_their_own_accounting_files(tmp_path):
+    proc, mount = make_tree(tmp_path, {
+        10: '/system.slice/nginx.service',
+        11: '/system.slice/nginx.service/worker',
+        20: '/user.slice',
+        30: '/',
+    })
+    write_cgroup(mount, '/system.slice/nginx.service', 1000, 4096,
+                 io="8:0 rbytes=100 wbytes=200 rios=1 wios=2\n8:16 rbytes=1 wbytes=2 rios=3 wios=4\n",
+                 pids=7)
+    # No io.stat or pids.current: io and pid counts come from the processes
+    write_cgroup(mount, '/user.slice', 0, 8192)
+
+    assert find_cgroup2_mount(str(proc)) == str(mount)
+    monitor = CgroupMonitor(proc_path=str(proc), depth=2)
+    snapshot = make_snapshot([sample(10, rss=1), sample(11, rss=2), sample(20, rss=3),
+                              sample(30, rss=5), sample(40, rss=7)])
+    groups = monitor.update(snapshot)
+
+    nginx = groups['/system.slice/nginx.service']
+    assert (nginx['name'], nginx['processes'], nginx['pids']) == ('nginx.service', 2, 7)
+    assert (nginx['source'], nginx['memory_bytes']) == ('cgroup', 4096)
+
+    user = groups['/user.slice']
+    assert (user['source'], user['memory_bytes'], user['pids'], user['iops']) == ('cgroup', 8192, 1, -1.0)
+
+    # The root group describes the whole system, and 40 has no cgroup file
+    assert groups['/']['source'] == 'processes'
+    assert groups['/']['memory_bytes'] == 5
+    assert groups['']['name'] == '(unknown)'
+
+
+def test_group_rates_come_from_counter_deltas(tmp_path):
+    proc, mount = make_tree(tmp_path, {10: '/app'})
+    write_cgroup(mount, '/app', 1_000_000, 0, io="8:0 rbytes=0 wbytes=0 rios=0 wios=0\n")
+    monitor = CgroupMonitor(proc_path=str(proc))
+    snapshot = make_snapshot([sample(10)])
+    monitor.update(snapshot)
+
+    write_cgroup(mount, '/app', 1_500_000, 0, io="8:0 rbytes=1000000 wbytes=0 rios=10 wios=0\n")
+    group = monitor.update(snapshot)['/app']
+    # Half a CPU second and 1MB read over the (short) test interval
+    assert group['cpu_percent'] > 0
+    assert group['read_bps'] > group['write_bps'] == 0
+    assert group['iops'] > 0
+    assert group['io_bps'] == group['read_bps']
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from src.core.collectors import ProcfsCollector, PsutilCollector
+
+procfs_only = pytest.mark.skipif(not ProcfsCollector.available(), reason="needs Linux /proc")
+
+
+def write_process(proc_path, pid, uids):
+    base = proc_path / str(pid)
+    base.mkdir()
+    # Fields after the name: state, ppid, ..., utime, stime, ..., num_threads, ..., starttime
+    fields = ['S', '1'] + ['0'] * 9 + ['100', '50'] + ['0'] * 4 + ['3', '0', '200']
+    (base / 'stat').write_bytes(f"{pid} (setuid prog) {' '.join(fields)}\n".encode())
+    (base / 'statm').write_bytes(b'100 50 0 0 0 0 0\n')
+    (base / 'status').write_bytes(
+        f"Name:\tsetuid prog\nUid:\t{uids}\nGid:\t0\t0\t0\t0\n"
+        "voluntary_ctxt_switches:\t7\nnonvoluntary_ctxt_switches:\t2\n".encode())
+
+
+@procfs_only
+def test_procfs_reports_real_uid_of_setuid_process(tmp_path):
+    # real 1000, effective/saved/fs 0: what a setuid-root binary looks like
+    write_process(tmp_path, 4321, '1000\t0\t0\t0')
+    sample = ProcfsCollector(str(tmp_path), boot_time=0.0).read(4321)
+    assert sample.name == 'setuid prog'
+    assert sample.uid == 1000
+
+
+@procfs_only
+def test_engines_agree_on_identity_fields():
+    pid = os.getpid()
+    procfs = ProcfsCollector().read(pid)
+    ps = PsutilCollector().read(pid)
+    assert (procfs.pid, procfs.ppid, procfs.name, procfs.uid) == (ps.pid, ps.ppid, ps.name, ps.uid)
+    assert procfs.uid == os.getuid()
+
+
+@procfs_only
+def test_procfs_reads_files_longer_than_its_buffer(tmp_path):
+    write_process(tmp_path, 4321, '0\t0\t0\t0')
+    args = ['java'] + [f'-Dproperty.{i}=' + 'x' * 100 for i in range(400)]
+    (tmp_path / '4321' / 'cmdline').write_bytes(b'\0'.join(arg.encode() for arg in args) + b'\0')
+    assert ProcfsCollector(str(tmp_path), boot_time=0.0).cmdline(4321) == args
@@ -0,0 +1,52 @@
+import subprocess
+import sys
+import time
+
+from src.core.counter_delta import CounterDeltaEngine
+from src.core.process_monitor import ProcessManager
+
+
+def tick(engine, now, counters, key='p', evict=True):
+    engine.begin(now)
+    rates = engine.update(key, counters)
+    engine.end(evict)
+    return rates
+
+
+def test_reading_within_min_interval_keeps_rates_and_baseline():
+    engine = CounterDeltaEngine(1, min_interval=0.5)
+    tick(engine, 0.0, (0.0,))
+    assert tick(engine, 1.0, (1.0,)) == [1.0]
+    # 10ms later the counter has jumped a whole clock tick: 2/s over 10ms is noise
+    assert tick(engine, 1.01, (1.02,), evict=False) == [1.0]
+    # Measured from the baseline at 1.0, not from the skipped reading
+    assert tick(engine, 2.0, (2.0,)) == [1.0]
+
+
+def cpu_of(manager, pid):
+    snapshot = manager.snapshot
+    return snapshot['cpu_percent'][snapshot['pid'] == pid].tolist()[0]
+
+
+def test_scan_right_after_top_refresh_reuses_its_rates():
+    spinner = subprocess.Popen([sys.executable, '-c', 'while True: pass'])
+    manager = ProcessManager()
+    try:
+        manager.scan_all()
+        time.sleep(1)
+        manager.refresh_top()
+        refreshed = cpu_of(manager, spinner.pid)
+        manager.scan_all()
+        assert cpu_of(manager, spinner.pid) == refreshed
+        assert 0 < refreshed <= 110
+
+        time.sleep(1)
+        manager.scan_all()
+        scanned = cpu_of(manager, spinner.pid)
+        manager.refresh_top()
+        assert cpu_of(manager, spinner.pid) == scanned
+        assert 0 < scanned <= 110
+    finally:
+        spinner.kill()
+        spinner.wait()
+        manager.close()
@@ -0,0 +1,22 @@
+import threading
+
+from src.core.daemon import CollectorDaemon
+
+
+def test_daemon_samples_memory_and_cgroups_without_metrics(tmp_path):
+    daemon = CollectorDaemon(str(tmp_path / 'history.db'), store_interval=0, use_netlink=False)
+    threading.Timer(0.5, daemon.stop).start()
+    daemon.run()
+
+    names = [task.name for task in daemon.scheduler.tasks]
+    assert 'memory' in names
+    assert ('cgroups' in names) == daemon.process_manager.cgroups.available()
+    assert daemon.metrics is None
+
+
+def test_metrics_listen_on_loopback_by_default(tmp_path):
+    daemon = CollectorDaemon(str(tmp_path / 'history.db'), store_interval=0, use_netlink=False,
+                             metrics_address=':0')
+    threading.Timer(0.5, daemon.stop).start()
+    daemon.run()
+    assert daemon.metrics.address.startswith('127.0.0.1:')
@@ -0,0 +1,48 @@
+from src.core.lifecycle import LifecycleMonitor, ProcessEvent
+from tests.test_snapshot import make_snapshot, sample
+
+
+def record(monitor):
+    events = []
+    monitor.subscribe(events.append)
+    return events
+
+
+def test_diff_fallback_reports_started_and_exited_processes():
+    monitor = LifecycleMonitor()
+    events = record(monitor)
+    old = make_snapshot([sample(1), sample(2, name='gone', rss=4096), sample(3, create_time=100.0)])
+    # 3's pid was reused by a new process
+    new = make_snapshot([sample(1), sample(3, create_time=200.0), sample(4, name='new')])
+    monitor.process_snapshot(None, old)
+    assert events == []
+
+    monitor.process_snapshot(old, new)
+    assert monitor.source == 'diff'
+    exited = sorted((e.pid, e.create_time) for e in events if e.kind == ProcessEvent.EXITED)
+    started = sorted((e.pid, e.create_time) for e in events if e.kind == ProcessEvent.STARTED)
+    assert exited == [(2, 100.0), (3, 100.0)]
+    assert started == [(3, 200.0), (4, 100.0)]
+
+    gone = next(e for e in events if e.pid == 2)
+    assert gone.name == 'gone'
+    assert gone.counters['rss'] == 4096
+
+
+def test_resync_after_lost_connector_messages_skips_reported_pids():
+    monitor = LifecycleMonitor()
+    events = record(monitor)
+    monitor.source = 'netlink'
+    baseline = make_snapshot([sample(1), sample(2), sample(3)])
+    monitor.process_snapshot(None, baseline)
+
+    # The connector reported 3's exit, then messages were dropped (ENOBUFS)
+    monitor._connector_pids.add(3)
+    monitor._resync = baseline
+    monitor.process_snapshot(baseline, make_snapshot([sample(1), sample(5)]))
+    assert sorted((e.kind, e.pid) for e in events) == [('exited', 2), ('started', 5)]
+
+    # Without lost messages the connector alone reports events
+    events.clear()
+    monitor.process_snapshot(None, make_snapshot([sample(1)]))
+    assert events == []
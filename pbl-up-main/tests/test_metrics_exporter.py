@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from src.core.collectors import ProcessSample
+from src.core.metrics_exporter import MetricsExporter
+from src.core.process_monitor import ProcessManager, SystemStats
+from tests.test_process_monitor import FakeCollector
+
+STATS = SystemStats(0.0, 25.0, (20.0, 30.0), 2, None, 8.0, 2.0, 75.0, 100.0, 50.0, 50.0,
+                    {'sda': {'read_iops': 1.0, 'write_iops': 2.0, 'read_bps': 512.0,
+                             'write_bps': 1024.0, 'await_ms': 0.5, 'util_percent': 10.0}},
+                    {'eth0': {'rx_bps': 100.0, 'tx_bps': 200.0, 'rx_pps': 1.0, 'tx_pps': 2.0}},
+                    100.0, 200.0, 1.0, 2.0)
+
+
+def make_manager():
+    samples = [ProcessSample(1, 0, 'init', 'sleeping', 100.0, 0.0, 4096, 0, 1, 0),
+               ProcessSample(2, 1, 'say "hi"\\n', 'running', 100.0, 0.0, 8192, 0, 3, 0)]
+    manager = ProcessManager(collector=FakeCollector(samples))
+    manager.system_monitor = SimpleNamespace(stats=STATS)
+    manager.cgroups = SimpleNamespace(groups={
+        '/app': {'path': '/app', 'cpu_percent': 12.5, 'memory_bytes': 1024.0, 'io_bps': -1.0,
+                 'pids': 2},
+    })
+    manager.scan_all()
+    return manager
+
+
+def test_render_writes_openmetrics_families():
+    text = MetricsExporter(make_manager()).render().decode('utf-8')
+    lines = text.splitlines()
+
+    assert lines[-1] == '# EOF'
+    assert 'taskmaster_cpu_core_percent{cpu="1"} 30' in lines
+    assert 'taskmaster_memory_total_bytes 8589934592' in lines
+    assert 'taskmaster_disk_write_bytes_per_second{device="sda"} 1024' in lines
+    assert 'taskmaster_network_transmit_bytes_per_second{interface="eth0"} 200' in lines
+    assert 'taskmaster_processes 2' in lines
+    assert 'taskmaster_process_resident_bytes{pid="2",name="say \\"hi\\"\\\\n"} 8192' in lines
+    assert 'taskmaster_cgroup_cpu_percent{cgroup="/app"} 12.5' in lines
+    # Unknown values (-1) are left out rather than exported
+    assert not any(line.startswith('taskmaster_cgroup_io_bytes_per_second{') for line in lines)
+    # Every family is declared once, before its samples
+    types = [line.split()[2] for line in lines if line.startswith('# TYPE')]
+    assert len(types) == len(set(types))
+
+
+def test_render_is_cached_until_published_state_changes():
+    manager = make_manager()
+    exporter = MetricsExporter(manager)
+    rendered = []
+    render_processes = exporter._render_processes
+    exporter._render_processes = lambda snapshot: rendered.append(snapshot) or render_processes(snapshot)
+
+    first = exporter.render()
+    assert exporter.render() is first
+    assert len(rendered) == 1
+
+    # A new snapshot re-renders only the process section
+    manager.collector.samples[1].rss = 16384
+    manager.scan_all()
+    second = exporter.render()
+    assert len(rendered) == 2
+    assert b'name="say \\"hi\\"\\\\n"} 16384' in second
+    assert second.split(b'taskmaster_processes')[0] == first.split(b'taskmaster_processes')[0]
@@ -0,0 +1,56 @@
+import threading
+
+from src.core.collectors import ProcessSample
+from src.core.process_cache import MemoryBreakdownCache, StaticAttributeCache
+
+
+class FakeCollector:
+    def username(self, pid, uid):
+        return 'user'
+
+    def cmdline(self, pid):
+        return ['prog']
+
+    def exe(self, pid):
+        return '/bin/prog'
+
+    def memory_breakdown(self, pid):
+        return None
+
+
+def race(lookup, retain, rounds=20000):
+    """Runs lookup() on a second thread while retain() prunes; returns its errors."""
+    errors = []
+    stop = threading.Event()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                lookup()
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    try:
+        for i in range(rounds):
+            retain(i)
+    finally:
+        stop.set()
+        thread.join()
+    return errors
+
+
+def test_memory_cache_lookups_race_pruning_safely():
+    cache = MemoryBreakdownCache(FakeCollector(), max_age=1e9)
+    cache.get(1, 100.0)
+    assert race(lambda: cache.get(1, 100.0),
+                lambda i: cache.retain([] if i % 2 else [(1, 100.0)])) == []
+
+
+def test_static_cache_lookups_race_pruning_safely():
+    cache = StaticAttributeCache(FakeCollector())
+    sample = ProcessSample(1, 0, 'prog', 'sleeping', 100.0, 0.0, 0, 0, 1, 0)
+    assert race(lambda: cache.get(sample).cmdline,
+                lambda i: cache.retain([] if i % 2 else [(1, 100.0)])) == []
+    assert cache.get(sample).exe == '/bin/prog'
@@ -0,0 +1,119 @@
+from src.core.collectors import ProcessSample
+from src.core.process_monitor import ProcessManager
+
+
+class FakeCollector:
+    """Serves a fixed process list and counts the per-process lookups made."""
+
+    name = 'fake'
+
+    def __init__(self, samples):
+        self.samples = samples
+        self.count_fds = False
+        self.username_calls = []
+        self.collected = []
+
+    def collect(self, pids=None):
+        self.collected.append(pids)
+        return [s for s in self.samples if pids is None or s.pid in pids]
+
+    def username(self, pid, uid):
+        self.username_calls.append(pid)
+        return f'user{pid}'
+
+    def cmdline(self, pid):
+        return []
+
+    def exe(self, pid):
+        return ''
+
+    def memory_breakdown(self, pid):
+        return None
+
+
+def make_samples(count, uid):
+    # Larger pids use more memory, so the rss selection picks the last ones
+    return [ProcessSample(pid, 1, f'proc{pid}', 'sleeping', 100.0, 0.0, pid * 1024, 0, 1, uid)
+            for pid in range(1, count + 1)]
+
+
+def test_without_uids_only_selected_processes_look_up_their_user():
+    collector = FakeCollector(make_samples(100, uid=-1))
+    manager = ProcessManager(collector=collector)
+    manager.set_top_requests({'rss': 5})
+    manager.scan_all()
+
+    assert sorted(collector.username_calls) == [96, 97, 98, 99, 100]
+    snapshot = manager.snapshot
+    users = {pid: snapshot.users[user_id]
+             for pid, user_id in zip(snapshot['pid'].tolist(), snapshot['user_id'].tolist())}
+    assert users[100] == 'user100'
+    assert users[1] == ''
+    assert manager.selection.users[manager.selection['user_id'][0]].startswith('user')
+
+    # Cached names are reused, not looked up again
+    manager.scan_all()
+    assert len(collector.username_calls) == 5
+
+
+def test_request_top_replaces_previous_request():
+    manager = ProcessManager(collector=FakeCollector(make_samples(3, uid=0)))
+    defaults = dict(manager.top_requests)
+
+    manager.request_top('fds', 10)
+    assert manager.collector.count_fds
+    manager.request_top('threads', 10, replaces='fds')
+    assert 'fds' not in manager.top_requests
+    assert not manager.collector.count_fds
+
+    # A default metric goes back to its default size
+    manager.request_top('rss', 100, replaces='threads')
+    manager.request_top('cpu', 10, replaces='rss')
+    assert manager.top_requests == defaults
+
+
+def test_idle_selected_processes_back_off_between_top_refreshes():
+    samples = make_samples(2, uid=0)
+    samples[0].cpu_time = 5.0  # pid 1 is busy, pid 2 idle
+    collector = FakeCollector(samples)
+    manager = ProcessManager(collector=collector)
+    manager.scan_all()
+    for _ in range(25):
+        manager.refresh_top()
+
+    refreshes = collector.collected[1:]
+    assert sum(1 in pids for pids in refreshes) == 25
+    # Idle since its first refresh: then every 2, 4 and at most 8 refreshes
+    assert [i for i, pids in enumerate(refreshes) if 2 in pids] == [0, 2, 6, 14, 22]
+
+
+def test_selection_carries_the_published_seq():
+    manager = ProcessManager(collector=FakeCollector(make_samples(3, uid=0)))
+    manager.scan_all()
+    manager.refresh_top()
+    state = manager.state
+    assert state.snapshot.seq == state.selection.seq == manager.seq == 2
+
+
+def test_changes_since_reports_rows_and_resets_past_history():
+    collector = FakeCollector(make_samples(3, uid=0))
+    manager = ProcessManager(collector=collector)
+    manager.scan_all()
+    first = manager.seq
+
+    collector.samples = collector.samples[1:] + make_samples(4, uid=0)[3:]
+    collector.samples[0].rss += 1
+    manager.scan_all()
+    changes = manager.changes_since(first)
+    assert not changes.reset
+    assert (changes.since, changes.seq) == (first, manager.seq)
+    assert changes.added['pid'].tolist() == [4]
+    assert changes.removed == [(1, 100.0)]
+    assert dict(changes.changed_rows()) == {2: {'rss': 2 * 1024 + 1}}
+
+    for _ in range(ProcessManager.HISTORY):
+        manager.scan_all()
+    changes = manager.changes_since(first)
+    assert changes.reset
+    assert sorted(changes.added['pid'].tolist()) == [2, 3, 4]
+    assert len(changes.changed) == 0
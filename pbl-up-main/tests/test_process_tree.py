@@ -0,0 +1,66 @@
+from src.core.process_tree import ProcessTree
+from tests.test_snapshot import make_snapshot, sample
+
+
+def update(tree, rows):
+    # rows: (pid, ppid, rss)
+    tree.update(make_snapshot([sample(pid, ppid, rss=rss) for pid, ppid, rss in rows]))
+
+
+def rss_of(tree, pid):
+    return tree.subtree_totals(pid)['rss']
+
+
+def test_reparented_process_moves_its_subtree_totals():
+    tree = ProcessTree()
+    update(tree, [(1, 0, 1), (10, 1, 10), (20, 1, 20), (11, 10, 100)])
+    assert rss_of(tree, 10) == 110
+    assert rss_of(tree, 1) == 131
+
+    # 11 moves under 20 with a new size
+    update(tree, [(1, 0, 1), (10, 1, 10), (20, 1, 20), (11, 20, 200)])
+    assert tree.parent(11) == 20
+    assert rss_of(tree, 10) == 10
+    assert rss_of(tree, 20) == 220
+    assert rss_of(tree, 1) == 231
+    assert tree.view().subtree_totals(20)['processes'] == 2
+
+
+def test_exited_parent_drops_out_and_orphans_are_adopted():
+    tree = ProcessTree()
+    update(tree, [(1, 0, 1), (10, 1, 10), (11, 10, 100), (12, 10, 1000)])
+    assert rss_of(tree, 1) == 1111
+
+    # 10 exits, 12 exits with it, and init adopts 11
+    update(tree, [(1, 0, 1), (11, 1, 100)])
+    assert tree.subtree_totals(10) is None
+    assert tree.parent(11) == 1
+    assert tree.children(1) == {11}
+    assert rss_of(tree, 1) == 101
+    assert tree.subtree_totals(1)['processes'] == 2
+
+    view = tree.view()
+    assert view.parent(11) == 1
+    assert view.subtree_totals(1) == tree.subtree_totals(1)
+
+
+def test_view_is_shared_until_the_tree_changes_and_matches_it():
+    tree = ProcessTree()
+    update(tree, [(1, 0, 1), (10, 1, 10), (11, 10, 100)])
+    first = tree.view()
+    update(tree, [(1, 0, 1), (10, 1, 10), (11, 10, 100)])
+    assert tree.view() is first
+
+    # An exit frees a row that a later process reuses; the old view is untouched
+    update(tree, [(1, 0, 1), (10, 1, 10)])
+    second = tree.view()
+    update(tree, [(1, 0, 1), (10, 1, 10), (12, 1, 1000), (13, 12, 5)])
+    third = tree.view()
+    assert first.subtree_totals(1)['rss'] == 111
+    assert second.subtree_totals(11) is None
+    assert len(second) == 2 and len(third) == 4
+    for pid in (1, 10, 12, 13):
+        assert third.subtree_totals(pid) == tree.subtree_totals(pid)
+        assert third.parent(pid) == tree.parent(pid)
+    assert third.children(12) == {13}
+    assert [pid for pid, _ in third.top_subtrees('rss')] == [12]
@@ -0,0 +1,81 @@
+from src.core.process_monitor import SystemStats
+from src.core.remote import (COLUMN_NAMES, DELTA, KEYFRAME, REQUIRED_FIELDS, SYSTEM, CpuFreq,
+                             RemoteProcessManager, decode_snapshot, encode_snapshot,
+                             encode_system_stats)
+from src.core.snapshot import StringTable
+from tests.test_snapshot import make_snapshot, sample
+
+
+def rows_by_pid(snapshot, fields):
+    return {pid: {name: snapshot[name][i].item() for name in fields}
+            for i, pid in enumerate(snapshot['pid'].tolist())}
+
+
+def names_by_pid(snapshot):
+    return {pid: snapshot.names[name_id]
+            for pid, name_id in zip(snapshot['pid'].tolist(), snapshot['name_id'].tolist())}
+
+
+def make_states():
+    """Two consecutive agent snapshots; the second interns a new name."""
+    tables = (StringTable(), StringTable(), StringTable())
+    first = make_snapshot([sample(1, 0, 'init', rss=1), sample(2, name='sh', rss=2),
+                           sample(3, name='cat', rss=3)], tables=tables)
+    first.seq = 1
+    sent = [0, 0, 0]
+    keyframe = encode_snapshot(first, None, COLUMN_NAMES, sent)
+
+    second = make_snapshot([sample(1, 0, 'init', rss=1), sample(2, name='sh', rss=20),
+                            sample(4, 2, 'python', rss=4)], cpu=[0.0, 12.5, 0.0], tables=tables)
+    second.seq = 2
+    return first, second, keyframe, encode_snapshot(second, first, COLUMN_NAMES, sent)
+
+
+def test_delta_frame_decodes_to_only_the_changes():
+    _, _, keyframe, delta = make_states()
+    assert decode_snapshot(keyframe).count == 3
+    frame = decode_snapshot(delta)
+
+    assert (frame.seq, frame.count) == (2, 2)
+    assert frame.removed == [(3, 100.0)]
+    assert sorted(frame.columns['pid'].tolist()) == [2, 4]
+    # Only the string interned since the keyframe is sent again
+    assert frame.strings[0] == (3, ['python'])
+
+
+def test_mirror_matches_agent_after_keyframe_and_delta():
+    first, second, keyframe, delta = make_states()
+    # Nothing listens on port 1: the mirror is fed frames by hand
+    mirror = RemoteProcessManager('127.0.0.1:1')
+    try:
+        mirror._handle(KEYFRAME, keyframe)
+        assert rows_by_pid(mirror.snapshot, COLUMN_NAMES) == rows_by_pid(first, COLUMN_NAMES)
+        mirror._handle(DELTA, delta)
+        assert rows_by_pid(mirror.snapshot, COLUMN_NAMES) == rows_by_pid(second, COLUMN_NAMES)
+        assert names_by_pid(mirror.snapshot) == names_by_pid(second)
+        assert mirror.snapshot.seq == mirror.seq
+
+        # Fields that were not subscribed to read as 0
+        mirror._handle(KEYFRAME, encode_snapshot(second, None, REQUIRED_FIELDS, [0, 0, 0]))
+        assert mirror.snapshot['rss'].tolist() == [0, 0, 0]
+        assert names_by_pid(mirror.snapshot) == names_by_pid(second)
+    finally:
+        mirror.close()
+
+
+def test_remote_process_memory_is_measured_against_the_remote_host():
+    _, _, keyframe, _ = make_states()
+    mirror = RemoteProcessManager('127.0.0.1:1')
+    try:
+        mirror._handle(KEYFRAME, keyframe)
+        assert mirror.get_process(2).system_memory() == 0.0
+
+        stats = SystemStats(0.0, 5.0, (5.0,), 1, CpuFreq(1.0, 1.0, 1.0), 2.0, 1.0, 50.0,
+                            10.0, 5.0, 50.0, {}, {}, 0.0, 0.0, 0.0, 0.0)
+        mirror._handle(SYSTEM, encode_system_stats(stats))
+        assert mirror.system_stats == stats
+        process = mirror.get_process(2)
+        assert not process.is_local
+        assert process.system_memory() == 2048.0
+    finally:
+        mirror.close()
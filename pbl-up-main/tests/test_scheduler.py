@@ -0,0 +1,60 @@
+from src.core.scheduler import SamplingScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadlines_do_not_drift_with_task_duration():
+    clock = FakeClock()
+    scheduler = SamplingScheduler(clock)
+    runs = []
+
+    def slow_task():
+        runs.append(clock.now)
+        clock.now += 0.3
+
+    scheduler.add('scan', 1.0, slow_task)
+    for _ in range(5):
+        scheduler.run_pending()
+        clock.now += scheduler.time_until_next()
+
+    # start + n * interval, although every run took 0.3s
+    assert runs == [1000.0, 1001.0, 1002.0, 1003.0, 1004.0]
+
+
+def test_overrunning_task_skips_missed_slots():
+    clock = FakeClock()
+    scheduler = SamplingScheduler(clock)
+    runs = []
+
+    def task():
+        runs.append(clock.now)
+        if len(runs) == 1:
+            clock.now += 2.5
+
+    scheduler.add('scan', 1.0, task)
+    scheduler.run_pending()
+    # The slots at 1001 and 1002 were missed: the next run is at 1003, not right away
+    assert scheduler.time_until_next() == 0.5
+    clock.now += scheduler.time_until_next()
+    assert scheduler.run_pending() == ['scan']
+    assert runs == [1000.0, 1003.0]
+
+
+def test_tasks_run_at_their_own_rates():
+    clock = FakeClock()
+    scheduler = SamplingScheduler(clock)
+    scheduler.add('top', 0.5, lambda: None)
+    scheduler.add('scan', 2.0, lambda: None, run_immediately=False)
+
+    ran = []
+    for _ in range(9):
+        ran += scheduler.run_pending()
+        clock.now += 0.5
+    assert ran.count('top') == 9
+    assert ran.count('scan') == 2
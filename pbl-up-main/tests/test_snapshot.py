@@ -0,0 +1,46 @@
+import numpy as np
+
+from src.core.collectors import ProcessSample
+from src.core.snapshot import ProcessSnapshot, StringTable
+
+
+def sample(pid, ppid=1, name='proc', create_time=100.0, rss=0, uid=1000):
+    return ProcessSample(pid, ppid, name, 'sleeping', create_time, 0.0, rss, 0, 1, uid)
+
+
+# Columns that ProcessManager computes rather than reads from a sample
+DERIVED = ('cpu_percent', 'read_bps', 'write_bps', 'io_rate', 'syscall_rate',
+           'ctx_switch_vol_rate', 'ctx_switch_invol_rate')
+
+
+def make_snapshot(samples, cpu=None, timestamp=1.0, tables=None):
+    names, users, states = tables or (StringTable(), StringTable(), StringTable())
+    cpu = cpu if cpu is not None else [0.0] * len(samples)
+    derived = {name: [0.0] * len(samples) for name in DERIVED}
+    derived['cpu_percent'] = cpu
+    return ProcessSnapshot.from_samples(samples, derived,
+                                        [users.intern('user')] * len(samples),
+                                        names, users, states, timestamp)
+
+
+def test_top_k_indices_orders_by_value_and_keeps_ties_stable():
+    snapshot = make_snapshot([sample(pid) for pid in range(1, 7)],
+                             cpu=[5.0, 50.0, 5.0, 0.0, 20.0, 50.0])
+    assert snapshot['pid'][snapshot.top_k_indices('cpu_percent', 3)].tolist() == [2, 6, 5]
+    assert snapshot['pid'][snapshot.top_k_indices('cpu_percent', 10)].tolist() == [2, 6, 5, 1, 3, 4]
+    assert len(snapshot.top_k_indices('cpu_percent', 0)) == 0
+
+
+
+def test_replace_rows_updates_matching_pids_and_drops_removed():
+    tables = (StringTable(), StringTable(), StringTable())
+    snapshot = make_snapshot([sample(1, rss=10), sample(2, rss=20), sample(3, rss=30)],
+                             tables=tables)
+    updated = make_snapshot([sample(3, rss=33), sample(1, rss=11)], timestamp=2.0, tables=tables)
+
+    replaced = snapshot.replace_rows(updated, removed_pids=[2])
+    assert replaced['pid'].tolist() == [1, 3]
+    assert replaced['rss'].tolist() == [11, 33]
+    assert replaced.timestamp == 2.0
+    # The original is untouched
+    assert snapshot['rss'].tolist() == [10, 20, 30]
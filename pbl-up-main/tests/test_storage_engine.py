@@ -0,0 +1,183 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from src.core.storage_engine import DAY_MS, SCHEMA_VERSION, StorageEngine, now_ms
+
+
+def fill_system_samples(engine, days, interval_ms):
+    end = now_ms()
+    timestamps = list(range(end - days * DAY_MS, end, interval_ms))
+    for timestamp in timestamps:
+        engine.submit(engine.insert_system, (timestamp, 10.0, 20.0, 30.0, 1, None))
+    engine.flush()
+    return timestamps
+
+
+def trend(engine, resolution_ms, start, end):
+    sql, params, width = engine.call(engine.trend_query, 'system', resolution_ms, start, end)
+    return engine.call(engine.query, sql, params), width
+
+
+def test_trend_past_finer_tier_retention_reads_coarser_tier(tmp_path):
+    engine = StorageEngine.open(str(tmp_path / 'history.db'),
+                                retention={'raw': 7, '1m': 30, '1h': 365})
+    try:
+        timestamps = fill_system_samples(engine, 40, 3600 * 1000)
+        # Retention ran as new days started: the 1m tier keeps about 30 days,
+        # the 1h tier all 40
+        engine.call(engine.apply_retention)
+        assert len(engine.partitions('system_rollup_1m')) <= 31
+        assert len(engine.partitions('system_samples')) <= 8
+
+        # Ranges start on a bucket boundary, as rolled-up buckets are never split
+        start, end = timestamps[0] // (3600 * 1000) * (3600 * 1000), now_ms() + 1
+        rows, width = trend(engine, 300 * 1000, start, end)
+        assert width == 300 * 1000
+        assert rows[0]['timestamp'] <= start
+        assert rows[0]['timestamp'] < now_ms() - 35 * DAY_MS
+        # Every sample is counted exactly once across the tiers
+        assert sum(row['count'] for row in rows) == len(timestamps)
+        assert all(row['cpu_percent'] == 10.0 for row in rows)
+    finally:
+        engine.release()
+
+
+def test_trend_within_finer_tier_keeps_its_resolution(tmp_path):
+    engine = StorageEngine.open(str(tmp_path / 'history.db'))
+    try:
+        timestamps = fill_system_samples(engine, 1, 60 * 1000)
+        rows, width = trend(engine, 300 * 1000, timestamps[0] // 60000 * 60000, now_ms() + 1)
+        assert width == 300 * 1000
+        assert sum(row['count'] for row in rows) == len(timestamps)
+        assert all(row['timestamp'] % width == 0 for row in rows)
+    finally:
+        engine.release()
+
+
+V1_SCHEMA = [
+    '''CREATE TABLE process_history (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL,
+       pid INTEGER NOT NULL, name TEXT NOT NULL, cpu_percent REAL, memory_mb REAL, status TEXT,
+       username TEXT)''',
+    '''CREATE TABLE system_history (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL,
+       cpu_percent REAL, memory_percent REAL, disk_percent REAL, total_processes INTEGER)''',
+    '''CREATE TABLE process_snapshots (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL,
+       pid INTEGER, name TEXT, cpu_percent REAL, memory_mb REAL, threads INTEGER, data JSON)''',
+    '''CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL,
+       event_type TEXT, description TEXT, data JSON)''',
+]
+
+
+def test_v1_database_migrates_to_current_schema(tmp_path):
+    path = str(tmp_path / 'taskmaster.db')
+    # Version 1 wrote local-time ISO timestamps and had no user_version
+    hour_ago = (datetime.now() - timedelta(hours=1)).replace(microsecond=0)
+    stamp = hour_ago.isoformat()
+    conn = sqlite3.connect(path)
+    for statement in V1_SCHEMA:
+        conn.execute(statement)
+    conn.execute("INSERT INTO process_history (timestamp, pid, name, cpu_percent, memory_mb, "
+                 "status, username) VALUES (?, 42, 'python', 12.5, 100.0, 'running', 'alice')",
+                 (stamp,))
+    conn.execute("INSERT INTO process_snapshots (timestamp, pid, name, cpu_percent, memory_mb, "
+                 "threads, data) VALUES (?, 43, 'bash', 1.0, 5.0, 1, '{}')", (stamp,))
+    conn.execute("INSERT INTO system_history (timestamp, cpu_percent, memory_percent, "
+                 "disk_percent, total_processes) VALUES (?, 10.0, 20.0, 30.0, 200)", (stamp,))
+    conn.execute("INSERT INTO events (timestamp, event_type, description) "
+                 "VALUES (?, 'alert', 'high cpu')", (stamp,))
+    conn.commit()
+    conn.close()
+
+    engine = StorageEngine.open(path)
+    try:
+        def rows(base, columns):
+            sql, params = engine.call(engine.union, base, f'SELECT {columns} FROM {{table}}')
+            return sorted(tuple(row) for row in engine.call(engine.query, sql, params))
+
+        assert engine.call(engine.query, 'PRAGMA user_version')[0][0] == SCHEMA_VERSION
+        expected_ms = int(hour_ago.timestamp() * 1000)
+        assert rows('process_samples', 'pid, timestamp, cpu_percent, start_time') == [
+            (42, expected_ms, 12.5, 0), (43, expected_ms, 1.0, 0)]
+        assert rows('system_samples', 'total_processes') == [(200,)]
+        assert rows('events', 'event_type, description') == [('alert', 'high cpu')]
+        # Rollups were built from the migrated samples
+        assert rows('system_rollup_1m', 'cpu_sum, count') == [(10.0, 1)]
+        assert len(rows('process_rollup_1h', 'name_id')) == 2
+
+        tables = {row[0] for row in engine.call(
+            engine.query, "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert not tables & {'process_history', 'system_history', 'process_snapshots',
+                             'events_v1', 'process_samples'}
+        assert engine.call(engine.query, "SELECT name FROM users")[0][0] == 'alice'
+    finally:
+        engine.release()
+
+
+def wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def pragma(engine, name):
+    return engine.call(engine.query, f'PRAGMA {name}')[0][0]
+
+
+def test_retention_drops_whole_expired_partitions(tmp_path):
+    engine = StorageEngine.open(str(tmp_path / 'history.db'), retention={'raw': 3})
+    try:
+        fill_system_samples(engine, 10, 600 * 1000)
+        # Dropped as each new day started, not by deleting rows
+        raw = engine.partitions('system_samples')
+        assert 3 <= len(raw) <= 4
+        tables = {row[0] for row in engine.call(
+            engine.query, "SELECT name FROM sqlite_master WHERE name LIKE 'system_samples_p%' "
+                          "AND type = 'table'")}
+        assert tables == set(raw)
+        assert engine.call(engine.query, "SELECT COUNT(*) FROM partitions "
+                                         "WHERE base = 'system_samples'")[0][0] == len(raw)
+        # Rollups have their own retention
+        assert len(engine.partitions('system_rollup_1m')) >= 10
+
+        assert engine.call(engine.apply_retention, {'1m': 1}) >= 8
+        assert len(engine.partitions('system_rollup_1m')) <= 2
+        assert engine.call(engine.apply_retention, {'1m': 1}) == 0
+    finally:
+        engine.release()
+
+
+def test_new_file_returns_dropped_partitions_to_the_os(tmp_path):
+    engine = StorageEngine.open(str(tmp_path / 'history.db'), retention={'raw': 1})
+    try:
+        assert pragma(engine, 'auto_vacuum') == 2
+        fill_system_samples(engine, 2, 20 * 1000)
+        pages = pragma(engine, 'page_count')
+        assert engine.call(engine.apply_retention, {'raw': 0, '1m': 0, '1h': 0}) > 0
+        # Vacuum steps run while the writer is idle
+        wait_for(lambda: pragma(engine, 'freelist_count') == 0)
+        assert pragma(engine, 'page_count') < pages / 2
+    finally:
+        engine.release()
+
+
+def test_existing_file_is_converted_only_on_request(tmp_path):
+    path = str(tmp_path / 'history.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE unrelated (value TEXT)')
+    conn.commit()
+    conn.close()
+
+    engine = StorageEngine.open(path)
+    try:
+        fill_system_samples(engine, 2, 60 * 1000)
+        engine.call(engine.apply_retention, {'raw': 0, '1m': 0, '1h': 0})
+        assert pragma(engine, 'auto_vacuum') == 0
+        assert pragma(engine, 'freelist_count') > 0
+
+        assert engine.call(engine.convert_to_incremental_vacuum)
+        assert pragma(engine, 'auto_vacuum') == 2
+        assert pragma(engine, 'freelist_count') == 0
+        assert not engine.call(engine.convert_to_incremental_vacuum)
+    finally:
+        engine.release()